@@ -1,10 +1,18 @@
 from __future__ import annotations
 import datetime
+import functools
+import inspect
+import os
+import time
 from decimal import Decimal
-from typing import Any, List, Optional
+from typing import Any, Dict, Iterable, List, Optional
 from models.stock_history import StockHistory
 from models.pfand_table import PfandHistory
-from chame_app.database import get_session
+from chame_app.database import get_read_session, get_scoped_session, is_warm_start_enabled, remove_scoped_session
+from chame_app import startup_state
+from chame_app.product_pricing import pricing_table  # noqa: F401 - registers the pricing events
+from chame_app.role_cache import role_cache
+from chame_app.stock_graph import mark_ingredient_dirty
 from models.ingredient import Ingredient
 from models.product_ingredient_table import ProductIngredient
 from models.product_table import Product
@@ -12,21 +20,31 @@ from models.sales_table import Sale
 from models.toast_round import ToastRound
 from models.user_table import User
 from models.transaction_table import Transaction
-from models.bank_table import Bank, BankTransaction
-from sqlalchemy.orm import joinedload
-from sqlalchemy import text
-from utils.firebase_logger import log_info, log_warn, log_error, log_debug
+from models.bank_table import BANK_LEDGER_FIELDS, Bank, BankLedgerEntry, BankSnapshot, BankTransaction
+from sqlalchemy.orm import joinedload, object_session, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.util import identity_key
+from sqlalchemy import and_, func, insert, lambda_stmt, or_, select, text, update
+from sqlalchemy.exc import OperationalError
+from utils.firebase_logger import get_logger
+from utils.perf_tracing import trace_public_methods
+from utils.startup_profiler import startup_phase
 
 # Debug flag - set to True to enable local debug prints
 DEBUG = False
 
+# Records from this module belong to the "database" log subsystem
+# (see utils.firebase_logger.set_log_level)
+_logger = get_logger("database")
+log_info, log_warn, log_error, log_debug = _logger.info, _logger.warn, _logger.error, _logger.debug
+
 BANK_NOT_FOUND_MSG = "Bank account not found"
 USER_NOT_FOUND_MSG = "User not found"
 
 # Bank fields that are directly maintained ("source of truth") and therefore
 # safe to edit manually. Fields like profit_total, revenue_funds,
 # costs_reserved and profit_retained are always recomputed from these by
-# _sync_bank_financials() and must never be edited directly - any manual
+# _set_bank_state() and must never be edited directly - any manual
 # value would just be silently overwritten on the next transaction.
 # product_value / ingredient_value are also excluded: they are derived from
 # current ingredient/product stock levels, not independent source-of-truth
@@ -40,6 +58,11 @@ BANK_EDITABLE_FIELD_LABELS = {
 }
 BANK_EDITABLE_FIELDS = set(BANK_EDITABLE_FIELD_LABELS.keys())
 
+# Every money-moving operation appends a BankLedgerEntry; after this many
+# entries they are rolled up into a BankSnapshot (see _compact_bank_ledger)
+BANK_SNAPSHOT_INTERVAL = max(int(os.environ.get("CHAME_BANK_SNAPSHOT_INTERVAL", "500")), 1)
+_BANK_LEDGER = BankLedgerEntry.__table__
+
 
 def _build_rounding_comment(product: Product, quantity: int, base_total: float, checkout_total: float) -> str:
     return (
@@ -49,22 +72,553 @@ def _build_rounding_comment(product: Product, quantity: int, base_total: float,
     )
 
 
-def _sync_bank_financials(bank: Bank) -> None:
-    bank.profit_total = bank.get_profit_total()
-    bank.revenue_funds = bank.get_business_balance()
-    bank.costs_reserved = bank.get_break_even_remaining()
-    bank.profit_retained = bank.get_break_even_surplus()
+def _set_bank_state(bank: Bank, values) -> None:
+    """Load ledger totals (and the fields derived from them) into `bank` without marking it dirty.
+
+    The bank row is only written by _compact_bank_ledger(); flushing these
+    values through the ORM would count the pending ledger entries twice.
+    """
+    for field in BANK_LEDGER_FIELDS:
+        set_committed_value(bank, field, float(values[field] or 0.0))
+    set_committed_value(bank, "profit_total", bank.get_profit_total())
+    set_committed_value(bank, "revenue_funds", bank.get_business_balance())
+    set_committed_value(bank, "costs_reserved", bank.get_break_even_remaining())
+    set_committed_value(bank, "profit_retained", bank.get_break_even_surplus())
+
+
+# Bank totals = latest snapshot (or the bank row before the first one) plus
+# the ledger entries appended since, in one statement
+_BANK_STATE_SQL = text(
+    "SELECT s.snapshot_id IS NOT NULL AS has_snapshot, "
+    "COALESCE(MAX(l.entry_id), s.last_entry_id, 0) AS last_entry_id, "
+    "COUNT(l.entry_id) AS pending_entries, "
+    + ", ".join(
+        f"COALESCE(s.{field}, b.{field}, 0.0) + COALESCE(SUM(l.{field}), 0.0) AS {field}"
+        for field in BANK_LEDGER_FIELDS
+    )
+    + " FROM bank b"
+    " LEFT JOIN (SELECT * FROM bank_snapshots ORDER BY snapshot_id DESC LIMIT 1) s ON 1 = 1"
+    " LEFT JOIN bank_ledger l ON l.entry_id > COALESCE(s.last_entry_id, 0)"
+    " WHERE b.account_id = 1"
+    " GROUP BY b.account_id"
+)
+
+
+# Reconciliation: balances and bank totals recomputed from the event tables
+# (sales, transactions, bank_transactions, ingredients) with one aggregate
+# statement each, never loading ORM objects
+_EXPECTED_USER_BALANCES_SQL = text("""
+    SELECT u.user_id, u.name, u.balance,
+           COALESCE(t.deposits, 0.0) - COALESCE(t.withdrawals, 0.0) - COALESCE(s.spent, 0.0) AS expected_balance
+    FROM users u
+    LEFT JOIN (
+        SELECT user_id,
+               SUM(CASE WHEN type = 'deposit' THEN amount ELSE 0.0 END) AS deposits,
+               SUM(CASE WHEN type = 'withdraw' THEN amount ELSE 0.0 END) AS withdrawals
+        FROM transactions GROUP BY user_id
+    ) t ON t.user_id = u.user_id
+    LEFT JOIN (
+        SELECT COALESCE(donator_id, consumer_id) AS payer_id, SUM(total_price) AS spent
+        FROM sales GROUP BY COALESCE(donator_id, consumer_id)
+    ) s ON s.payer_id = u.user_id
+    WHERE NOT u.is_deleted
+""")
+
+_EXPECTED_BANK_TOTALS_SQL = text("""
+    SELECT
+        (SELECT COALESCE(SUM(balance), 0.0) FROM users) AS customer_funds,
+        (SELECT COALESCE(SUM(total_price), 0.0) FROM sales)
+        - (SELECT COALESCE(SUM(amount), 0.0) FROM transactions
+           WHERE type = 'deposit' AND comment LIKE 'Applied hidden transaction rounding%')
+        + (SELECT COALESCE(SUM(amount), 0.0) FROM bank_transactions
+           WHERE type = 'deposit' AND description LIKE 'User % closed account%')
+        + (SELECT COALESCE(SUM(amount), 0.0) FROM bank_transactions
+           WHERE type = 'adjustment' AND description LIKE 'Manual bank adjustment: Total Revenue set to%')
+        AS revenue_total,
+        (SELECT COALESCE(SUM(
+             i.stock_quantity * i.price_per_unit
+             + COALESCE(i.pfand, 0.0) * (i.stock_quantity + COALESCE(c.consumed, 0.0) - COALESCE(h.corrected, 0.0))
+         ), 0.0)
+         FROM ingredients i
+         LEFT JOIN (
+             SELECT pi.ingredient_id, SUM(s.quantity * pi.ingredient_quantity) AS consumed
+             FROM sales s JOIN product_ingredient pi ON pi.product_id = s.product_id
+             GROUP BY pi.ingredient_id
+         ) c ON c.ingredient_id = i.ingredient_id
+         LEFT JOIN (
+             SELECT ingredient_id, SUM(amount) AS corrected FROM stock_history GROUP BY ingredient_id
+         ) h ON h.ingredient_id = i.ingredient_id
+        ) AS ingredient_value
+""")
+
+
+def _read_bank_state(session):
+    state = session.execute(_BANK_STATE_SQL).mappings().first()
+    if state is None:
+        raise ValueError(BANK_NOT_FOUND_MSG)
+    return state
+
+
+def _apply_bank_deltas(session, operation: str, deltas: Dict[str, float], bank: Optional[Bank] = None) -> None:
+    """Append one bank ledger entry holding `deltas` (field -> amount).
+
+    Writers only insert, so concurrent operations no longer contend on the
+    single bank row; every BANK_SNAPSHOT_INTERVAL entries the ledger is
+    rolled up into a snapshot. `bank`, if given, is updated in memory.
+    """
+    deltas = {field: float(delta) for field, delta in deltas.items() if delta}
+    unknown = set(deltas) - set(BANK_LEDGER_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown bank fields: {sorted(unknown)}")
+    if not deltas:
+        return
+    result = session.execute(insert(_BANK_LEDGER).values(operation=operation, **deltas))
+    if bank is not None:
+        _set_bank_state(bank, {
+            field: float(getattr(bank, field) or 0.0) + deltas.get(field, 0.0)
+            for field in BANK_LEDGER_FIELDS
+        })
+    if result.inserted_primary_key[0] % BANK_SNAPSHOT_INTERVAL == 0:
+        _compact_bank_ledger(session)
+
+
+def _compact_bank_ledger(session) -> Optional[int]:
+    """Roll the pending ledger entries up into a new snapshot; returns its last_entry_id.
+
+    The entries themselves are kept (they are the bank's history); the bank
+    row is refreshed with the same totals for readers of the raw table.
+    """
+    state = _read_bank_state(session)
+    if not state["pending_entries"]:
+        return None
+    if not state["has_snapshot"]:
+        # Baseline: the bank row as it was before the first ledger entry
+        session.execute(text(
+            f"INSERT INTO bank_snapshots (last_entry_id, timestamp, {', '.join(BANK_LEDGER_FIELDS)}) "
+            f"SELECT 0, :timestamp, {', '.join(f'COALESCE({field}, 0.0)' for field in BANK_LEDGER_FIELDS)} "
+            "FROM bank WHERE account_id = 1"
+        ), {"timestamp": datetime.datetime.utcnow()})
+    totals = {field: float(state[field]) for field in BANK_LEDGER_FIELDS}
+    session.execute(insert(BankSnapshot.__table__).values(last_entry_id=state["last_entry_id"], **totals))
+    session.execute(update(Bank.__table__).where(Bank.__table__.c.account_id == 1).values(
+        profit_total=totals["revenue_total"] - totals["costs_total"],
+        revenue_funds=totals["total_balance"] - totals["customer_funds"],
+        costs_reserved=max(totals["costs_total"] - totals["revenue_total"], 0.0),
+        profit_retained=max(totals["revenue_total"] - totals["costs_total"], 0.0),
+        **totals,
+    ))
+    log_debug("Bank ledger compacted", lambda: {"operation": "compact_bank_ledger", "last_entry_id": state["last_entry_id"], "entries": state["pending_entries"]})
+    return state["last_entry_id"]
+
+
+# Balances, ingredient stock and pfand counters are changed with relative
+# UPDATEs ("balance = balance - :amount") instead of reading the value into
+# Python and writing it back, so concurrent terminals cannot overwrite each
+# other's changes.
+_USERS = User.__table__
+_INGREDIENTS = Ingredient.__table__
+_PFAND_HISTORY = PfandHistory.__table__
+_WRITE_CONFLICT_RETRIES = 3
+
+
+def _credit_user(session, user: User, amount: float) -> None:
+    session.execute(
+        update(_USERS)
+        .where(_USERS.c.user_id == user.user_id)
+        .values(balance=_USERS.c.balance + amount)
+    )
+    session.expire(user, ["balance"])
+
+
+def _debit_user(session, user: User, amount: float) -> None:
+    """Take `amount` from the user's balance only if the balance covers it.
+
+    The check is part of the UPDATE, so two terminals cannot both spend the
+    same money; a row count of 0 means the balance was too low.
+    """
+    result = session.execute(
+        update(_USERS)
+        .where(_USERS.c.user_id == user.user_id, _USERS.c.balance >= amount)
+        .values(balance=_USERS.c.balance - amount)
+    )
+    session.expire(user, ["balance"])
+    if result.rowcount != 1:
+        raise ValueError(f"Insufficient balance: {user.balance} (user={user.name}, required={amount})")
+
+
+def _change_ingredient_stock(session, ingredient: Ingredient, quantity: float) -> None:
+    """Add `quantity` (negative to take) to the ingredient's stock; taking fails if the stock does not cover it.
+
+    Products using the ingredient are recomputed at the next flush from the
+    reloaded value (see chame_app.stock_graph).
+    """
+    stmt = update(_INGREDIENTS).where(_INGREDIENTS.c.ingredient_id == ingredient.ingredient_id)
+    if quantity < 0:
+        stmt = stmt.where(_INGREDIENTS.c.stock_quantity >= -quantity)
+    result = session.execute(stmt.values(stock_quantity=_INGREDIENTS.c.stock_quantity + quantity))
+    session.expire(ingredient, ["stock_quantity"])
+    if result.rowcount != 1:
+        raise ValueError(f"Insufficient stock for ingredient {ingredient.name}, required_qty={-quantity})")
+    mark_ingredient_dirty(session, ingredient)
+
+
+def _set_ingredient_stock(session, ingredient: Ingredient, amount: int) -> float:
+    """Set the ingredient's stock to `amount` (an inventory count); returns the change.
+
+    Compare-and-set against the value read before: if another terminal
+    changed the stock in between, the failed UPDATE already holds the write
+    lock, so the value is re-read and the set retried once.
+    """
+    for _attempt in range(2):
+        previous = ingredient.stock_quantity
+        result = session.execute(
+            update(_INGREDIENTS)
+            .where(_INGREDIENTS.c.ingredient_id == ingredient.ingredient_id, _INGREDIENTS.c.stock_quantity == previous)
+            .values(stock_quantity=amount)
+        )
+        session.expire(ingredient, ["stock_quantity"])
+        if result.rowcount == 1:
+            mark_ingredient_dirty(session, ingredient)
+            return amount - previous
+    raise ValueError(f"Stock of ingredient {ingredient.name} changed concurrently")
+
+
+def _change_pfand_counter(session, pfand_history: PfandHistory, quantity: int) -> None:
+    """Add `quantity` (negative to return) to a pfand counter; returning fails if the counter does not cover it."""
+    if pfand_history.id is None:
+        # created earlier in this transaction, nobody else can see it yet
+        pfand_history.counter += quantity
+        return
+    stmt = update(_PFAND_HISTORY).where(_PFAND_HISTORY.c.id == pfand_history.id)
+    if quantity < 0:
+        stmt = stmt.where(_PFAND_HISTORY.c.counter >= -quantity)
+    result = session.execute(stmt.values(counter=_PFAND_HISTORY.c.counter + quantity))
+    session.expire(pfand_history, ["counter"])
+    if result.rowcount != 1:
+        raise ValueError(f"Insufficient deposit history for product_id={pfand_history.product_id} (requested: {-quantity})")
+
+
+def _is_write_conflict(error: BaseException) -> bool:
+    while error is not None:
+        if isinstance(error, OperationalError) and any(
+            marker in str(error).lower() for marker in ("database is locked", "database is busy")
+        ):
+            return True
+        error = error.__cause__
+    return False
+
+
+def _retry_on_write_conflict(method):
+    """Re-run a write method (balances, stock, bank) when SQLite reports a concurrent writer.
+
+    Only calls that own their session are retried - the method has rolled
+    back and nothing was committed. Calls inside a caller's transaction
+    re-raise so the caller can decide.
+    """
+    signature = inspect.signature(method)
+
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        attempt = 0
+        while True:
+            try:
+                return method(*args, **kwargs)
+            except RuntimeError as e:
+                if (attempt >= _WRITE_CONFLICT_RETRIES or not _is_write_conflict(e)
+                        or signature.bind(*args, **kwargs).arguments.get("session") is not None):
+                    raise
+                attempt += 1
+                log_warn("Retrying after write conflict", {"operation": method.__name__, "attempt": attempt, "error": str(e)})
+                time.sleep(0.05 * attempt)
+    return wrapper
+
+
+# Hot lookups (several per checkout) as lambda statements: SQLAlchemy builds
+# and compiles each one once, later calls only bind the new parameter values.
+_BANK_STMT = select(Bank).where(Bank.account_id == 1).limit(1)
+
+
+def _user_by_id_stmt(user_id):
+    return lambda_stmt(lambda: select(User).where(
+        User.user_id == user_id, ~User.is_deleted, ~User.is_disabled
+    ).limit(1))
+
+
+def _product_by_id_stmt(product_id):
+    return lambda_stmt(lambda: select(Product).where(
+        Product.product_id == product_id, ~Product.is_deleted, ~Product.is_disabled
+    ).limit(1))
+
+
+def _ingredient_by_id_stmt(ingredient_id):
+    return lambda_stmt(lambda: select(Ingredient).where(
+        Ingredient.ingredient_id == ingredient_id, ~Ingredient.is_deleted, ~Ingredient.is_disabled
+    ).limit(1))
+
+
+def _pfand_history_stmt(user_id, product_id):
+    return lambda_stmt(lambda: select(PfandHistory).where(
+        PfandHistory.user_id == user_id, PfandHistory.product_id == product_id
+    ))
+
+
+def _newest_first(query, key_column, before_id=None, limit=None):
+    """Order by key_column descending, continuing below before_id (keyset pagination).
+
+    The cursor is the last key of the previous page, so each page is one
+    range scan on the primary key however deep it is. Without before_id and
+    limit the query is returned unchanged, so full-list callers keep their order.
+    """
+    if before_id is None and limit is None:
+        return query
+    if before_id is not None:
+        query = query.filter(key_column < int(before_id))
+    query = query.order_by(key_column.desc())
+    return query.limit(int(limit)) if limit is not None else query
+
+
+def _without_user_links(query, user_ids, *columns):
+    """Drop rows whose user columns reference one of user_ids (NULL links are kept)."""
+    if not user_ids:
+        return query
+    user_ids = list(user_ids)
+    for column in columns:
+        query = query.filter(or_(column.is_(None), column.notin_(user_ids)))
+    return query
+
+
+def _visible_sales(query, hidden_user_ids):
+    """Sales not linked to hidden users as consumer, donator, salesman or toast round salesman."""
+    if not hidden_user_ids:
+        return query
+    hidden_user_ids = list(hidden_user_ids)
+    query = _without_user_links(query, hidden_user_ids, Sale.consumer_id, Sale.donator_id, Sale.salesman_id)
+    hidden_rounds = select(ToastRound.toast_round_id).where(ToastRound.salesman_id.in_(hidden_user_ids))
+    return query.filter(or_(Sale.toast_round_id.is_(None), Sale.toast_round_id.notin_(hidden_rounds)))
+
+
+# Active users with their sales statistics, aggregated in SQL so the user
+# list does not grow with the sales history
+_USER_SUMMARY_SQL = text("""
+    SELECT u.user_id, u.name, u.balance, u.role, u.is_disabled, u.disabled_reason,
+           COALESCE(c.sale_count, 0) AS sale_count,
+           COALESCE(p.total_spent, 0.0) AS total_spent,
+           c.last_purchase,
+           COALESCE(d.pfand_items, 0) AS pfand_items,
+           COALESCE(d.pfand_outstanding, 0.0) AS pfand_outstanding
+    FROM users u
+    LEFT JOIN (
+        SELECT consumer_id, COUNT(*) AS sale_count, MAX(timestamp) AS last_purchase
+        FROM sales GROUP BY consumer_id
+    ) c ON c.consumer_id = u.user_id
+    LEFT JOIN (
+        SELECT COALESCE(donator_id, consumer_id) AS payer_id, SUM(total_price) AS total_spent
+        FROM sales GROUP BY COALESCE(donator_id, consumer_id)
+    ) p ON p.payer_id = u.user_id
+    LEFT JOIN (
+        SELECT ph.user_id, SUM(ph.counter) AS pfand_items, SUM(ph.counter * COALESCE(pp.pfand, 0.0)) AS pfand_outstanding
+        FROM pfand_history ph
+        LEFT JOIN (
+            SELECT pi.product_id, SUM(pi.ingredient_quantity * COALESCE(i.pfand, 0.0)) AS pfand
+            FROM product_ingredient pi JOIN ingredients i ON i.ingredient_id = pi.ingredient_id
+            GROUP BY pi.product_id
+        ) pp ON pp.product_id = ph.product_id
+        GROUP BY ph.user_id
+    ) d ON d.user_id = u.user_id
+    WHERE NOT u.is_deleted AND NOT u.is_disabled
+    ORDER BY u.user_id
+""")
+
+
+# Active products with the columns the purchase screen needs, their per-unit
+# pfand and sales aggregates, so the catalog does not grow with the sales history
+_PRODUCT_CATALOG_SQL = text("""
+    SELECT p.product_id, p.name, p.category, p.price_per_unit, p.cost_per_unit, p.profit_per_unit,
+           p.stock_quantity, p.toaster_space,
+           p.is_deleted, p.deleted_at, p.deleted_by, p.is_disabled, p.disabled_reason,
+           (NOT p.is_deleted AND NOT p.is_disabled) AS is_available,
+           COALESCE(pp.pfand, 0.0) AS pfand,
+           COALESCE(s.sale_count, 0) AS sale_count,
+           COALESCE(s.units_sold, 0) AS units_sold,
+           COALESCE(s.revenue, 0.0) AS revenue,
+           s.last_sold
+    FROM products p
+    LEFT JOIN (
+        -- same rule as Product._compute_pfand: every linked ingredient counts,
+        -- deleted or disabled ones included, so deposits keep their refund value
+        SELECT pi.product_id, SUM(pi.ingredient_quantity * COALESCE(i.pfand, 0.0)) AS pfand
+        FROM product_ingredient pi JOIN ingredients i ON i.ingredient_id = pi.ingredient_id
+        GROUP BY pi.product_id
+    ) pp ON pp.product_id = p.product_id
+    LEFT JOIN (
+        SELECT product_id, COUNT(*) AS sale_count, SUM(quantity) AS units_sold,
+               SUM(total_price) AS revenue, MAX(timestamp) AS last_sold
+        FROM sales GROUP BY product_id
+    ) s ON s.product_id = p.product_id
+    WHERE NOT p.is_deleted AND NOT p.is_disabled
+      AND (:category IS NULL OR p.category = :category)
+    ORDER BY p.product_id
+""")
+
+def _isoformat(value) -> Optional[str]:
+    """Render a DateTime column read through text() the way to_dict() does."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = datetime.datetime.fromisoformat(value)
+    return value.isoformat()
+
+
+class _CheckoutContext:
+    """Working set of one checkout transaction, prefetched in a fixed number of queries.
+
+    Loads the purchased products together with their ingredients, every
+    product sharing one of those ingredients (whose stock is recomputed after
+    the purchase) and their ingredients, plus the bank, the payers and the
+    god user. make_purchase() then reads from these per-transaction maps
+    instead of issuing lookups, so the query count no longer depends on how
+    many products share an ingredient.
+    """
+
+    def __init__(self, session, product_ids, user_ids):
+        self.session = session
+        product_ids = set(product_ids)
+        user_ids = {user_id for user_id in user_ids if user_id is not None}
+
+        self.products = {}
+        if product_ids:
+            self.products = {
+                product.product_id: product
+                for product in session.execute(
+                    select(Product)
+                    .where(Product.product_id.in_(product_ids), ~Product.is_deleted, ~Product.is_disabled)
+                    .options(
+                        selectinload(Product.product_ingredients)
+                        .joinedload(ProductIngredient.ingredient)
+                        .selectinload(Ingredient.ingredient_products)
+                        .joinedload(ProductIngredient.product)
+                        .selectinload(Product.product_ingredients)
+                        .joinedload(ProductIngredient.ingredient)
+                    )
+                ).scalars()
+            }
+
+        self.users = {}
+        self.god_user = None
+        god_ids = role_cache.user_ids(session, "god", active_only=True)
+        god_id = min(god_ids) if god_ids else None
+        for user in session.execute(
+            select(User).where(
+                User.user_id.in_(set(user_ids) | ({god_id} if god_id is not None else set())),
+                ~User.is_deleted,
+                ~User.is_disabled,
+            )
+        ).scalars():
+            if user.user_id in user_ids:
+                self.users[user.user_id] = user
+            if user.user_id == god_id:
+                self.god_user = user
+
+        self._pfand_histories = {}
+
+    def get_product(self, product_id):
+        product = self.products.get(product_id)
+        if product is None:
+            raise ValueError(f"Product not found (product_id={product_id})")
+        return product
+
+    def get_user(self, user_id):
+        user = self.users.get(user_id)
+        if user is None:
+            raise ValueError(f"{USER_NOT_FOUND_MSG} (user_id={user_id})")
+        return user
+
+    def prefetch_pfand_histories(self, pairs):
+        """Load the PfandHistory rows of many (user_id, product_id) pairs in one query."""
+        missing = {pair for pair in pairs if pair not in self._pfand_histories}
+        if not missing:
+            return
+        for pair in missing:
+            self._pfand_histories[pair] = None
+        rows = self.session.execute(select(PfandHistory).where(or_(*[
+            and_(PfandHistory.user_id == user_id, PfandHistory.product_id == product_id)
+            for user_id, product_id in missing
+        ]))).scalars().all()
+        for row in rows:
+            key = (row.user_id, row.product_id)
+            if self._pfand_histories.get(key) is not None:
+                raise ValueError(f"Multiple pfand history records found for user_id={row.user_id}, product_id={row.product_id}")
+            self._pfand_histories[key] = row
+
+    def get_pfand_history(self, user_id, product_id):
+        self.prefetch_pfand_histories([(user_id, product_id)])
+        return self._pfand_histories[(user_id, product_id)]
+
+    def add_pfand_history(self, pfand_history):
+        self.session.add(pfand_history)
+        self._pfand_histories[(pfand_history.user_id, pfand_history.product_id)] = pfand_history
 
 
 def _get_active_privileged_user(session):
-    return User.active_only(session.query(User)).filter(User.role.in_(["admin", "god"])).first()
+    privileged_ids = role_cache.user_ids(session, "admin", active_only=True) | role_cache.user_ids(session, "god", active_only=True)
+    return session.get(User, min(privileged_ids)) if privileged_ids else None
+
+# One round trip answering "are the default records there?" on warm starts.
+_BOOTSTRAP_PROBE_SQL = text(
+    "SELECT "
+    "(SELECT COUNT(*) FROM bank WHERE account_id = 1), "
+    "(SELECT COUNT(*) FROM users WHERE role IN ('admin', 'god') AND is_deleted = 0 AND is_disabled = 0), "
+    "(SELECT COUNT(*) FROM users WHERE role = 'god' AND is_deleted = 0 AND is_disabled = 0)"
+)
+
+# Availability of every product in one aggregate, mirroring Product.update_stock():
+# a missing, deleted or disabled ingredient makes the product unavailable (0),
+# non-positive link quantities are ignored, otherwise MIN(floor(stock / qty)).
+_PRODUCT_STOCK_SNAPSHOT_SQL = (
+    "SELECT p.product_id, p.stock_quantity, "
+    "CASE "
+    "WHEN SUM(CASE WHEN pi.product_id IS NOT NULL AND "
+    "(i.ingredient_id IS NULL OR i.is_deleted = 1 OR i.is_disabled = 1) THEN 1 ELSE 0 END) > 0 THEN 0 "
+    "ELSE COALESCE(MIN(CASE WHEN pi.ingredient_quantity > 0 THEN "
+    "CAST(i.stock_quantity / pi.ingredient_quantity AS INTEGER) "
+    "- (i.stock_quantity / pi.ingredient_quantity < CAST(i.stock_quantity / pi.ingredient_quantity AS INTEGER)) "
+    "END), 0) "
+    "END AS available "
+    "FROM products p "
+    "LEFT JOIN product_ingredient pi ON pi.product_id = p.product_id "
+    "LEFT JOIN ingredients i ON i.ingredient_id = pi.ingredient_id"
+)
 
 class Database:
-    def __init__(self, apply_migrations: bool = True):
-        self.session = get_session(apply_migrations)
+    def __init__(self, apply_migrations: bool = True, warm_start: Optional[bool] = None):
+        if warm_start is None:
+            warm_start = is_warm_start_enabled()
+        get_scoped_session(apply_migrations)  # creates the engine on first use
         # Run migrations to ensure database is up to date
         if apply_migrations:
             self._ensure_migrations_applied()
+        with startup_phase("bootstrap"):
+            if not warm_start or not self._bootstrap_records_present():
+                self._ensure_bootstrap_records()
+        with startup_phase("product_stock"):
+            self._refresh_product_stock(warm_start)
+        remove_scoped_session()
+
+    @property
+    def session(self):
+        """Session of the current thread/request (see chame_app.database.request_session_scope)."""
+        return get_scoped_session()
+
+    def _bootstrap_records_present(self) -> bool:
+        try:
+            bank_count, privileged_count, god_count = self.session.execute(_BOOTSTRAP_PROBE_SQL).one()
+        except Exception as e:
+            print(f"⚠️ Warning: Bootstrap probe failed, falling back to full check: {e}")
+            self.session.rollback()
+            return False
+        return bool(bank_count and privileged_count and god_count)
+
+    def _ensure_bootstrap_records(self):
         bank = self.session.query(Bank).filter_by(account_id=1).first()
         if not bank:
             bank = Bank()
@@ -81,7 +635,8 @@ class Database:
             self.session.refresh(admin_user)
         elif DEBUG:
             print(f"[DEBUG] Found existing privileged user: {active_privileged_user.name} ({active_privileged_user.role})")
-        active_god = User.active_only(self.session.query(User)).filter_by(role="god").first()
+        god_ids = role_cache.user_ids(self.session, "god", active_only=True)
+        active_god = self.session.get(User, min(god_ids)) if god_ids else None
         if not active_god:
             if DEBUG:
                 print("[DEBUG] No god user found, creating default god user")
@@ -91,11 +646,40 @@ class Database:
             self.session.refresh(god_user)
         elif DEBUG:
             print(f"[DEBUG] Found existing god user: {active_god.name}")
-        for product in self.session.query(Product).all():
-            product.update_stock()
-        self.session.close()
-        
-        
+
+    def _refresh_product_stock(self, warm_start: bool):
+        """Recompute derived product stock, limited to stale products on warm starts.
+
+        The inputs of Product.update_stock() are snapshotted into a sidecar file
+        after every start; products whose ingredients, links or ingredient stock
+        differ from that snapshot are recomputed, everything else is left as is.
+        """
+        from chame_app.database import _engine
+        from chame_app.simple_migrations import SimpleMigrations
+
+        try:
+            current_state = startup_state.capture_stock_inputs(
+                self.session, SimpleMigrations(_engine).get_schema_stamp()
+            )
+        except Exception as e:
+            print(f"⚠️ Warning: Could not capture stock inputs: {e}")
+            self.session.rollback()
+            current_state = None
+
+        stale_ids = None
+        if warm_start and current_state is not None:
+            stale_ids = startup_state.get_stale_product_ids(
+                startup_state.load_startup_state(_engine), current_state
+            )
+
+        if stale_ids is not None and DEBUG:
+            print(f"[DEBUG] Warm start: recomputing stock for {len(stale_ids)} product(s)")
+        if stale_ids is None or stale_ids:
+            self.sync_product_stock(product_ids=stale_ids, session=self.session)
+            self.session.commit()
+
+        if current_state is not None:
+            startup_state.save_startup_state(_engine, current_state)
 
     def _ensure_migrations_applied(self):
         """Ensure database migrations are applied if needed"""
@@ -107,20 +691,33 @@ class Database:
                 return  # Engine not initialized yet
             
             migrations = SimpleMigrations(_engine)
+            if is_warm_start_enabled() and migrations.is_schema_current():
+                return  # Stamped by _create_engine_once, nothing pending
             # Create backup before migrations (True by default)
-            migrations.run_migrations(create_backup=True)
+            with startup_phase("run_migrations"):
+                success = migrations.run_migrations(create_backup=True)
+            if success:
+                migrations.stamp_schema()
             
         except Exception as e:
             print(f"⚠️ Warning: Migration check failed: {e}")
             # Don't raise - database creation should continue even if migrations fail
 
     def get_session(self):
-        """Create a new session."""
+        """Return the session of the current thread/request."""
         try:
             return self.session
         except Exception as e:
             raise RuntimeError(f"get_session failed: {e}") from e
         
+    def get_read_session(self):
+        """Return the current thread's session on the read-only pool (list endpoints)."""
+        try:
+            return get_read_session()
+        except Exception as e:
+            log_warn("Read-only pool unavailable, falling back to the write session", {"error": str(e)})
+            return self.get_session()
+
     def get_user_by_username(self, username: str, session=None) -> Optional[User]:
         """Get a user by username."""
         close_session = False
@@ -215,6 +812,7 @@ class Database:
                     session.close()
             raise RuntimeError(f"change_user_role failed for User={user_name}, new_role={new_role}: {e}") from e
 
+    @_retry_on_write_conflict
     def add_ingredient(self, name: str, price_per_package: float, stock_quantity: int, number_ingredients: int, pfand: float = 0.0, session=None):
         close_session = False
         try:
@@ -242,10 +840,8 @@ class Database:
             if DEBUG:
                 print(f"DEBUG: Created ingredient {ingredient}")
             if stock > 0:
-                bank = self.get_bank(session)
-                bank.ingredient_value += price_per_unit * stock + pfand * stock
-                bank.costs_total += price_per_unit * stock + pfand * stock
-                _sync_bank_financials(bank)
+                value = price_per_unit * stock + pfand * stock
+                _apply_bank_deltas(session, "add_ingredient", {"ingredient_value": value, "costs_total": value})
             session.add(ingredient)
             if close_session:
                 session.commit()
@@ -258,6 +854,7 @@ class Database:
                     session.close()
             raise RuntimeError(f"add_ingredient failed for ingredient={name}: {e}") from e
 
+    @_retry_on_write_conflict
     def restock_ingredients(self, _list: List[dict[int, int]], salesman_id: int, session=None):
         close_session = False
         try:
@@ -279,11 +876,10 @@ class Database:
                     print(f"DEBUG: Restocking ingredient_id={ingredient_id}, quantity={quantity}, price={price}")
                 total_cost += self.stock_ingredient(ingredient_id, quantity, price=price, session=session)
             
-            bank = self.get_bank(session)
-            if bank.total_balance < total_cost:
-                raise ValueError(f"Insufficient balance {bank.total_balance}")
-            bank.total_balance -= total_cost
-            _sync_bank_financials(bank)
+            _apply_bank_deltas(session, "restock_ingredients", {"total_balance": -total_cost})
+            available_balance = _read_bank_state(session)["total_balance"] + total_cost
+            if available_balance < total_cost:
+                raise ValueError(f"Insufficient balance {available_balance}")
             description = "Restock: "
             for item in _list:
                 ingredient = self.get_ingredient_by_id(item['id'], session)
@@ -306,6 +902,7 @@ class Database:
                     session.close()
             raise RuntimeError(f"restock_ingredients failed: {e}") from e
 
+    @_retry_on_write_conflict
     def close_user_account(self, user_id: int, withdraw_amount: float, salesman_id: int, session=None):
         close_session = False
         try:
@@ -320,10 +917,7 @@ class Database:
             if withdraw_amount > 0:
                 self.withdraw_cash(user_id, withdraw_amount, salesman_id, session=session)
             if user.balance > 0:
-                bank = self.get_bank(session)
-                bank.customer_funds -= user.balance
-                bank.revenue_total += user.balance
-                _sync_bank_financials(bank)
+                _apply_bank_deltas(session, "close_user_account", {"customer_funds": -user.balance, "revenue_total": user.balance})
                 
                 transaction = BankTransaction(amount=user.balance, type="deposit", description=f"User {user.name} closed account, remaining balance collected as donation: {user.balance}€", salesman_id=salesman_id)
                 user.balance = 0.0
@@ -340,6 +934,7 @@ class Database:
                     session.close()
             raise RuntimeError(f"close_user_account failed: {e}") from e
 
+    @_retry_on_write_conflict
     def stock_ingredient(self, ingredient_id: int, quantity: int, price: Optional[float] = None, session=None) -> float:
         close_session = False
         ingredient_name = "404"
@@ -352,8 +947,7 @@ class Database:
             quantity = int(quantity)
             packages = quantity
             units = packages * ingredient.number_of_units
-            ingredient.stock_quantity += units
-            bank = self.get_bank(session)
+            _change_ingredient_stock(session, ingredient, units)
             if price is None:
                 price = ingredient.price_per_unit
             else:
@@ -363,16 +957,8 @@ class Database:
             if DEBUG:
                 print(f"DEBUG: Stocking ingredient {ingredient_name} with price={price}, quantity={units}")
             # pfand is applied per unit: multiply by units
-            bank.costs_total += price * units + ingredient.pfand * units
-            bank.ingredient_value += price * units + ingredient.pfand * units
-            _sync_bank_financials(bank)
-            for product_assoc in ingredient.ingredient_products:
-                product = product_assoc.product
-                current_stock = product.stock_quantity
-                product.update_stock()
-                new_stock = product.stock_quantity
-                if new_stock < current_stock:
-                    raise RuntimeError(f"This should never happen: {product.name} stock decreased from {current_stock} to {new_stock}")
+            value = price * units + ingredient.pfand * units
+            _apply_bank_deltas(session, "stock_ingredient", {"costs_total": value, "ingredient_value": value})
             if close_session:
                 session.commit()
                 session.refresh(ingredient)
@@ -406,16 +992,16 @@ class Database:
                     raise ValueError("Toaster space must be at least 1")
             else:
                 toaster_space = 0
-            log_debug(f"Adding product {name} with price={price}, category={category}, toaster_space={toaster_space}, ingredients={ingredients}")
+            log_debug(lambda: f"Adding product {name} with price={price}, category={category}, toaster_space={toaster_space}, ingredients={ingredients}")
             cost_per_unit = 0.0
             for ingredient_obj, quantity in ingredients:
                 ingredient_quantity = float(quantity)
                 if ingredient_quantity <= 0:
                     raise ValueError(f"Ingredient quantity must be greater than 0 (ingredient={ingredient_obj.name})")
                 cost_per_unit += ingredient_obj.price_per_unit * ingredient_quantity
-                log_debug(f"Ingredient {ingredient_obj.name} contributes {ingredient_obj.price_per_unit} * {ingredient_quantity} = {ingredient_obj.price_per_unit * ingredient_quantity} to cost")
+                log_debug(lambda: f"Ingredient {ingredient_obj.name} contributes {ingredient_obj.price_per_unit} * {ingredient_quantity} = {ingredient_obj.price_per_unit * ingredient_quantity} to cost")
             profit_per_unit = price - cost_per_unit
-            log_debug(f"Calculated cost_per_unit={cost_per_unit}, profit_per_unit={profit_per_unit} for product {name}")
+            log_debug(lambda: f"Calculated cost_per_unit={cost_per_unit}, profit_per_unit={profit_per_unit} for product {name}")
             product = Product(name=name, price_per_unit=price, category=category, 
                               toaster_space=toaster_space, cost_per_unit=cost_per_unit, profit_per_unit=profit_per_unit)
             session.add(product)
@@ -437,9 +1023,10 @@ class Database:
                     session.close()
             raise RuntimeError(f"add_product failed for Product={name}: {e}") from e
 
+    @_retry_on_write_conflict
     def add_user(self, username: str, password: str, salesman_id: int, role: str = "user", balance: float = 0.0, session=None):
         print("🔥 [DATABASE] Logging user creation to Firebase...")
-        log_info("User creation initiated", {"operation": "add_user", "username": username, "role": role, "balance": balance})
+        log_info("User creation initiated", lambda: {"operation": "add_user", "username": username, "role": role, "balance": balance})
         print("✅ [DATABASE] User creation initiation logged to Firebase")
         
         close_session = False
@@ -454,9 +1041,7 @@ class Database:
                 raise ValueError("Username 'bank' is reserved and cannot be used")
             balance = float(balance)
             user = User(name=username, balance=balance, password_hash=password, role=role.lower())
-            bank = self.get_bank(session)
-            bank.total_balance += balance
-            bank.customer_funds += balance
+            _apply_bank_deltas(session, "add_user", {"total_balance": balance, "customer_funds": balance})
             session.add(user)
             session.flush()
             if balance > 0:
@@ -489,21 +1074,23 @@ class Database:
         if product.stock_quantity < quantity:
             raise ValueError("Insufficient stock for this product)")
 
-    def _check_and_update_ingredient_stock(self, product, quantity, bank):
+    def _check_and_update_ingredient_stock(self, product, quantity) -> float:
+        """Take the product's ingredients out of stock; returns the value of the ingredients used."""
         for assoc in product.product_ingredients:
             ingredient = assoc.ingredient
             required_qty = assoc.ingredient_quantity * quantity
             if ingredient.stock_quantity < required_qty:
                 raise ValueError(f"Insufficient stock for ingredient {ingredient.name}, required_qty={required_qty})")
         # If all checks pass, update stock
+        used_value = 0.0
         for assoc in product.product_ingredients:
             ingredient = assoc.ingredient
             required_qty = assoc.ingredient_quantity * quantity
-            ingredient.stock_quantity -= required_qty
-            bank.ingredient_value -= required_qty * ingredient.price_per_unit
-            for product_assoc in ingredient.ingredient_products:
-                product_assoc.product.update_stock()
+            _change_ingredient_stock(object_session(ingredient), ingredient, -required_qty)
+            used_value += required_qty * ingredient.price_per_unit
+        return used_value
 
+    @_retry_on_write_conflict
     def return_deposit(self, user_id: int, product_quantity_list: List[Any], salesman_id: int, session=None):
         """Return deposit for a list of products."""
         if DEBUG:
@@ -529,14 +1116,12 @@ class Database:
                     print(f"DEBUG: Pfand history for user_id={user_id}, product_id={product.product_id}: {pfand_history}")
                 if not pfand_history or pfand_history.counter < quantity:
                     raise ValueError(f"Insufficient deposit history for product {product.name} (requested: {quantity}, available: {pfand_history.counter if pfand_history else 0})")
-                pfand_history.counter -= quantity
-                bank = self.get_bank(session)
+                _change_pfand_counter(session, pfand_history, -quantity)
                 user = self.get_user_by_id(user_id, session=session)
                 user_name = user.name
                 pfand = product.get_pfand() * quantity
-                user.balance += pfand
-                bank.customer_funds += pfand
-                _sync_bank_financials(bank)
+                _credit_user(session, user, pfand)
+                _apply_bank_deltas(session, "return_deposit", {"customer_funds": pfand})
                 total_pfand += pfand
             comment = f"User {user_name} returned deposit for " + ", ".join([f"{item['amount']}x {self.get_product_by_id(item['id'], session).name}" for item in product_quantity_list])
             transaction = Transaction(user_id=user_id, amount=total_pfand, type="deposit", timestamp=datetime.datetime.now().replace(second=0, microsecond=0), comment=comment, salesman_id=salesman_id)
@@ -552,8 +1137,9 @@ class Database:
                     session.close()
             raise RuntimeError(f"return_deposit failed for User={user_name}, Product={product_name}, quantity={quantity}: {e}") from e
 
+    @_retry_on_write_conflict
     def make_multiple_purchases(self, item_list: List[dict], salesman_id: int, session=None):
-        """Make multiple purchases in a single transaction."""
+        """Make multiple purchases in a single transaction (see _apply_checkout_batch)."""
         close_session = False
         try:
             if session is None:
@@ -564,25 +1150,130 @@ class Database:
             for item in item_list:
                 if not isinstance(item, dict) or 'product_id' not in item or 'quantity' not in item or 'consumer_id' not in item:
                     raise ValueError("Each item must be a dict with 'product_id', 'quantity', and 'consumer_id'")
-            purchases = []
-            for item in item_list:
-                purchase = self.make_purchase(item['consumer_id'], item['product_id'], item['quantity'], donator_id=item.get('donator_id', None), salesman_id=salesman_id, session=session)
-                purchases.append(purchase)
+            log_info("Batch purchase initiated", {"operation": "make_multiple_purchases", "lines": len(item_list)})
+
+            lines = [
+                (item['consumer_id'], item.get('donator_id', None), item['product_id'], item['quantity'])
+                for item in item_list
+            ]
+            purchases, _checkout, total_cost = self._apply_checkout_batch(session, lines, salesman_id)
+
             if close_session:
                 session.commit()
                 session.close()
+            log_info("Batch purchase completed successfully", {"operation": "make_multiple_purchases", "lines": len(purchases), "total_cost": total_cost})
             return purchases
         except Exception as e:           
+            log_error("Batch purchase failed", {"operation": "make_multiple_purchases", "lines": len(item_list) if isinstance(item_list, list) else 0, "error": str(e)})
             if session:
                 session.rollback()
                 if close_session:
                     session.close()
             raise RuntimeError(f"make_multiple_purchases failed: {e}") from e
 
-    def make_purchase(self, consumer_id: int, product_id: int, quantity: int, salesman_id: int, session=None, toast_round_id: int = 0, donator_id: Optional[int] = None) -> Sale:
+    def _apply_checkout_batch(self, session, lines, salesman_id: int, toast_round_id: int = 0):
+        """Validate and apply many (consumer_id, donator_id, product_id, quantity) lines at once.
+
+        All products/users/pfand rows come from one _CheckoutContext; product,
+        ingredient and payer demand is checked for the whole batch before any
+        change, then stock, balances and bank fields are updated once and
+        flushed. Returns (sales, checkout, total_cost); the caller commits.
+        """
+        resolved = []
+        for consumer_id, donator_id, product_id, quantity in lines:
+            quantity = int(quantity)
+            if quantity <= 0:
+                raise ValueError("make_purchase: Quantity must be greater than 0")
+            payer_id = donator_id if donator_id is not None else consumer_id
+            resolved.append((consumer_id, donator_id, payer_id, product_id, quantity))
+
+        checkout = _CheckoutContext(
+            session,
+            [line[3] for line in resolved],
+            [line[0] for line in resolved] + [line[2] for line in resolved],
+        )
+
+        # Validate aggregate demand across all lines before changing anything
+        product_demand = {}
+        ingredient_demand = {}
+        payer_totals = {}
+        priced_lines = []
+        for consumer_id, donator_id, payer_id, product_id, quantity in resolved:
+            product = checkout.get_product(product_id)
+            payer = checkout.get_user(payer_id)
+            product_demand[product_id] = product_demand.get(product_id, 0) + quantity
+            for assoc in product.product_ingredients:
+                ingredient = assoc.ingredient
+                demand = ingredient_demand.setdefault(ingredient.ingredient_id, [ingredient, 0.0])
+                demand[1] += assoc.ingredient_quantity * quantity
+            base_total_cost = product.get_base_total_price(quantity)
+            total_cost = product.get_checkout_total_price(quantity)
+            rounding_difference = product.get_rounding_difference_total(quantity)
+            payer_totals[payer_id] = payer_totals.get(payer_id, 0.0) + total_cost
+            priced_lines.append((consumer_id, donator_id, payer, product, quantity, base_total_cost, total_cost, rounding_difference))
+
+        for product_id, quantity in product_demand.items():
+            self._check_product_stock(checkout.get_product(product_id), quantity)
+        for ingredient, required_qty in ingredient_demand.values():
+            if ingredient.stock_quantity < required_qty:
+                raise ValueError(f"Insufficient stock for ingredient {ingredient.name}, required_qty={required_qty})")
+        # One conditional debit per payer; a payer who cannot cover their
+        # share fails the whole batch (the caller rolls back)
+        for payer_id, total in payer_totals.items():
+            _debit_user(session, checkout.get_user(payer_id), total)
+
+        # Apply stock changes once per ingredient; affected products are
+        # recomputed once at flush time (see chame_app.stock_graph)
+        bank_deltas = {"customer_funds": -sum(payer_totals.values()), "revenue_total": 0.0, "ingredient_value": 0.0}
+        for ingredient, required_qty in ingredient_demand.values():
+            _change_ingredient_stock(session, ingredient, -required_qty)
+            bank_deltas["ingredient_value"] -= required_qty * ingredient.price_per_unit
+
+        checkout.prefetch_pfand_histories({
+            (consumer_id, product.product_id)
+            for consumer_id, _donator_id, _payer, product, *_rest in priced_lines
+            if product.get_pfand() > 0
+        })
+        timestamp = datetime.datetime.now().replace(second=0, microsecond=0)
+        purchases = []
+        for consumer_id, donator_id, payer, product, quantity, base_total_cost, total_cost, rounding_difference in priced_lines:
+            if product.get_pfand() > 0:
+                pfand_history = checkout.get_pfand_history(consumer_id, product.product_id)
+                if pfand_history:
+                    _change_pfand_counter(session, pfand_history, quantity)
+                else:
+                    checkout.add_pfand_history(PfandHistory(user_id=consumer_id, product_id=product.product_id, counter=quantity))
+            bank_deltas["revenue_total"] += base_total_cost
+            if rounding_difference > 0:
+                self._record_rounding_difference(session, checkout, product, quantity, base_total_cost, total_cost, rounding_difference, salesman_id)
+                bank_deltas["customer_funds"] += rounding_difference
+            purchase = Sale(consumer_id=consumer_id, donator_id=donator_id, product_id=product.product_id, quantity=quantity, total_price=total_cost, timestamp=timestamp, toast_round_id=toast_round_id, salesman_id=salesman_id)
+            session.add(purchase)
+            purchases.append(purchase)
+        _apply_bank_deltas(session, "checkout", bank_deltas)
+        session.flush()
+        return purchases, checkout, sum(payer_totals.values())
+
+    def _record_rounding_difference(self, session, checkout, product, quantity, base_total_cost, total_cost, rounding_difference, salesman_id):
+        """Credit the hidden checkout rounding to the god account (the caller adds it to customer_funds)."""
+        god_user = checkout.god_user
+        if not god_user:
+            raise ValueError("God user not found")
+        _credit_user(session, god_user, rounding_difference)
+        session.add(Transaction(
+            user_id=god_user.user_id,
+            amount=rounding_difference,
+            type="deposit",
+            timestamp=datetime.datetime.now().replace(second=0, microsecond=0),
+            comment=_build_rounding_comment(product, quantity, base_total_cost, total_cost),
+            salesman_id=salesman_id,
+        ))
+
+    @_retry_on_write_conflict
+    def make_purchase(self, consumer_id: int, product_id: int, quantity: int, salesman_id: int, session=None, toast_round_id: int = 0, donator_id: Optional[int] = None, checkout: Optional[_CheckoutContext] = None) -> Sale:
         # Firebase logging with debug output
         print("🔥 [DATABASE] Logging purchase initiation to Firebase...")
-        log_info("Purchase initiated", {"operation": "make_purchase", "consumer_id": consumer_id, "product_id": product_id, "quantity": quantity})
+        log_info("Purchase initiated", lambda: {"operation": "make_purchase", "consumer_id": consumer_id, "product_id": product_id, "quantity": quantity})
         print("✅ [DATABASE] Purchase initiation logged to Firebase")
         
         close_session = False
@@ -593,56 +1284,44 @@ class Database:
                 session = self.get_session()
                 close_session = True
             quantity = int(quantity)
-            product = self.get_product_by_id(product_id, session)
+            payer_id = consumer_id
+            if donator_id is not None:
+                payer_id = donator_id
+            if checkout is None:
+                checkout = _CheckoutContext(session, [product_id], [payer_id])
+            product = checkout.get_product(product_id)
             product_name = product.name
             if quantity <= 0:
                 print("⚠️ [DATABASE] Logging invalid purchase quantity to Firebase...")
                 log_warn("Invalid purchase quantity", {"operation": "make_purchase", "consumer_id": consumer_id, "product": product_name, "quantity": quantity})
                 print("✅ [DATABASE] Invalid quantity warning logged to Firebase")
                 raise ValueError("make_purchase: Quantity must be greater than 0")
-            payer_id = consumer_id
-            if donator_id is not None:
-                payer_id = donator_id
-            bank = self.get_bank(session)
             self._check_product_stock(product, quantity)
-            self._check_and_update_ingredient_stock(product, quantity, bank)
-            product.update_stock()
+            used_ingredient_value = self._check_and_update_ingredient_stock(product, quantity)
             base_total_cost = product.get_base_total_price(quantity)
             total_cost = product.get_checkout_total_price(quantity)
             rounding_difference = product.get_rounding_difference_total(quantity)
-            payer = self.get_user_by_id(payer_id, session=session)
+            payer = checkout.get_user(payer_id)
             payer_name = payer.name
-            if payer.balance < total_cost:
+            try:
+                _debit_user(session, payer, total_cost)
+            except ValueError:
                 print("⚠️ [DATABASE] Logging insufficient balance to Firebase...")
                 log_warn("Insufficient balance for purchase", {"operation": "make_purchase", "consumer_id": consumer_id, "product": product_name, "payer": payer_name, "required": total_cost, "balance": payer.balance})
                 print("✅ [DATABASE] Insufficient balance warning logged to Firebase")
-                raise ValueError(f"Insufficient balance: {payer.balance}")
+                raise
             purchase = Sale(consumer_id=consumer_id, donator_id=donator_id, product_id=product_id, quantity=quantity, total_price=total_cost, timestamp=datetime.datetime.now().replace(second=0, microsecond=0), toast_round_id=toast_round_id, salesman_id=salesman_id)
             if product.get_pfand() > 0:
-                pfand_history = self.get_pfand_history(consumer_id, product_id, session=session)
+                pfand_history = checkout.get_pfand_history(consumer_id, product_id)
                 if pfand_history:
-                    pfand_history.counter += quantity
+                    _change_pfand_counter(session, pfand_history, quantity)
                 else:
-                    pfand_history = PfandHistory(user_id=consumer_id, product_id=product_id, counter=quantity)
-                    session.add(pfand_history)
-            payer.balance -= total_cost
-            bank.customer_funds -= total_cost
-            bank.revenue_total += base_total_cost
+                    checkout.add_pfand_history(PfandHistory(user_id=consumer_id, product_id=product_id, counter=quantity))
+            customer_funds_delta = -total_cost
             if rounding_difference > 0:
-                god_user = User.active_only(session.query(User)).filter(User.role == "god").first()
-                if not god_user:
-                    raise ValueError("God user not found")
-                god_user.balance += rounding_difference
-                bank.customer_funds += rounding_difference
-                session.add(Transaction(
-                    user_id=god_user.user_id,
-                    amount=rounding_difference,
-                    type="deposit",
-                    timestamp=datetime.datetime.now().replace(second=0, microsecond=0),
-                    comment=_build_rounding_comment(product, quantity, base_total_cost, total_cost),
-                    salesman_id=salesman_id,
-                ))
-            _sync_bank_financials(bank)
+                self._record_rounding_difference(session, checkout, product, quantity, base_total_cost, total_cost, rounding_difference, salesman_id)
+                customer_funds_delta += rounding_difference
+            _apply_bank_deltas(session, "make_purchase", {"customer_funds": customer_funds_delta, "revenue_total": base_total_cost, "ingredient_value": -used_ingredient_value})
             session.add(purchase)
             if close_session:
                 session.commit()
@@ -650,7 +1329,7 @@ class Database:
                 session.close()
             
             print("🔥 [DATABASE] Logging successful purchase to Firebase...")
-            log_info("Purchase completed successfully", {"operation": "make_purchase", "consumer_id": consumer_id, "product": product_name, "quantity": quantity, "total_cost": total_cost, "base_total_cost": base_total_cost, "rounding_difference": rounding_difference, "payer": payer_name, "sale_id": purchase.sale_id})
+            log_info("Purchase completed successfully", lambda: {"operation": "make_purchase", "consumer_id": consumer_id, "product": product_name, "quantity": quantity, "total_cost": total_cost, "base_total_cost": base_total_cost, "rounding_difference": rounding_difference, "payer": payer_name, "sale_id": purchase.sale_id})
             print("✅ [DATABASE] Purchase success logged to Firebase")
             
             return purchase
@@ -665,9 +1344,10 @@ class Database:
                     session.close()
             raise RuntimeError(f"make_purchase failed for User={payer_name}, Product={product_name}, quantity={quantity}: {e}") from e
 
+    @_retry_on_write_conflict
     def deposit_cash(self, user_id: int, amount: float, salesman_id: int, session=None):
         print("🔥 [DATABASE] Logging cash deposit to Firebase...")
-        log_info("Cash deposit initiated", {"operation": "deposit_cash", "user_id": user_id, "amount": amount})
+        log_info("Cash deposit initiated", lambda: {"operation": "deposit_cash", "user_id": user_id, "amount": amount})
         print("✅ [DATABASE] Cash deposit initiation logged to Firebase")
         
         close_session = False
@@ -676,7 +1356,6 @@ class Database:
             if session is None:
                 session = self.get_session()
                 close_session = True
-            bank = self.get_bank(session)
             user = self.get_user_by_id(user_id, session)
             user_name = user.name
             amount = float(amount)
@@ -687,10 +1366,8 @@ class Database:
                 raise ValueError("Amount must be greater than 0 ")
             
             old_balance = user.balance
-            user.balance += amount
-            bank.total_balance += amount
-            bank.customer_funds += amount
-            _sync_bank_financials(bank)
+            _credit_user(session, user, amount)
+            _apply_bank_deltas(session, "deposit_cash", {"total_balance": amount, "customer_funds": amount})
             transaction = Transaction(user_id=user_id, amount=amount, type="deposit", timestamp=datetime.datetime.now().replace(second=0, microsecond=0), salesman_id=salesman_id)
             session.add(transaction)
             if close_session:
@@ -699,7 +1376,7 @@ class Database:
                 session.close()
                 
             print("🔥 [DATABASE] Logging successful cash deposit to Firebase...")
-            log_info("Cash deposit completed successfully", {"operation": "deposit_cash", "user_id": user_id, "username": user_name, "amount": amount, "old_balance": old_balance, "new_balance": user.balance})
+            log_info("Cash deposit completed successfully", lambda: {"operation": "deposit_cash", "user_id": user_id, "username": user_name, "amount": amount, "old_balance": old_balance, "new_balance": user.balance})
             print("✅ [DATABASE] Cash deposit success logged to Firebase")
             
         except Exception as e:
@@ -713,6 +1390,7 @@ class Database:
                     session.close()
             raise RuntimeError(f"deposit_cash failed for User={user_name}, amount={amount}: {e}") from e
 
+    @_retry_on_write_conflict
     def withdraw_cash(self, user_id: int, amount: float, salesman_id: int, session=None):
         close_session = False
         user_name = "404"
@@ -720,18 +1398,13 @@ class Database:
             if session is None:
                 session = self.get_session()
                 close_session = True
-            bank = self.get_bank(session)
             user = self.get_user_by_id(user_id, session)
             user_name = user.name
             amount = float(amount)
             if amount <= 0:
                 raise ValueError("Amount must be greater than 0 ")
-            if user.balance < amount:
-                raise ValueError(f"Insufficient balance {user.balance}")
-            user.balance -= amount
-            bank.total_balance -= amount
-            bank.customer_funds -= amount
-            _sync_bank_financials(bank)
+            _debit_user(session, user, amount)
+            _apply_bank_deltas(session, "withdraw_cash", {"total_balance": -amount, "customer_funds": -amount})
             transaction = Transaction(user_id=user_id, amount=amount, type="withdraw", timestamp=datetime.datetime.now().replace(second=0, microsecond=0), salesman_id=salesman_id)
             session.add(transaction)
             if close_session:
@@ -745,28 +1418,28 @@ class Database:
                     session.close()
             raise RuntimeError(f"withdraw_cash failed for User={user_name}, amount={amount}: {e}") from e
 
+    @_retry_on_write_conflict
     def withdraw_cash_from_bank(self, amount: float, salesman_id: int, description: str = "Withdrawal from bank", session=None):
         close_session = False
         try:
             if session is None:
                 session = self.get_session()
                 close_session = True
-            bank = self.get_bank(session)
             amount = float(amount)
             if amount <= 0:
                 raise ValueError("Amount must be greater than 0 ")
-            available_business_balance = bank.get_business_balance()
+            # Checked after the entry is appended: the write transaction now
+            # holds the database lock, so no other terminal can spend it too
+            _apply_bank_deltas(session, "withdraw_cash_from_bank", {"total_balance": -amount, "costs_total": amount})
+            state = _read_bank_state(session)
+            available_business_balance = state["total_balance"] - state["customer_funds"] + amount
             if available_business_balance < amount:
                 raise ValueError(f"Insufficient business balance {available_business_balance}")
-            bank.total_balance -= amount
-            bank.costs_total += amount
-            _sync_bank_financials(bank)
             # Use provided salesman_id or default to admin user
             transaction = BankTransaction(amount=amount, type="withdraw", description=description, salesman_id=salesman_id)
             session.add(transaction)
             if close_session:
                 session.commit()
-                session.refresh(bank)
                 session.close()
         except Exception as e:
             if session:
@@ -775,6 +1448,7 @@ class Database:
                     session.close()
             raise RuntimeError(f"withdraw_cash_from_bank failed for amount={amount}: {e}") from e
 
+    @_retry_on_write_conflict
     def adjust_bank_field(self, field: str, new_value: float, comment: str, salesman_id: int, session=None) -> float:
         """Directly set a source-of-truth bank field (admin-only, enforced by caller).
 
@@ -799,8 +1473,7 @@ class Database:
             bank = self.get_bank(session)
             current_value = float(getattr(bank, field) or 0.0)
             diff = new_value - current_value
-            setattr(bank, field, new_value)
-            _sync_bank_financials(bank)
+            _apply_bank_deltas(session, "adjust_bank_field", {field: diff}, bank)
             label = BANK_EDITABLE_FIELD_LABELS.get(field, field)
             description = (
                 f"Manual bank adjustment: {label} set to {new_value:.2f}EUR "
@@ -812,7 +1485,6 @@ class Database:
             session.add(transaction)
             if close_session:
                 session.commit()
-                session.refresh(bank)
                 session.close()
             return new_value
         except Exception as e:
@@ -822,6 +1494,7 @@ class Database:
                     session.close()
             raise RuntimeError(f"adjust_bank_field failed for field={field}, new_value={new_value}: {e}") from e
 
+    @_retry_on_write_conflict
     def add_toast_round(self, product_user_list: List[tuple[int, int, int]], salesman_id: int, session=None):
         close_session = False
         name_list = ["404"]
@@ -833,17 +1506,23 @@ class Database:
             toast_round = ToastRound(salesman_id=salesman_id)
             session.add(toast_round)
             session.flush()
-            unique_products = set()
+            # All slots go through one batch: products, consumers and donators
+            # are resolved up front, ingredient use is aggregated per round and
+            # the sales plus bank deltas are written in a single flush.
+            lines = [
+                (consumer_id, donator_id or None, product_id, 1)
+                for product_id, consumer_id, donator_id in product_user_list
+            ]
+            sales, checkout, _total_cost = self._apply_checkout_batch(
+                session, lines, salesman_id, toast_round_id=toast_round.toast_round_id
+            )
             name_list = []
-            for product_id, consumer_id, donator_id in product_user_list:
-                unique_products.add(product_id)
-                product = self.get_product_by_id(product_id, session)
-                consumer = self.get_user_by_id(consumer_id, session)
-                donator = self.get_user_by_id(donator_id, session) if donator_id else None
-                sale = self.make_purchase(consumer.user_id, product.product_id, 1, salesman_id, session=session, toast_round_id=toast_round.toast_round_id, donator_id=donator.user_id if donator else None)
-                toast_round.sales.append(sale)
+            for sale in sales:
+                consumer = checkout.get_user(sale.consumer_id)
+                donator = checkout.get_user(sale.donator_id) if sale.donator_id else None
                 buyer_str = f"{donator.name}({consumer.name})" if donator else f"{consumer.name}"
-                name_list.append(f"{buyer_str} bought {product.name}")
+                name_list.append(f"{buyer_str} bought {checkout.get_product(sale.product_id).name}")
+                toast_round.sales.append(sale)
             if close_session:
                 session.commit()
                 session.close()
@@ -878,10 +1557,10 @@ class Database:
             session = self.get_session()
             close_session = True
         try:
-            bank = session.query(Bank).filter_by(account_id=1).first()
+            bank = session.execute(_BANK_STMT).scalars().first()
             if not bank:
                 raise ValueError(BANK_NOT_FOUND_MSG)
-            _sync_bank_financials(bank)
+            _set_bank_state(bank, _read_bank_state(session))
             return bank
         except Exception as e:
             raise RuntimeError(f"get_bank failed: {e}") from e
@@ -889,21 +1568,150 @@ class Database:
             if close_session:
                 session.close()
 
+    @_retry_on_write_conflict
+    def compact_bank_ledger(self, session=None) -> Optional[int]:
+        """Roll the pending bank ledger entries up into a snapshot now.
+
+        Happens on its own every BANK_SNAPSHOT_INTERVAL entries; returns the
+        last entry id covered by the new snapshot, or None if nothing was pending.
+        """
+        close_session = False
+        try:
+            if session is None:
+                session = self.get_session()
+                close_session = True
+            last_entry_id = _compact_bank_ledger(session)
+            if close_session:
+                session.commit()
+                session.close()
+            return last_entry_id
+        except Exception as e:
+            if session:
+                session.rollback()
+                if close_session:
+                    session.close()
+            raise RuntimeError(f"compact_bank_ledger failed: {e}") from e
+
+    def reconcile_ledgers(self, tolerance: float = 0.005, session=None) -> Dict[str, Any]:
+        """Compare stored balances and bank totals with what the history tables imply.
+
+        - users.balance (active users): deposits - withdrawals - sales paid
+        - customer_funds: sum of all user balances
+        - revenue_total: sales - rounding credits + closed-account donations
+          + manual revenue adjustments
+        - ingredient_value: current ingredient stock valued at price_per_unit,
+          plus the pfand of every unit ever stocked (stocking books price +
+          pfand, sales and stock_history corrections only the price; units
+          stocked = stock + units sold - corrections)
+
+        Closed (deleted) accounts are skipped per user: their remaining
+        balance is collected without a user-linked record. Read-only.
+        """
+        close_session = False
+        if session is None:
+            session = self.get_read_session()
+            close_session = True
+        started_at = time.perf_counter()
+        try:
+            user_drift = []
+            users_checked = 0
+            for row in session.execute(_EXPECTED_USER_BALANCES_SQL).mappings():
+                users_checked += 1
+                drift = float(row["balance"] or 0.0) - float(row["expected_balance"])
+                if abs(drift) > tolerance:
+                    user_drift.append({
+                        "user_id": row["user_id"],
+                        "name": row["name"],
+                        "balance": round(float(row["balance"] or 0.0), 2),
+                        "expected_balance": round(float(row["expected_balance"]), 2),
+                        "drift": round(drift, 2),
+                    })
+            user_drift.sort(key=lambda entry: -abs(entry["drift"]))
+
+            expected = session.execute(_EXPECTED_BANK_TOTALS_SQL).mappings().first()
+            actual = _read_bank_state(session)
+            bank = {}
+            for field in ("customer_funds", "revenue_total", "ingredient_value"):
+                drift = float(actual[field]) - float(expected[field])
+                bank[field] = {
+                    "actual": round(float(actual[field]), 2),
+                    "expected": round(float(expected[field]), 2),
+                    "drift": round(drift, 2),
+                    "ok": abs(drift) <= tolerance,
+                }
+            report = {
+                "ok": not user_drift and all(entry["ok"] for entry in bank.values()),
+                "tolerance": tolerance,
+                "users_checked": users_checked,
+                "user_drift": user_drift,
+                "bank": bank,
+                "duration_ms": round((time.perf_counter() - started_at) * 1000, 1),
+            }
+            log_info("Ledger reconciliation finished", lambda: {"operation": "reconcile_ledgers", "ok": report["ok"], "users_with_drift": len(user_drift), "duration_ms": report["duration_ms"]})
+            return report
+        except Exception as e:
+            raise RuntimeError(f"reconcile_ledgers failed: {e}") from e
+        finally:
+            if close_session:
+                session.close()
+
+    def get_bank_history(self, field: str, limit: int = 100, session=None) -> List[Dict[str, Any]]:
+        """Changes of one bank field with the value after each change, most recent first."""
+        if field not in BANK_LEDGER_FIELDS:
+            raise ValueError(f"Unknown bank field '{field}'. Allowed fields: {list(BANK_LEDGER_FIELDS)}")
+        close_session = False
+        if session is None:
+            session = self.get_read_session()
+            close_session = True
+        try:
+            column = _BANK_LEDGER.c[field]
+            # The first snapshot is the bank as it was before the ledger existed
+            baseline = func.coalesce(
+                select(BankSnapshot.__table__.c[field]).order_by(BankSnapshot.__table__.c.snapshot_id).limit(1).scalar_subquery(),
+                select(Bank.__table__.c[field]).where(Bank.__table__.c.account_id == 1).scalar_subquery(),
+                0.0,
+            )
+            running = select(
+                _BANK_LEDGER.c.entry_id,
+                _BANK_LEDGER.c.timestamp,
+                _BANK_LEDGER.c.operation,
+                column.label("delta"),
+                (baseline + func.sum(column).over(order_by=_BANK_LEDGER.c.entry_id)).label("value"),
+            ).subquery()
+            rows = session.execute(
+                select(running).where(running.c.delta != 0).order_by(running.c.entry_id.desc()).limit(int(limit))
+            ).mappings()
+            return [
+                {
+                    "entry_id": row["entry_id"],
+                    "timestamp": row["timestamp"].isoformat() if row["timestamp"] else None,
+                    "operation": row["operation"],
+                    "delta": row["delta"],
+                    "value": row["value"],
+                }
+                for row in rows
+            ]
+        except Exception as e:
+            raise RuntimeError(f"get_bank_history failed for field={field}: {e}") from e
+        finally:
+            if close_session:
+                session.close()
+
     def get_all_users(self, session=None) -> 'List[User]':
-        """Get all users with eager loading of sales."""
+        """Get all users with eager loading of sales (see get_user_summaries for the list views)."""
         try:
             #log_debug("Fetching all active users")
             
             close_session = False
             if session is None:
-                session = self.get_session()
+                session = self.get_read_session()
                 close_session = True
             try:
                 users = User.active_only(session.query(User)).options(
                     joinedload(User.sales).joinedload(Sale.salesman)
                 ).all()
                 
-                #log_debug(f"Retrieved {len(users)} active users")
+                #log_debug(lambda: f"Retrieved {len(users)} active users")
                 return users
             except Exception as e:
                 log_error("Failed to fetch all users", exception=e)
@@ -915,6 +1723,126 @@ class Database:
             log_error("Critical error in get_all_users", exception=e)
             raise
 
+    def get_user_summaries(self, session=None) -> List[Dict[str, Any]]:
+        """Active users with sale count, total spent, last purchase and outstanding pfand, in one query.
+
+        total_spent counts what the user paid (including donations for
+        others), sale_count/last_purchase what they consumed.
+        """
+        close_session = False
+        if session is None:
+            session = self.get_read_session()
+            close_session = True
+        try:
+            return [
+                {
+                    "user_id": row["user_id"],
+                    "name": row["name"],
+                    "balance": row["balance"],
+                    "role": row["role"],
+                    "is_deleted": False,
+                    "deleted_at": None,
+                    "deleted_by": None,
+                    "is_disabled": bool(row["is_disabled"]),
+                    "disabled_reason": row["disabled_reason"],
+                    "sale_count": row["sale_count"],
+                    "total_spent": round(float(row["total_spent"]), 2),
+                    "last_purchase": row["last_purchase"],
+                    "pfand_items": row["pfand_items"],
+                    "pfand_outstanding": round(float(row["pfand_outstanding"]), 2),
+                }
+                for row in session.execute(_USER_SUMMARY_SQL).mappings()
+            ]
+        except Exception as e:
+            raise RuntimeError(f"get_user_summaries failed: {e}") from e
+        finally:
+            if close_session:
+                session.close()
+
+    def get_user_sales(self, user_id: int, page: int = 1, page_size: int = 50, before_id: Optional[int] = None,
+                       hidden_user_ids: Optional[Iterable[int]] = None, session=None) -> 'tuple[List[Sale], int]':
+        """One page of the sales a user consumed or paid for, most recent first (see get_sales_paginated).
+
+        Returns:
+            tuple: (sales_list, total_count)
+        """
+        close_session = False
+        if session is None:
+            session = self.get_read_session()
+            close_session = True
+        try:
+            involves_user = or_(Sale.consumer_id == user_id, Sale.donator_id == user_id)
+            return self._sales_page(session, involves_user, page, page_size, before_id, hidden_user_ids)
+        except Exception as e:
+            raise RuntimeError(f"get_user_sales failed for user_id={user_id}: {e}") from e
+        finally:
+            if close_session:
+                session.close()
+
+    def get_product_catalog(self, category: Optional[str] = None, session=None) -> List[Dict[str, Any]]:
+        """Active products as plain dicts with pfand and sales aggregates, in one query.
+
+        Carries the basic Product.to_dict() fields plus sale_count,
+        units_sold, revenue and last_sold; per-product sales come from
+        get_product_sales().
+        """
+        close_session = False
+        if session is None:
+            session = self.get_read_session()
+            close_session = True
+        try:
+            catalog = []
+            for row in session.execute(_PRODUCT_CATALOG_SQL, {"category": category}).mappings():
+                pricing = Product.pricing_for(row["price_per_unit"], float(row["pfand"]))
+                catalog.append({
+                    "product_id": row["product_id"],
+                    "name": row["name"],
+                    "category": row["category"],
+                    "price_per_unit": float(pricing.display_price),
+                    "base_price_per_unit": row["price_per_unit"],
+                    "rounding_difference_per_unit": float(pricing.rounding_difference),
+                    "cost_per_unit": row["cost_per_unit"],
+                    "profit_per_unit": row["profit_per_unit"],
+                    "stock_quantity": row["stock_quantity"],
+                    "toaster_space": row["toaster_space"],
+                    "is_available": bool(row["is_available"]),
+                    "is_deleted": bool(row["is_deleted"]),
+                    "deleted_at": _isoformat(row["deleted_at"]),
+                    "deleted_by": row["deleted_by"],
+                    "is_disabled": bool(row["is_disabled"]),
+                    "disabled_reason": row["disabled_reason"],
+                    "pfand": pricing.pfand,
+                    "sale_count": row["sale_count"],
+                    "units_sold": row["units_sold"],
+                    "revenue": round(float(row["revenue"]), 2),
+                    "last_sold": row["last_sold"],
+                })
+            return catalog
+        except Exception as e:
+            raise RuntimeError(f"get_product_catalog failed: {e}") from e
+        finally:
+            if close_session:
+                session.close()
+
+    def get_product_sales(self, product_id: int, page: int = 1, page_size: int = 50, before_id: Optional[int] = None,
+                          hidden_user_ids: Optional[Iterable[int]] = None, session=None) -> 'tuple[List[Sale], int]':
+        """One page of a product's sales, most recent first (see get_sales_paginated).
+
+        Returns:
+            tuple: (sales_list, total_count)
+        """
+        close_session = False
+        if session is None:
+            session = self.get_read_session()
+            close_session = True
+        try:
+            return self._sales_page(session, Sale.product_id == product_id, page, page_size, before_id, hidden_user_ids)
+        except Exception as e:
+            raise RuntimeError(f"get_product_sales failed for product_id={product_id}: {e}") from e
+        finally:
+            if close_session:
+                session.close()
+
     def get_all_products(self, session=None) -> 'List[Product]':
         """Get all products with ingredients and sales eager loaded."""
         try:
@@ -922,7 +1850,7 @@ class Database:
             
             close_session = False
             if session is None:
-                session = self.get_session()
+                session = self.get_read_session()
                 close_session = True
             try:
                 products = Product.active_only(session.query(Product)).options(
@@ -930,7 +1858,7 @@ class Database:
                     joinedload(Product.sales),
                 ).all()
                 
-                #log_debug(f"Retrieved {len(products)} active products")
+                #log_debug(lambda: f"Retrieved {len(products)} active products")
                 return products
             except Exception as e:
                 log_error("Failed to fetch all products", exception=e)
@@ -945,11 +1873,11 @@ class Database:
     def get_all_ingredients(self, eager_load=False, session=None) -> 'List[Ingredient]':
         """Get all ingredients, with optional eager loading of products."""
         try:
-            #log_debug(f"Fetching all active ingredients (eager_load={eager_load})")
+            #log_debug(lambda: f"Fetching all active ingredients (eager_load={eager_load})")
             
             close_session = False
             if session is None:
-                session = self.get_session()
+                session = self.get_read_session()
                 close_session = True
             try:
                 query = Ingredient.active_only(session.query(Ingredient))
@@ -962,7 +1890,7 @@ class Database:
                     )
                 ingredients = query.all()
                 
-                #log_debug(f"Retrieved {len(ingredients)} active ingredients")
+                #log_debug(lambda: f"Retrieved {len(ingredients)} active ingredients")
                 return ingredients
             except Exception as e:
                 log_error(f"Failed to fetch all ingredients (eager_load={eager_load})", exception=e)
@@ -975,21 +1903,22 @@ class Database:
             raise
 
 
-    def get_all_pfand_history(self, session=None) -> 'List[PfandHistory]':
-        """Get all pfand history records."""
+    def get_all_pfand_history(self, before_id: Optional[int] = None, limit: Optional[int] = None,
+                              hidden_user_ids: Optional[Iterable[int]] = None, session=None) -> 'List[PfandHistory]':
+        """Get all pfand history records (before_id/limit page newest first by id)."""
         close_session = False
         if session is None:
-            session = self.get_session()
+            session = self.get_read_session()
             close_session = True
         try:
-            query = session.query(PfandHistory)
+            query = _without_user_links(session.query(PfandHistory), hidden_user_ids, PfandHistory.user_id)
             query = query.options(
                 joinedload(PfandHistory.user),
                 joinedload(PfandHistory.product)
                     .joinedload(Product.product_ingredients)
                     .joinedload(ProductIngredient.ingredient)
             )
-            pfand_history = query.all()
+            pfand_history = _newest_first(query, PfandHistory.id, before_id, limit).all()
             return pfand_history
         except Exception as e:
             raise RuntimeError(f"get_all_pfand_history failed: {e}") from e
@@ -1004,7 +1933,7 @@ class Database:
             session = self.get_session()
             close_session = True
         try:
-            ingredient = Ingredient.active_only(session.query(Ingredient)).filter(Ingredient.ingredient_id == ingredient_id).first()
+            ingredient = session.execute(_ingredient_by_id_stmt(ingredient_id)).scalars().first()
             if not ingredient:
                 raise ValueError(f"Ingredient not found (ingredient_id={ingredient_id})")
             return ingredient
@@ -1038,7 +1967,7 @@ class Database:
             session = self.get_session()
             close_session = True
         try:
-            user = User.active_only(session.query(User)).filter(User.user_id == user_id).first()
+            user = session.execute(_user_by_id_stmt(user_id)).scalars().first()
             if not user:
                 raise ValueError(f"{USER_NOT_FOUND_MSG} (user_id={user_id})")
             return user
@@ -1055,7 +1984,7 @@ class Database:
             session = self.get_session()
             close_session = True
         try:
-            product = Product.active_only(session.query(Product)).filter(Product.product_id == product_id).first()
+            product = session.execute(_product_by_id_stmt(product_id)).scalars().first()
             if not product:
                 raise ValueError(f"Product not found (product_id={product_id})")
             return product
@@ -1100,14 +2029,20 @@ class Database:
             if close_session:
                 session.close()
 
-    def get_all_toast_rounds(self, session=None) -> 'List[ToastRound]':
-        """Get all toast rounds with sales, user, product, and toast_round_products eager loaded."""
+    def get_all_toast_rounds(self, before_id: Optional[int] = None, limit: Optional[int] = None,
+                             hidden_user_ids: Optional[Iterable[int]] = None, session=None) -> 'List[ToastRound]':
+        """Get all toast rounds with sales, user, product, and toast_round_products eager loaded.
+
+        before_id/limit page through them newest first by toast_round_id;
+        rounds rung up by hidden_user_ids are left out.
+        """
         close_session = False
         if session is None:
-            session = self.get_session()
+            session = self.get_read_session()
             close_session = True
         try:
-            toast_rounds = session.query(ToastRound).options(
+            query = _without_user_links(session.query(ToastRound), hidden_user_ids, ToastRound.salesman_id)
+            toast_rounds = _newest_first(query.options(
                 joinedload(ToastRound.salesman),
                 joinedload(ToastRound.sales).joinedload(Sale.consumer),
                 joinedload(ToastRound.sales).joinedload(Sale.donator),
@@ -1115,7 +2050,7 @@ class Database:
                 joinedload(ToastRound.sales).joinedload(Sale.product)
                     .joinedload(Product.product_ingredients)
                     .joinedload(ProductIngredient.ingredient),
-            ).all()
+            ), ToastRound.toast_round_id, before_id, limit).all()
             return toast_rounds
         except Exception as e:
             raise RuntimeError(f"get_all_toast_rounds failed: {e}") from e
@@ -1127,7 +2062,7 @@ class Database:
         """Get all sales with eager loading of user, product, toast_round, and product ingredients."""
         close_session = False
         if session is None:
-            session = self.get_session()
+            session = self.get_read_session()
             close_session = True
         try:
             sales = session.query(Sale).options(
@@ -1146,12 +2081,15 @@ class Database:
             if close_session:
                 session.close()
     
-    def get_sales_paginated(self, page=1, page_size=100, session=None) -> 'tuple[List[Sale], int]':
+    def get_sales_paginated(self, page=1, page_size=100, before_id: Optional[int] = None,
+                            hidden_user_ids: Optional[Iterable[int]] = None, session=None) -> 'tuple[List[Sale], int]':
         """Get paginated sales with eager loading of user, product, toast_round, and product ingredients.
         
         Args:
-            page: Page number (1-based)
+            page: Page number (1-based), only used without before_id
             page_size: Number of records per page
+            before_id: Keyset cursor, the last sale_id of the previous page
+            hidden_user_ids: Users whose sales are left out (in SQL, so pages stay full)
             session: Optional database session
             
         Returns:
@@ -1159,39 +2097,44 @@ class Database:
         """
         close_session = False
         if session is None:
-            session = self.get_session()
+            session = self.get_read_session()
             close_session = True
         try:
-            # Get total count first
-            total_count = session.query(Sale).count()
-            
-            # Calculate offset
-            offset = (page - 1) * page_size
-            
-            # Get paginated sales ordered by sale_id descending (most recent first)
-            sales = session.query(Sale).options(
-                joinedload(Sale.consumer),
-                joinedload(Sale.donator),
-                joinedload(Sale.salesman),
-                joinedload(Sale.product)
-                .joinedload(Product.product_ingredients)
-                .joinedload(ProductIngredient.ingredient),
-                joinedload(Sale.toast_round).joinedload(ToastRound.salesman)
-            ).order_by(Sale.sale_id.desc()).offset(offset).limit(page_size).all()
-            
-            return sales, total_count
+            return self._sales_page(session, None, page, page_size, before_id, hidden_user_ids)
         except Exception as e:
             raise RuntimeError(f"get_sales_paginated failed: {e}") from e
         finally:
             if close_session:
                 session.close()
-        
+
+    def _sales_page(self, session, criterion, page, page_size, before_id, hidden_user_ids) -> 'tuple[List[Sale], int]':
+        """Sales matching criterion, most recent first, plus their total count.
+
+        With before_id the page starts below that sale_id; page numbers fall
+        back to OFFSET and are kept for callers that still send them.
+        """
+        query = _visible_sales(session.query(Sale), hidden_user_ids)
+        if criterion is not None:
+            query = query.filter(criterion)
+        total_count = query.count()
+        sales = _newest_first(query.options(
+            joinedload(Sale.consumer),
+            joinedload(Sale.donator),
+            joinedload(Sale.salesman),
+            joinedload(Sale.product)
+            .joinedload(Product.product_ingredients)
+            .joinedload(ProductIngredient.ingredient),
+            joinedload(Sale.toast_round).joinedload(ToastRound.salesman)
+        ), Sale.sale_id, before_id, page_size)
+        if before_id is None and page > 1:
+            sales = sales.offset((page - 1) * page_size)
+        return sales.all(), total_count
 
     def get_sales_with_category(self, category: str, session=None) -> 'List[Sale]':
         """Get sales with a specific category."""
         close_session = False
         if session is None:
-            session = self.get_session()
+            session = self.get_read_session()
             close_session = True
         try:
             sales = session.query(Sale).options(
@@ -1207,11 +2150,12 @@ class Database:
             if close_session:
                 session.close()
 
-    def get_filtered_transaction(self, user_id: int, tx_type: str, session=None) -> 'List[Transaction]':
-        """Get filtered transactions."""
+    def get_filtered_transaction(self, user_id: int, tx_type: str, before_id: Optional[int] = None, limit: Optional[int] = None,
+                                 hidden_user_ids: Optional[Iterable[int]] = None, session=None) -> 'List[Transaction]':
+        """Get filtered transactions (before_id/limit page newest first by transaction_id)."""
         close_session = False
         if session is None:
-            session = self.get_session()
+            session = self.get_read_session()
             close_session = True
         try:
             query = session.query(Transaction).options(
@@ -1223,7 +2167,8 @@ class Database:
                 query = query.filter(Transaction.user_id == user_id)
             if tx_type != "all":
                 query = query.filter(Transaction.type == tx_type)
-            transactions = query.all()
+            query = _without_user_links(query, hidden_user_ids, Transaction.user_id, Transaction.salesman_id)
+            transactions = _newest_first(query, Transaction.transaction_id, before_id, limit).all()
             return transactions
         except Exception as e:
             raise RuntimeError(f"get_filtered_transaction failed: {e}") from e
@@ -1231,16 +2176,20 @@ class Database:
             if close_session:
                 session.close()
 
-    def get_bank_transaction(self, session=None) -> 'List[BankTransaction]':
-        """Get filtered transactions, most recent first."""
+    def get_bank_transaction(self, before_id: Optional[int] = None, limit: Optional[int] = None,
+                             hidden_user_ids: Optional[Iterable[int]] = None, session=None) -> 'List[BankTransaction]':
+        """Get bank transactions, most recent first (before_id/limit page by transaction_id)."""
         close_session = False
         if session is None:
-            session = self.get_session()
+            session = self.get_read_session()
             close_session = True
         try:
-            transactions = session.query(BankTransaction).options(
+            query = _without_user_links(session.query(BankTransaction), hidden_user_ids, BankTransaction.salesman_id).options(
                 joinedload(BankTransaction.salesman)
-            ).order_by(BankTransaction.transaction_id.desc()).all()
+            )
+            if before_id is None and limit is None:
+                query = query.order_by(BankTransaction.transaction_id.desc())
+            transactions = _newest_first(query, BankTransaction.transaction_id, before_id, limit).all()
             return transactions
         except Exception as e:
             raise RuntimeError(f"get_bank_transaction failed: {e}") from e
@@ -1255,10 +2204,7 @@ class Database:
             session = self.get_session()
             close_session = True
         try:
-            pfand_history = session.query(PfandHistory).filter(
-                PfandHistory.user_id == user_id,
-                PfandHistory.product_id == product_id
-            ).all()
+            pfand_history = session.execute(_pfand_history_stmt(user_id, product_id)).scalars().all()
             if len(pfand_history) > 1:
                 raise ValueError(f"Multiple pfand history records found for user_id={user_id}, product_id={product_id}")
             return pfand_history[0] if pfand_history else None
@@ -1268,6 +2214,102 @@ class Database:
             if close_session:
                 session.close()
 
+    def _product_stock_rows(self, session, product_ids=None, active_only=False):
+        """(product_id, stored stock, computed stock) rows from the snapshot query."""
+        sql = _PRODUCT_STOCK_SNAPSHOT_SQL
+        params = {}
+        conditions = []
+        if product_ids is not None:
+            product_ids = sorted(product_ids)
+            if not product_ids:
+                return []
+            conditions.append("p.product_id IN ({})".format(
+                ", ".join(f":p{index}" for index in range(len(product_ids)))
+            ))
+            params.update({f"p{index}": product_id for index, product_id in enumerate(product_ids)})
+        if active_only:
+            conditions.append("p.is_deleted = 0 AND p.is_disabled = 0")
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " GROUP BY p.product_id ORDER BY p.product_id"
+        return session.execute(text(sql), params).all()
+
+    def get_product_stock_snapshot(self, product_ids=None, active_only: bool = False, session=None) -> Dict[int, int]:
+        """Available quantity per product, computed by a single SQL aggregate.
+
+        Gives the same numbers as Product.update_stock() without loading
+        products or ingredients into the session.
+        """
+        close_session = False
+        if session is None:
+            session = self.get_read_session()
+            close_session = True
+        try:
+            return {
+                product_id: int(available)
+                for product_id, _stored, available in self._product_stock_rows(session, product_ids, active_only)
+            }
+        except Exception as e:
+            log_error("Failed to compute product stock snapshot", exception=e)
+            raise RuntimeError(f"get_product_stock_snapshot failed: {e}") from e
+        finally:
+            if close_session:
+                session.close()
+
+    def get_product_stock_mismatches(self, session=None) -> List[Dict[str, int]]:
+        """Products whose stored stock_quantity differs from the snapshot."""
+        close_session = False
+        if session is None:
+            session = self.get_read_session()
+            close_session = True
+        try:
+            return [
+                {"product_id": product_id, "stock_quantity": stored, "expected_stock_quantity": int(available)}
+                for product_id, stored, available in self._product_stock_rows(session)
+                if stored != available
+            ]
+        except Exception as e:
+            log_error("Failed to check product stock consistency", exception=e)
+            raise RuntimeError(f"get_product_stock_mismatches failed: {e}") from e
+        finally:
+            if close_session:
+                session.close()
+
+    def sync_product_stock(self, product_ids=None, session=None) -> int:
+        """Write the snapshot into products.stock_quantity; returns the number of rows changed."""
+        close_session = False
+        if session is None:
+            session = self.get_session()
+            close_session = True
+        try:
+            changes = [
+                {"product_id": product_id, "stock_quantity": int(available)}
+                for product_id, stored, available in self._product_stock_rows(session, product_ids)
+                if stored != available
+            ]
+            if changes:
+                session.execute(
+                    text("UPDATE products SET stock_quantity = :stock_quantity WHERE product_id = :product_id"),
+                    changes,
+                )
+                # Keep already loaded products in line with the rows just written
+                for change in changes:
+                    product = session.identity_map.get(identity_key(Product, change["product_id"]))
+                    if product is not None:
+                        set_committed_value(product, "stock_quantity", change["stock_quantity"])
+            if close_session:
+                session.commit()
+            log_debug(lambda: f"Synced product stock from snapshot ({len(changes)} changed)")
+            return len(changes)
+        except Exception as e:
+            session.rollback()
+            log_error("Failed to sync product stock", exception=e)
+            raise RuntimeError(f"sync_product_stock failed: {e}") from e
+        finally:
+            if close_session:
+                session.close()
+
+    @_retry_on_write_conflict
     def update_stock(self, ingredient_id: int, amount: int, comment: str = "", session=None) -> None:
         """Update the stock of an ingredient."""
         close_session = False
@@ -1281,19 +2323,11 @@ class Database:
             amount = int(amount)
             if amount < 0:
                 raise ValueError("Amount must be greater than or equal to 0")
-            amount_diff = amount - ingredient.stock_quantity
-            ingredient.stock_quantity = amount
-            bank = self.get_bank(session)
-            bank.ingredient_value += ingredient.price_per_unit * amount_diff
+            amount_diff = _set_ingredient_stock(session, ingredient, amount)
+            _apply_bank_deltas(session, "update_stock", {"ingredient_value": ingredient.price_per_unit * amount_diff})
             stock_history = StockHistory(ingredient_id=ingredient_id, amount=amount_diff, comment=comment, timestamp=datetime.datetime.now().replace(second=0, microsecond=0))
             session.add(stock_history)
             
-            # Update product stock quantities that depend on this ingredient
-            for product_assoc in ingredient.ingredient_products:
-                product = product_assoc.product
-                if product:  # Make sure the product exists
-                    product.update_stock()
-            
             if close_session:
                 session.commit()
                 session.refresh(stock_history)
@@ -1310,7 +2344,7 @@ class Database:
         """Get the stock history for a ingredient."""
         close_session = False
         if session is None:
-            session = self.get_session()
+            session = self.get_read_session()
             close_session = True
         try:
             stock_history = session.query(StockHistory).options(
@@ -1325,16 +2359,16 @@ class Database:
             if close_session:
                 session.close()
 
-    def get_all_stock_history(self, session=None) -> 'List[StockHistory]':
-        """Get all stocks"""
+    def get_all_stock_history(self, before_id: Optional[int] = None, limit: Optional[int] = None, session=None) -> 'List[StockHistory]':
+        """Get all stock changes (before_id/limit page newest first by history_id)."""
         close_session = False
         if session is None:
-            session = self.get_session()
+            session = self.get_read_session()
             close_session = True
         try:
-            stock_history = session.query(StockHistory).options(
+            stock_history = _newest_first(session.query(StockHistory).options(
                 joinedload(StockHistory.ingredient)
-            ).all()
+            ), StockHistory.history_id, before_id, limit).all()
             return stock_history
         except Exception as e:
             raise RuntimeError(f"get_all_stock_history failed: {e}") from e
@@ -1708,15 +2742,10 @@ class Database:
     def _reset_connection(self):
         """Reset database connection after restore"""
         try:
-            if hasattr(self, 'session') and self.session:
-                self.session.close()
-            
-            # Reset global database state
+            # Reset global database state (also discards the scoped sessions);
+            # the next access to self.session recreates the engine
             from chame_app.database import reset_database
             reset_database()
-            
-            # Reinitialize session
-            self.session = get_session()
             print("🔄 Database connection reset successfully")
             
         except Exception as e:
@@ -1991,5 +3020,8 @@ class Database:
             print(f"safe_delete_ingredient error: {e}")
             raise RuntimeError(f"Failed to delete ingredient: {e}") from e
 
+# Opt-in spans around every public method (see utils.perf_tracing)
+trace_public_methods(Database)
+
 # Initialize database instance when module is imported
 # database = Database()
\ No newline at end of file
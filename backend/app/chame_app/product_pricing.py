@@ -0,0 +1,129 @@
+"""
+Process-wide pricing table (product_id -> ProductPricing).
+
+Product prices only change when a product's price_per_unit, an ingredient's
+pfand or a product's ingredient links change, so checkout and to_dict() read
+the per-unit prices from here instead of recomputing the pfand and the
+Decimal conversions on every call. Attribute events drop affected entries as
+soon as a value is assigned, and again after the transaction commits or rolls
+back so no session keeps an uncommitted price.
+
+An entry is only returned to a product whose own price_per_unit and pfand
+still match it: a session that loaded the product before another session
+committed a price change must neither be served the new price nor put its
+old one back for everyone else.
+"""
+
+import threading
+from decimal import Decimal
+from typing import Dict, Optional, Set
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+from chame_app.database import get_engine_generation
+from models.ingredient import Ingredient
+from models.product_ingredient_table import ProductIngredient
+from models.product_table import Product, ProductPricing
+
+CHANGED_PRODUCTS_KEY = "pricing_changed_products"
+_ALL = None  # marker in CHANGED_PRODUCTS_KEY sets: every product changed
+
+
+class ProductPricingTable:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: Dict[int, ProductPricing] = {}
+        self._generation = get_engine_generation()
+        self._rounding_enabled = Product.TRANSACTION_ROUNDING_ENABLED
+
+    def get(self, product: Product) -> ProductPricing:
+        product_id = product.product_id
+        if product_id is None:
+            return product.compute_pricing()
+        price_per_unit = product.price_per_unit
+        pfand = product._compute_pfand()
+        with self._lock:
+            if (self._generation != get_engine_generation()
+                    or self._rounding_enabled != Product.TRANSACTION_ROUNDING_ENABLED):
+                self._clear()
+            entry = self._entries.get(product_id)
+            if (entry is not None and entry.pfand == pfand
+                    and entry.base_price == Decimal(str(price_per_unit or 0.0))):
+                return entry
+            entry = Product.pricing_for(price_per_unit, pfand)
+            self._entries[product_id] = entry
+            return entry
+
+    def invalidate(self, product_ids: Optional[Set[int]] = None) -> None:
+        with self._lock:
+            if product_ids is None:
+                self._clear()
+            else:
+                for product_id in product_ids:
+                    self._entries.pop(product_id, None)
+
+    def _clear(self) -> None:
+        self._entries = {}
+        self._generation = get_engine_generation()
+        self._rounding_enabled = Product.TRANSACTION_ROUNDING_ENABLED
+
+    def __len__(self):
+        return len(self._entries)
+
+
+pricing_table = ProductPricingTable()
+Product.pricing_table = pricing_table
+
+
+def _price_changed(target, product_id) -> None:
+    """Drop the entry now and remember to drop it again at the end of the transaction."""
+    product_ids = None if product_id is _ALL else {product_id}
+    pricing_table.invalidate(product_ids)
+    session = object_session(target)
+    if session is not None:
+        changed = session.info.setdefault(CHANGED_PRODUCTS_KEY, set())
+        changed.add(product_id)
+
+
+@event.listens_for(Product.price_per_unit, "set")
+def _on_product_price_set(target, _value, _old, _initiator):
+    if target.product_id is not None:
+        _price_changed(target, target.product_id)
+
+
+@event.listens_for(Product.product_ingredients, "append")
+@event.listens_for(Product.product_ingredients, "remove")
+def _on_product_ingredients_changed(target, _value, _initiator):
+    if target.product_id is not None:
+        _price_changed(target, target.product_id)
+
+
+@event.listens_for(ProductIngredient.ingredient_quantity, "set")
+@event.listens_for(ProductIngredient.ingredient, "set")
+def _on_link_changed(target, _value, _old, _initiator):
+    if target.product_id is not None:
+        _price_changed(target, target.product_id)
+
+
+@event.listens_for(ProductIngredient, "after_insert")
+@event.listens_for(ProductIngredient, "after_delete")
+def _on_link_written(_mapper, _connection, target):
+    if target.product_id is not None:
+        _price_changed(target, target.product_id)
+
+
+@event.listens_for(Ingredient.pfand, "set")
+def _on_pfand_set(target, _value, _old, _initiator):
+    # Rare; not worth finding the products that use this ingredient
+    _price_changed(target, _ALL)
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def _invalidate_after_transaction(session):
+    changed = session.info.pop(CHANGED_PRODUCTS_KEY, None)
+    if not changed:
+        return
+    pricing_table.invalidate(None if _ALL in changed else changed)
+
@@ -0,0 +1,107 @@
+"""
+Role membership cache (role -> user ids).
+
+God/admin ids are read on every filtered list call and on checkouts with
+rounding. They change only when users are added, change role, or are soft
+deleted / restored, so they are cached per database (engine generation,
+see reset_database()) and invalidated by ORM events on User: at flush and
+again at commit/rollback.
+
+The cache is filled from a fresh connection, never from the caller's
+transaction, whose snapshot may predate a commit that already invalidated
+it. A session with an unflushed or uncommitted role change of its own gets
+its view computed from its own transaction and not cached.
+"""
+
+import threading
+from typing import Dict, FrozenSet, Tuple
+
+from sqlalchemy import event, inspect, text
+from sqlalchemy.orm import Session
+
+from chame_app.database import get_engine_generation
+from models.user_table import User
+
+ROLES_CHANGED_KEY = "user_roles_changed"
+_WATCHED_ATTRIBUTES = ("role", "is_deleted", "is_disabled")
+
+
+class RoleCache:
+    """role -> user ids (all and active only), shared by all sessions of one database."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._generation = None
+        self._members: Dict[Tuple[str, bool], FrozenSet[int]] = {}
+        self._stale = True
+        self.builds = 0
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._stale = True
+
+    def user_ids(self, session, role: str, active_only: bool = False) -> FrozenSet[int]:
+        if session.info.get(ROLES_CHANGED_KEY):
+            # this session's own change is not committed yet
+            return _load_members(session).get((role, active_only), frozenset())
+        with self._lock:
+            if self._stale or self._generation != get_engine_generation():
+                self._rebuild(session)
+            return self._members.get((role, active_only), frozenset())
+
+    def _rebuild(self, session) -> None:
+        # Runs under the lock, so an invalidate() for a commit this read
+        # missed waits and marks the result stale again
+        with session.get_bind().connect() as connection:
+            self._members = _load_members(connection)
+        self._generation = get_engine_generation()
+        self._stale = False
+        self.builds += 1
+
+
+def _load_members(executor) -> Dict[Tuple[str, bool], FrozenSet[int]]:
+    members: Dict[Tuple[str, bool], set] = {}
+    for user_id, role, is_deleted, is_disabled in executor.execute(
+        text("SELECT user_id, role, is_deleted, is_disabled FROM users")
+    ):
+        members.setdefault((role, False), set()).add(user_id)
+        if not is_deleted and not is_disabled:
+            members.setdefault((role, True), set()).add(user_id)
+    return {key: frozenset(ids) for key, ids in members.items()}
+
+
+role_cache = RoleCache()
+
+
+def _roles_changed(session) -> None:
+    session.info[ROLES_CHANGED_KEY] = True
+    role_cache.invalidate()
+
+
+def _role_inputs_changed(user) -> bool:
+    state = inspect(user)
+    return any(state.attrs[attr].history.has_changes() for attr in _WATCHED_ATTRIBUTES)
+
+
+@event.listens_for(Session, "before_flush")
+def _watch_user_changes(session, _flush_context, _instances):
+    # Balance updates on every checkout must not invalidate the cache
+    if any(isinstance(obj, User) for obj in session.new) or any(
+        isinstance(obj, User) for obj in session.deleted
+    ) or any(isinstance(obj, User) and _role_inputs_changed(obj) for obj in session.dirty):
+        _roles_changed(session)
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def _invalidate_after_transaction(session):
+    if session.info.pop(ROLES_CHANGED_KEY, False):
+        role_cache.invalidate()
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _invalidate_on_bulk_user_change(orm_execute_state):
+    if (orm_execute_state.is_update or orm_execute_state.is_delete) and any(
+        mapper.class_ is User for mapper in orm_execute_state.all_mappers
+    ):
+        _roles_changed(orm_execute_state.session)
@@ -5,13 +5,17 @@
 from sqlalchemy import text, inspect
 from typing import Dict, List
 import logging
+import zlib
 
 logger = logging.getLogger(__name__)
 
 # Firebase logging support
 try:
-    from utils.firebase_logger import log_to_firebase
+    from utils.firebase_logger import log_to_firebase as _log_to_firebase
     FIREBASE_LOGGING_AVAILABLE = True
+
+    def log_to_firebase(level, message, **metadata):
+        _log_to_firebase(level, message, subsystem="migrations", **metadata)
 except ImportError:
     FIREBASE_LOGGING_AVAILABLE = False
     
@@ -145,6 +149,33 @@ class SimpleMigrations:
                 -- Create foreign key relationships (SQLite doesn't enforce them strictly, but good for documentation)
                 -- Note: In SQLite, we can't add foreign key constraints to existing tables easily
                 -- The relationships are defined in the SQLAlchemy models instead
+            """,
+            "007_add_bank_ledger": """
+                -- Append-only deltas of the bank totals
+                CREATE TABLE IF NOT EXISTS bank_ledger (
+                    entry_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    timestamp DATETIME,
+                    operation VARCHAR NOT NULL,
+                    total_balance FLOAT NOT NULL DEFAULT 0.0,
+                    customer_funds FLOAT NOT NULL DEFAULT 0.0,
+                    revenue_total FLOAT NOT NULL DEFAULT 0.0,
+                    costs_total FLOAT NOT NULL DEFAULT 0.0,
+                    product_value FLOAT NOT NULL DEFAULT 0.0,
+                    ingredient_value FLOAT NOT NULL DEFAULT 0.0
+                );
+
+                -- Bank totals rolled up over the ledger up to last_entry_id
+                CREATE TABLE IF NOT EXISTS bank_snapshots (
+                    snapshot_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    last_entry_id INTEGER NOT NULL DEFAULT 0,
+                    timestamp DATETIME,
+                    total_balance FLOAT NOT NULL DEFAULT 0.0,
+                    customer_funds FLOAT NOT NULL DEFAULT 0.0,
+                    revenue_total FLOAT NOT NULL DEFAULT 0.0,
+                    costs_total FLOAT NOT NULL DEFAULT 0.0,
+                    product_value FLOAT NOT NULL DEFAULT 0.0,
+                    ingredient_value FLOAT NOT NULL DEFAULT 0.0
+                );
             """
             # Add more migrations here as needed
         }
@@ -684,6 +715,37 @@ class SimpleMigrations:
                 "INSERT OR IGNORE INTO schema_migrations (version) VALUES (:version)"
             ), {"version": f"advanced_{migration_name}"})
 
+    def get_schema_stamp(self, metadata=None) -> int:
+        """Fingerprint of the schema this code expects, kept in PRAGMA user_version.
+
+        Covers every regular and advanced migration plus the table/column
+        layout of the SQLAlchemy models, so adding either one changes the stamp
+        and forces the full create_all + migration check on the next start.
+        """
+        if metadata is None:
+            from chame_app.database import Base
+            metadata = Base.metadata
+        parts = sorted(self.migrations.keys())
+        parts.extend(f"advanced_{name}" for name in sorted(self._get_advanced_migrations().keys()))
+        for table in sorted(metadata.tables.values(), key=lambda t: t.name):
+            parts.extend(f"{table.name}.{column.name}" for column in table.columns)
+        return zlib.crc32("\n".join(parts).encode("utf-8")) & 0x7FFFFFFF
+
+    def is_schema_current(self, metadata=None) -> bool:
+        """True if the database was stamped with the current schema stamp"""
+        try:
+            with self.engine.connect() as conn:
+                current = conn.exec_driver_sql("PRAGMA user_version").scalar()
+        except Exception:
+            return False
+        return current == self.get_schema_stamp(metadata)
+
+    def stamp_schema(self, metadata=None):
+        """Record that create_all and all migrations succeeded for this schema"""
+        stamp = int(self.get_schema_stamp(metadata))
+        with self.engine.begin() as conn:
+            conn.exec_driver_sql(f"PRAGMA user_version = {stamp}")
+
     def set_fresh_database_flag(self):
         """Mark this as a fresh database that was just created"""
         self._is_fresh_database = True
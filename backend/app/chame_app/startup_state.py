@@ -0,0 +1,107 @@
+"""
+Startup state sidecar used by the warm-start path of Database.__init__.
+
+Product stock is derived from ingredient stock and the product/ingredient
+links. Instead of recomputing every product on each start we keep a small
+JSON snapshot of those inputs next to the database file and only recompute
+products whose inputs changed since the snapshot was taken.
+"""
+
+import json
+import os
+import zlib
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+from sqlalchemy import text
+
+STARTUP_STATE_SUFFIX = ".startup.json"
+STARTUP_STATE_VERSION = 1
+
+
+def get_startup_state_path(engine) -> Optional[Path]:
+    database = getattr(getattr(engine, "url", None), "database", None)
+    if not database:
+        return None
+    return Path(database + STARTUP_STATE_SUFFIX)
+
+
+def load_startup_state(engine) -> Optional[dict]:
+    path = get_startup_state_path(engine)
+    if path is None or not path.exists():
+        return None
+    try:
+        with path.open("r", encoding="utf-8") as handle:
+            state = json.load(handle)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(state, dict) or state.get("version") != STARTUP_STATE_VERSION:
+        return None
+    return state
+
+
+def save_startup_state(engine, state: dict) -> None:
+    path = get_startup_state_path(engine)
+    if path is None:
+        return
+    tmp_path = path.with_name(path.name + ".tmp")
+    try:
+        with tmp_path.open("w", encoding="utf-8") as handle:
+            json.dump(state, handle)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"⚠️ Could not write startup state: {e}")
+
+
+def capture_stock_inputs(session, schema_stamp: int) -> dict:
+    """Snapshot everything Product.update_stock() reads, keyed by id."""
+    ingredients = {
+        str(row[0]): [row[1], bool(row[2]), bool(row[3])]
+        for row in session.execute(text(
+            "SELECT ingredient_id, stock_quantity, is_deleted, is_disabled FROM ingredients"
+        ))
+    }
+    links: Dict[str, List[list]] = {}
+    for product_id, ingredient_id, quantity in session.execute(text(
+        "SELECT product_id, ingredient_id, ingredient_quantity FROM product_ingredient "
+        "ORDER BY product_id, ingredient_id"
+    )):
+        links.setdefault(str(product_id), []).append([ingredient_id, quantity])
+    products = [row[0] for row in session.execute(text("SELECT product_id FROM products ORDER BY product_id"))]
+
+    payload = json.dumps([ingredients, links, products], sort_keys=True)
+    return {
+        "version": STARTUP_STATE_VERSION,
+        "schema_stamp": schema_stamp,
+        "checksum": zlib.crc32(payload.encode("utf-8")),
+        "ingredients": ingredients,
+        "links": links,
+        "products": products,
+    }
+
+
+def get_stale_product_ids(previous: Optional[dict], current: dict) -> Optional[Set[int]]:
+    """Products whose stock inputs changed, or None if everything must be recomputed."""
+    if not previous or previous.get("schema_stamp") != current["schema_stamp"]:
+        return None
+    if previous.get("checksum") == current["checksum"]:
+        return set()
+
+    old_ingredients = previous.get("ingredients", {})
+    changed_ingredients = {
+        ingredient_id
+        for ingredient_id in set(old_ingredients) | set(current["ingredients"])
+        if old_ingredients.get(ingredient_id) != current["ingredients"].get(ingredient_id)
+    }
+
+    old_links = previous.get("links", {})
+    old_products = set(previous.get("products", []))
+    stale = set()
+    for product_id in current["products"]:
+        key = str(product_id)
+        product_links = current["links"].get(key, [])
+        if product_id not in old_products or old_links.get(key, []) != product_links:
+            stale.add(product_id)
+        elif any(str(ingredient_id) in changed_ingredients for ingredient_id, _ in product_links):
+            stale.add(product_id)
+    return stale
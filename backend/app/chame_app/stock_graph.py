@@ -0,0 +1,146 @@
+"""
+Incremental maintenance of derived product stock.
+
+Product.stock_quantity is derived from the stock of its ingredients. Code that
+changes ingredient stock only marks the ingredient dirty on its session; at
+the next flush (or at commit, if nothing else needs flushing) the
+ingredient→product dependency graph maps the dirty ingredients to the
+affected products and each of them is recomputed exactly once.
+
+The graph is built from the product_ingredient table on first use and rebuilt
+only after ProductIngredient rows were inserted, updated or deleted (at flush,
+and again at commit/rollback so no other session keeps a pre-commit view) or
+after reset_database() switched to another file.
+"""
+
+import threading
+from typing import Dict, Iterable, Set
+
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy.orm.util import identity_key
+
+from chame_app.database import get_engine_generation
+from models.product_ingredient_table import ProductIngredient
+from models.product_table import Product
+
+DIRTY_INGREDIENTS_KEY = "dirty_stock_ingredients"
+LINKS_CHANGED_KEY = "product_ingredient_links_changed"
+
+
+class ProductStockGraph:
+    """ingredient_id -> product_ids, shared by all sessions of one database."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._generation = None
+        self._products_by_ingredient: Dict[int, Set[int]] = {}
+        self._stale = True
+        self.builds = 0
+
+    def invalidate(self) -> None:
+        self._stale = True
+
+    def products_for(self, session, ingredient_ids: Iterable[int]) -> Set[int]:
+        with self._lock:
+            if self._stale or self._generation != get_engine_generation():
+                self._rebuild(session)
+            products_by_ingredient = self._products_by_ingredient
+        product_ids: Set[int] = set()
+        for ingredient_id in ingredient_ids:
+            product_ids |= products_by_ingredient.get(ingredient_id, set())
+        return product_ids
+
+    def _rebuild(self, session) -> None:
+        graph: Dict[int, Set[int]] = {}
+        for product_id, ingredient_id in session.execute(
+            text("SELECT product_id, ingredient_id FROM product_ingredient")
+        ):
+            graph.setdefault(ingredient_id, set()).add(product_id)
+        self._products_by_ingredient = graph
+        self._generation = get_engine_generation()
+        self._stale = False
+        self.builds += 1
+
+
+stock_graph = ProductStockGraph()
+
+
+def mark_ingredient_dirty(session, ingredient) -> None:
+    """Recompute the stock of every product using this ingredient at the next flush."""
+    session.info.setdefault(DIRTY_INGREDIENTS_KEY, set()).add(ingredient.ingredient_id)
+
+
+def _load_products(session, product_ids: Set[int]):
+    products = []
+    missing = []
+    for product_id in product_ids:
+        product = session.identity_map.get(identity_key(Product, product_id))
+        if product is not None and "product_ingredients" in product.__dict__:
+            products.append(product)
+        else:
+            missing.append(product_id)
+    if missing:
+        products.extend(
+            session.query(Product)
+            .options(selectinload(Product.product_ingredients).joinedload(ProductIngredient.ingredient))
+            .filter(Product.product_id.in_(missing))
+            .all()
+        )
+    return products
+
+
+def _recompute_pending_products(session) -> None:
+    dirty = session.info.pop(DIRTY_INGREDIENTS_KEY, None)
+    if not dirty:
+        return
+    for product in _load_products(session, stock_graph.products_for(session, dirty)):
+        product.update_stock()
+
+
+@event.listens_for(Session, "before_flush")
+def _recompute_dirty_products(session, _flush_context, _instances):
+    _recompute_pending_products(session)
+
+
+@event.listens_for(Session, "before_commit")
+def _recompute_before_commit(session):
+    # Stock changed with relative UPDATEs leaves no dirty ORM object behind,
+    # so a transaction may reach commit without any flush
+    _recompute_pending_products(session)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_dirty_ingredients(session):
+    session.info.pop(DIRTY_INGREDIENTS_KEY, None)
+
+
+def _links_changed(session) -> None:
+    session.info[LINKS_CHANGED_KEY] = True
+    stock_graph.invalidate()
+
+
+@event.listens_for(Session, "before_flush")
+def _watch_link_changes(session, _flush_context, _instances):
+    if any(
+        isinstance(obj, ProductIngredient)
+        for objects in (session.new, session.dirty, session.deleted)
+        for obj in objects
+    ):
+        _links_changed(session)
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def _invalidate_after_transaction(session):
+    # Another session may have rebuilt the graph between our flush and commit
+    if session.info.pop(LINKS_CHANGED_KEY, False):
+        stock_graph.invalidate()
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _invalidate_on_bulk_link_change(orm_execute_state):
+    if (orm_execute_state.is_update or orm_execute_state.is_delete) and any(
+        mapper.class_ is ProductIngredient for mapper in orm_execute_state.all_mappers
+    ):
+        _links_changed(orm_execute_state.session)
@@ -0,0 +1,29 @@
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from chame_app.database import reset_database
+from chame_app.database_instance import Database
+import services.admin_api as api
+
+
+@pytest.fixture
+def private_storage(tmp_path, monkeypatch):
+    """Point PRIVATE_STORAGE at tmp_path and drop the cached engine and Database."""
+    monkeypatch.setenv("PRIVATE_STORAGE", str(tmp_path))
+    monkeypatch.delenv("HOME", raising=False)
+    monkeypatch.delenv("CHAME_SQLITE_PROFILE", raising=False)
+    reset_database()
+    api._database = None
+    return tmp_path
+
+
+@pytest.fixture
+def db(private_storage, monkeypatch):
+    """A fresh Database in tmp_path, also the one services.admin_api talks to."""
+    database = Database(apply_migrations=False)
+    monkeypatch.setattr(api, "database", database)
+    return database
@@ -81,6 +81,58 @@ class Bank(Base):
             "break_even_reached": self.is_break_even_reached(),
         }
 
+# Source-of-truth bank columns; every change to them is appended to the
+# bank ledger as a delta (see chame_app.database_instance._apply_bank_deltas)
+BANK_LEDGER_FIELDS = (
+    "total_balance",
+    "customer_funds",
+    "revenue_total",
+    "costs_total",
+    "product_value",
+    "ingredient_value",
+)
+
+
+class BankLedgerEntry(Base):
+    """Append-only change to the bank totals; one row per money-moving operation."""
+    __tablename__ = "bank_ledger"
+
+    entry_id = Column(Integer, primary_key=True, autoincrement=True)
+    timestamp = Column(DateTime, default=datetime.datetime.utcnow)
+    operation = Column(String, nullable=False)
+    total_balance = Column(Float, nullable=False, default=0.0)
+    customer_funds = Column(Float, nullable=False, default=0.0)
+    revenue_total = Column(Float, nullable=False, default=0.0)
+    costs_total = Column(Float, nullable=False, default=0.0)
+    product_value = Column(Float, nullable=False, default=0.0)
+    ingredient_value = Column(Float, nullable=False, default=0.0)
+
+    def to_dict(self):
+        data = {
+            "entry_id": self.entry_id,
+            "timestamp": self.timestamp.isoformat() if self.timestamp else None,
+            "operation": self.operation,
+        }
+        for field in BANK_LEDGER_FIELDS:
+            data[field] = getattr(self, field)
+        return data
+
+
+class BankSnapshot(Base):
+    """Bank totals rolled up over all ledger entries up to last_entry_id."""
+    __tablename__ = "bank_snapshots"
+
+    snapshot_id = Column(Integer, primary_key=True, autoincrement=True)
+    last_entry_id = Column(Integer, nullable=False, default=0)
+    timestamp = Column(DateTime, default=datetime.datetime.utcnow)
+    total_balance = Column(Float, nullable=False, default=0.0)
+    customer_funds = Column(Float, nullable=False, default=0.0)
+    revenue_total = Column(Float, nullable=False, default=0.0)
+    costs_total = Column(Float, nullable=False, default=0.0)
+    product_value = Column(Float, nullable=False, default=0.0)
+    ingredient_value = Column(Float, nullable=False, default=0.0)
+
+
 class BankTransaction(Base):
     __tablename__ = "bank_transactions"
 
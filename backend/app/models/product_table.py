@@ -1,14 +1,28 @@
+import math
 from decimal import Decimal
+from typing import NamedTuple
 from sqlalchemy import Column, Integer, String, Float
 from sqlalchemy.orm import relationship
 from chame_app.database import Base
 from models.enhanced_soft_delete_mixin import EnhancedSoftDeleteMixin, SoftDeleteCascadeRule, HardDeleteCascadeRule
-from utils.firebase_logger import log_error
+from utils.firebase_logger import log_debug, log_error
+
+
+class ProductPricing(NamedTuple):
+    """Per-unit prices of a product, see Product.compute_pricing()."""
+    base_price: Decimal            # price_per_unit as stored
+    display_price: Decimal         # base price rounded to cents
+    checkout_price: Decimal        # display price incl. transaction suffix
+    rounding_difference: Decimal   # checkout_price - display_price
+    pfand: float                   # deposit per unit
+    unit_total: Decimal            # base price + deposit per unit
 
 
 class Product(Base, EnhancedSoftDeleteMixin):
     __tablename__ = "products"
     TRANSACTION_ROUNDING_ENABLED = False
+    # Set by chame_app.product_pricing; without it prices are computed on every call
+    pricing_table = None
 
     # Define cascade rules for products
     _cascade_rules = [
@@ -67,28 +81,29 @@ class Product(Base, EnhancedSoftDeleteMixin):
             quantity_needed = assoc.ingredient_quantity
 
             if not ingredient:
-                print(f"Ingredient with ID {assoc.ingredient_id} not found.")
+                log_debug(lambda: f"Ingredient with ID {assoc.ingredient_id} not found.", subsystem="database")
                 self.stock_quantity = 0
                 break
 
             # Check if ingredient is deleted/unavailable
             if hasattr(ingredient, 'is_deleted') and ingredient.is_deleted:
-                print(f"Ingredient {ingredient.name} is deleted - setting product stock to 0")
+                log_debug(lambda: f"Ingredient {ingredient.name} is deleted - setting product stock to 0", subsystem="database")
                 self.stock_quantity = 0
                 break
             
             if hasattr(ingredient, 'is_available') and not ingredient.is_available:
-                print(f"Ingredient {ingredient.name} is unavailable - setting product stock to 0")
+                log_debug(lambda: f"Ingredient {ingredient.name} is unavailable - setting product stock to 0", subsystem="database")
                 self.stock_quantity = 0
                 break
 
             if quantity_needed <= 0:
-                print(f"Invalid quantity needed for ingredient {ingredient.name}")
+                log_debug(lambda: f"Invalid quantity needed for ingredient {ingredient.name}", subsystem="database")
                 continue
 
             # Calculate how many products can be made from this ingredient
+            # (floor of the true quotient, same as Database.get_product_stock_snapshot)
             ingredient_stock = ingredient.stock_quantity
-            max_product_qty = ingredient_stock // quantity_needed
+            max_product_qty = math.floor(ingredient_stock / quantity_needed)
 
             self.stock_quantity = min(self.stock_quantity, max_product_qty)
 
@@ -96,12 +111,9 @@ class Product(Base, EnhancedSoftDeleteMixin):
         if self.stock_quantity == float('inf'):
             self.stock_quantity = 0
 
-        print(f"Stock updated for product: {self.name} -> {self.stock_quantity}")
+        log_debug(lambda: f"Stock updated for product: {self.name} -> {self.stock_quantity}", subsystem="database")
 
-    def get_pfand(self) -> float:
-        """
-        Calculate the total deposit price for the product based on its ingredients.
-        """
+    def _compute_pfand(self) -> float:
         total_deposit = 0.0
         for assoc in self.product_ingredients:
             ingredient = assoc.ingredient
@@ -109,6 +121,37 @@ class Product(Base, EnhancedSoftDeleteMixin):
                 total_deposit += ingredient.pfand * assoc.ingredient_quantity
         return total_deposit
 
+    def compute_pricing(self) -> ProductPricing:
+        """Compute the per-unit prices from price_per_unit and the ingredients' pfand."""
+        return self.pricing_for(self.price_per_unit, self._compute_pfand())
+
+    @classmethod
+    def pricing_for(cls, price_per_unit: float, pfand: float) -> ProductPricing:
+        """Per-unit prices for a stored price_per_unit and per-unit pfand (no ORM object needed)."""
+        base_price = Decimal(str(price_per_unit or 0.0))
+        display_price = cls._get_display_decimal(price_per_unit)
+        checkout_price = cls._append_transaction_suffix(display_price)
+        return ProductPricing(
+            base_price=base_price,
+            display_price=display_price,
+            checkout_price=checkout_price,
+            rounding_difference=checkout_price - display_price,
+            pfand=pfand,
+            unit_total=base_price + Decimal(str(pfand)),
+        )
+
+    def get_pricing(self) -> ProductPricing:
+        """Per-unit prices, served from the pricing table when available."""
+        if Product.pricing_table is not None:
+            return Product.pricing_table.get(self)
+        return self.compute_pricing()
+
+    def get_pfand(self) -> float:
+        """
+        Calculate the total deposit price for the product based on its ingredients.
+        """
+        return self.get_pricing().pfand
+
     @classmethod
     def _get_display_decimal(cls, amount: float) -> Decimal:
         if amount is None:
@@ -130,25 +173,25 @@ class Product(Base, EnhancedSoftDeleteMixin):
         return Decimal(f"{visible_amount}9")
 
     def get_display_price_per_unit(self) -> float:
-        return float(self._get_display_decimal(self.price_per_unit))
+        return float(self.get_pricing().display_price)
 
     def get_checkout_price_per_unit(self) -> float:
-        return float(self._append_transaction_suffix(self._get_display_decimal(self.price_per_unit)))
+        return float(self.get_pricing().checkout_price)
 
     def get_rounding_difference_per_unit(self) -> float:
-        return float(self._append_transaction_suffix(self._get_display_decimal(self.price_per_unit)) - self._get_display_decimal(self.price_per_unit))
+        return float(self.get_pricing().rounding_difference)
+
+    def _get_base_total_decimal(self, quantity) -> Decimal:
+        return (self.get_pricing().unit_total * Decimal(str(quantity))).quantize(Decimal("0.01"))
 
     def get_base_total_price(self, quantity: int = 1) -> float:
-        base_total = Decimal(str(self.price_per_unit or 0.0)) * Decimal(str(quantity))
-        pfand_total = Decimal(str(self.get_pfand())) * Decimal(str(quantity))
-        return float((base_total + pfand_total).quantize(Decimal("0.01")))
+        return float(self._get_base_total_decimal(quantity))
 
     def get_checkout_total_price(self, quantity: int = 1) -> float:
-        visible_total = Decimal(str(self.get_base_total_price(quantity)))
-        return float(self._append_transaction_suffix(visible_total))
+        return float(self._append_transaction_suffix(self._get_base_total_decimal(quantity)))
 
     def get_rounding_difference_total(self, quantity: int = 1) -> float:
-        visible_total = Decimal(str(self.get_base_total_price(quantity)))
+        visible_total = self._get_base_total_decimal(quantity)
         return float(self._append_transaction_suffix(visible_total) - visible_total)
     
     def __init__(self, name: str, category: str, price_per_unit: float = 0, cost_per_unit: float = 0, profit_per_unit: float = 0, stock_quantity: int = 0, toaster_space: int = 0):
@@ -2,7 +2,6 @@ from sqlalchemy import Column, Integer, String, Float
 from chame_app.database import Base
 from sqlalchemy.orm import relationship
 from models.enhanced_soft_delete_mixin import EnhancedSoftDeleteMixin, SoftDeleteCascadeRule, HardDeleteCascadeRule
-from passlib.context import CryptContext
 from utils.firebase_logger import log_debug, log_error
 
 class User(Base, EnhancedSoftDeleteMixin):
@@ -48,13 +47,7 @@ class User(Base, EnhancedSoftDeleteMixin):
     balance = Column(Float, default=0)  # User balance
     password_hash = Column(String)  # Store the hashed password
     role = Column(String, default="user")  # Role (e.g., 'admin', 'wrirt')
-    pwd_ctx = CryptContext(
-        schemes=["argon2"],
-        deprecated="auto",
-        argon2__memory_cost=2**16,   # 64 MiB
-        argon2__time_cost=3,         # 3 iterations
-        argon2__parallelism=1,       # single-threaded
-    )
+    _pwd_ctx = None  # passlib CryptContext, built on first use (see get_pwd_ctx)
 
     donated_sales = relationship("Sale", back_populates="donator", foreign_keys="Sale.donator_id")
     pfand_history = relationship("PfandHistory", back_populates="user")
@@ -126,6 +119,20 @@ class User(Base, EnhancedSoftDeleteMixin):
                 "sales": [] if include_sales else None
             }
     
+    @classmethod
+    def get_pwd_ctx(cls):
+        """Build the argon2 CryptContext lazily - importing passlib/argon2 is slow on device."""
+        if cls._pwd_ctx is None:
+            from passlib.context import CryptContext
+            cls._pwd_ctx = CryptContext(
+                schemes=["argon2"],
+                deprecated="auto",
+                argon2__memory_cost=2**16,   # 64 MiB
+                argon2__time_cost=3,         # 3 iterations
+                argon2__parallelism=1,       # single-threaded
+            )
+        return cls._pwd_ctx
+
     def hash_password(self, plain_password: str) -> str:
         """
         Returns an encoded hash, embedding salt & parameters:
@@ -133,7 +140,7 @@ class User(Base, EnhancedSoftDeleteMixin):
         """
         if plain_password == "":
             plain_password = "default"
-        return self.pwd_ctx.hash(plain_password)
+        return self.get_pwd_ctx().hash(plain_password)
     
     def verify_password(self, plain_password: str) -> bool:
         """Returns True if the password matches the given hash."""
@@ -142,7 +149,7 @@ class User(Base, EnhancedSoftDeleteMixin):
             return False
         if plain_password == "":
             plain_password = "default"
-        return self.pwd_ctx.verify(plain_password, self.password_hash)
+        return self.get_pwd_ctx().verify(plain_password, self.password_hash)
 
 
 
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+"""Micro-benchmark: Python overhead per hot lookup, ORM Query vs cached statement.
+
+Usage:
+  python scripts/benchmark_lookups.py [--iterations N]
+
+"before" builds a fresh ORM Query with active_only() on every call (the old
+Database.get_*_by_id code path), "after" runs the cached lambda statements
+used by Database now. Both run against the same seeded temporary database on
+one session, so the difference is statement construction/compilation, not I/O.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chame_app.database import reset_database
+from chame_app import database_instance
+from chame_app.database_instance import Database
+from models.bank_table import Bank
+from models.ingredient import Ingredient
+from models.pfand_table import PfandHistory
+from models.product_table import Product
+from models.user_table import User
+
+
+def _before(session, user_id, product_id, ingredient_id):
+    return {
+        "get_user_by_id": lambda: User.active_only(session.query(User)).filter(User.user_id == user_id).first(),
+        "get_product_by_id": lambda: Product.active_only(session.query(Product)).filter(Product.product_id == product_id).first(),
+        "get_ingredient_by_id": lambda: Ingredient.active_only(session.query(Ingredient)).filter(Ingredient.ingredient_id == ingredient_id).first(),
+        "get_bank": lambda: session.query(Bank).filter_by(account_id=1).first(),
+        "get_pfand_history": lambda: session.query(PfandHistory).filter(
+            PfandHistory.user_id == user_id, PfandHistory.product_id == product_id
+        ).all(),
+    }
+
+
+def _after(session, user_id, product_id, ingredient_id):
+    return {
+        "get_user_by_id": lambda: session.execute(database_instance._user_by_id_stmt(user_id)).scalars().first(),
+        "get_product_by_id": lambda: session.execute(database_instance._product_by_id_stmt(product_id)).scalars().first(),
+        "get_ingredient_by_id": lambda: session.execute(database_instance._ingredient_by_id_stmt(ingredient_id)).scalars().first(),
+        "get_bank": lambda: session.execute(database_instance._BANK_STMT).scalars().first(),
+        "get_pfand_history": lambda: session.execute(database_instance._pfand_history_stmt(user_id, product_id)).scalars().all(),
+    }
+
+
+def _time_us(callback, iterations):
+    callback()  # warm up the compiled cache
+    started = time.perf_counter()
+    for _ in range(iterations):
+        callback()
+    return (time.perf_counter() - started) * 1_000_000 / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        os.environ["PRIVATE_STORAGE"] = tmp_dir
+        os.environ.pop("HOME", None)
+        reset_database()
+
+        db = Database(apply_migrations=False)
+        db.add_ingredient(name="Bread", price_per_package=1.0, stock_quantity=100, number_ingredients=10, pfand=0.0)
+        ingredient = db.get_all_ingredients()[0]
+        db.add_product(name="Toast", ingredients=[(ingredient, 1)], price_per_unit=1.0, category="raw")
+        db.add_user(username="buyer", password="", salesman_id=1, role="user", balance=10.0)
+        user_id = db.get_user_by_username("buyer").user_id
+        product_id = db.get_all_products()[0].product_id
+
+        session = db.get_session()
+        before = _before(session, user_id, product_id, ingredient.ingredient_id)
+        after = _after(session, user_id, product_id, ingredient.ingredient_id)
+
+        print(f"{'lookup':<22} {'before us':>10} {'after us':>10} {'speedup':>8}")
+        for name in before:
+            before_us = _time_us(before[name], args.iterations)
+            after_us = _time_us(after[name], args.iterations)
+            print(f"{name:<22} {before_us:>10.1f} {after_us:>10.1f} {before_us / after_us:>7.2f}x")
+        session.close()
+        reset_database()
+
+
+if __name__ == "__main__":
+    main()
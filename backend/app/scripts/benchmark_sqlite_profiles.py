@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+"""Compare checkout and list-endpoint timings across SQLite connection profiles.
+
+Usage:
+  python scripts/benchmark_sqlite_profiles.py [--purchases N] [--profiles legacy,mobile,desktop,server]
+
+Each profile gets a fresh test database in a temporary directory, seeded with
+the same users, ingredients and products. The script then times N single-item
+checkouts (Database.make_purchase) and a round of list endpoints
+(get_all_users, get_all_products, get_all_sales, get_sales_paginated).
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chame_app.database import SQLITE_PROFILE_ENV, SQLITE_PROFILES, reset_database
+from chame_app.database_instance import Database
+
+NUM_USERS = 10
+NUM_PRODUCTS = 20
+
+
+def _seed(db: Database):
+    for index in range(NUM_PRODUCTS):
+        db.add_ingredient(
+            name=f"Ingredient {index}",
+            price_per_package=10.0,
+            stock_quantity=100000,
+            number_ingredients=10,
+            pfand=0.0,
+        )
+    for index, ingredient in enumerate(db.get_all_ingredients()):
+        db.add_product(
+            name=f"Product {index}",
+            ingredients=[(ingredient, 1)],
+            price_per_unit=1.5,
+            category="raw",
+        )
+    for index in range(NUM_USERS):
+        db.add_user(username=f"user{index}", password="", salesman_id=1, role="user", balance=100000.0)
+
+
+def _timed(callback, repeat=1):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        callback()
+    return (time.perf_counter() - started) * 1000
+
+
+def run_profile(profile: str, purchases: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        os.environ["PRIVATE_STORAGE"] = tmp_dir
+        os.environ.pop("HOME", None)
+        os.environ[SQLITE_PROFILE_ENV] = profile
+        reset_database()
+
+        db = Database(apply_migrations=False)
+        _seed(db)
+        users = [user.user_id for user in db.get_all_users() if user.role == "user"]
+        products = [product.product_id for product in db.get_all_products()]
+
+        def checkout(index=[0]):
+            user_id = users[index[0] % len(users)]
+            product_id = products[index[0] % len(products)]
+            index[0] += 1
+            db.make_purchase(user_id, product_id, 1, salesman_id=1)
+
+        def list_endpoints():
+            db.get_all_users()
+            db.get_all_products()
+            db.get_all_sales()
+            db.get_sales_paginated(page=1, page_size=100)
+
+        checkout_ms = _timed(checkout, purchases)
+        lists_ms = _timed(list_endpoints, 5)
+        reset_database()
+        return {
+            "profile": profile,
+            "checkout_ms_per_purchase": checkout_ms / purchases,
+            "list_endpoints_ms_per_round": lists_ms / 5,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--purchases", type=int, default=200)
+    parser.add_argument("--profiles", default=",".join(SQLITE_PROFILES))
+    args = parser.parse_args()
+
+    results = [run_profile(profile.strip(), args.purchases) for profile in args.profiles.split(",") if profile.strip()]
+    baseline = next((result for result in results if result["profile"] == "legacy"), results[0])
+
+    print()
+    print(f"{'profile':<10} {'checkout ms/op':>15} {'lists ms/round':>15} {'checkout x':>11} {'lists x':>8}")
+    for result in results:
+        print(
+            f"{result['profile']:<10} "
+            f"{result['checkout_ms_per_purchase']:>15.2f} "
+            f"{result['list_endpoints_ms_per_round']:>15.2f} "
+            f"{baseline['checkout_ms_per_purchase'] / result['checkout_ms_per_purchase']:>11.2f} "
+            f"{baseline['list_endpoints_ms_per_round'] / result['list_endpoints_ms_per_round']:>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+#!/usr/bin/env python
+"""Check stored balances and bank totals against the history tables.
+
+Usage:
+  python scripts/reconcile_ledgers.py [--tolerance 0.005] [--json]
+
+Prints per-user and per-bank-field drift (see Database.reconcile_ledgers)
+and exits with status 1 if anything is off by more than the tolerance.
+Read-only; safe to run while the app is in use.
+"""
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tolerance", type=float, default=0.005)
+    parser.add_argument("--json", action="store_true", help="print the raw report")
+    args = parser.parse_args()
+
+    from services.admin_api import create_database
+    report = create_database().reconcile_ledgers(tolerance=args.tolerance)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"Checked {report['users_checked']} users in {report['duration_ms']} ms")
+        for entry in report["user_drift"]:
+            print(f"  user {entry['user_id']} ({entry['name']}): balance {entry['balance']:.2f}, "
+                  f"expected {entry['expected_balance']:.2f}, drift {entry['drift']:+.2f}")
+        for field, entry in report["bank"].items():
+            status = "ok" if entry["ok"] else "DRIFT"
+            print(f"  bank.{field}: {entry['actual']:.2f} (expected {entry['expected']:.2f}, "
+                  f"drift {entry['drift']:+.2f}) {status}")
+        print("Ledgers reconcile." if report["ok"] else "Drift found.")
+    return 0 if report["ok"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
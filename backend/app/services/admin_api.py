@@ -1,22 +1,31 @@
 # admin_api.py
 # Bare Python functions for business logic, callable from other Python code or via FFI for Flutter integration.
 
+import time
+from utils import startup_profiler
+_IMPORTS_STARTED_AT = time.perf_counter()
+
 from chame_app.database_instance import Database
-from chame_app.simple_migrations import SimpleMigrations
+from utils import perf_tracing
+import functools
+import inspect
 import logging
+import threading
 from typing import Any, Dict, Iterable, List, Optional, Set
-from chame_app.database import get_database_storage_diagnostics
-from services.receipt_parser import parse_receipt_lines as _parse_receipt_lines
-from services.receipt_parser import aggregate_items as _aggregate_receipt_items
-from services.receipt_parser import get_default_parsing_settings as _get_default_receipt_parsing_settings
-from services.receipt_parser import find_fuzzy_merge_candidates as _find_fuzzy_merge_candidates
-from services.receipt_parser import merge_items as _merge_receipt_items
-from services.receipt_parser import suggest_ingredient_matches as _suggest_ingredient_matches
+from chame_app.database import get_database_storage_diagnostics, request_session_scope
+from chame_app.role_cache import role_cache
+
+# Heavy subsystems (receipt parser, migrations, backups, deletion services,
+# passlib) are imported inside the functions that use them so that importing
+# this module stays cheap - see test_import_budget.py.
 
 from models.user_table import User
 import traceback
 
+startup_profiler.record_phase("imports", _IMPORTS_STARTED_AT)
+
 _database = None
+_database_lock = threading.Lock()
 _current_viewer_id: Optional[int] = None
 _current_viewer_role: Optional[str] = None
 _ITEMS_MUST_BE_LIST_MSG = "Invalid input: items must be a list"
@@ -47,12 +56,7 @@ def _viewer_can_see_god() -> bool:
 
 
 def _get_god_user_ids() -> Set[int]:
-    session = database.get_session()
-    return {
-        user.user_id
-        for user in session.query(User).filter(User.role == "god").all()
-        if user.user_id is not None
-    }
+    return set(role_cache.user_ids(database.get_session(), "god"))
 
 
 def _contains_god_link(value: Any, god_user_ids: Set[int]) -> bool:
@@ -94,6 +98,31 @@ def _filter_visible_records(records: Iterable[Dict[str, Any]]) -> List[Dict[str,
     return [record for record in materialized_records if not _contains_god_link(record, god_user_ids)]
 
 
+def _hidden_user_ids() -> Optional[Set[int]]:
+    """God user ids for the history queries to leave out in SQL, None if the viewer may see them."""
+    if _viewer_can_see_god():
+        return None
+    return _get_god_user_ids()
+
+
+def _next_cursor(rows: List[Any], key: str, limit: Optional[int]) -> Optional[int]:
+    """Key of the last row when the page came back full, i.e. the cursor of the next page."""
+    if limit is None or not rows or len(rows) < limit:
+        return None
+    return getattr(rows[-1], key)
+
+
+def _history_page(rows: List[Any], records: List[Dict[str, Any]], key: str, limit: Optional[int]):
+    """Legacy full list without a limit, otherwise one keyset page with its next cursor."""
+    if limit is None:
+        return records
+    return {'items': records, 'next_cursor': _next_cursor(rows, key, limit), 'limit': limit}
+
+
+def _optional_int(value: Any) -> Optional[int]:
+    return None if value is None or value == "" else int(value)
+
+
 def _filter_visible_record(record: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
     if record is None or _viewer_can_see_god():
         return record
@@ -118,6 +147,7 @@ def run_simple_migrations():
             print("❌ [SimpleMigrations] Database engine not initialized")
             return
         
+        from chame_app.simple_migrations import SimpleMigrations
         migrations = SimpleMigrations(_engine)
         migrations.run_migrations()
         print("✅ [SimpleMigrations] Simple migrations completed successfully")
@@ -128,12 +158,15 @@ def run_simple_migrations():
 def create_database(apply_migration: bool = True) -> Database:
     global _database
     print("DEBUG: create_database called with apply_migration:", apply_migration)
-    if _database is None:
-        print("DEBUG: Creating new Database instance")
-        _database = Database(apply_migration)
-        logging.info("Database instance created and migrations run.")
-    else:
-        logging.warning("Database instance already exists.")
+    with _database_lock:
+        if _database is None:
+            print("DEBUG: Creating new Database instance")
+            with startup_profiler.startup_phase("database_init"):
+                _database = Database(apply_migration)
+            logging.info("Database instance created and migrations run.")
+            startup_profiler.log_startup_profile_once()
+        else:
+            logging.warning("Database instance already exists.")
     return _database
 
 def login(username, password):
@@ -294,6 +327,7 @@ def parse_receipt_lines(
     print("DEBUG: parse_receipt_lines called with", len(lines) if isinstance(lines, list) else lines, "lines, pfand_product_number=", pfand_product_number)
     if lines is None or not isinstance(lines, list):
         raise ValueError("Invalid input: lines must be a list of strings")
+    from services.receipt_parser import parse_receipt_lines as _parse_receipt_lines
     return _parse_receipt_lines(
         lines,
         pfand_product_number=pfand_product_number or None,
@@ -306,9 +340,11 @@ def aggregate_receipt_items(items):
     print("DEBUG: aggregate_receipt_items called with", len(items) if isinstance(items, list) else items, "items")
     if items is None or not isinstance(items, list):
         raise ValueError(_ITEMS_MUST_BE_LIST_MSG)
+    from services.receipt_parser import aggregate_items as _aggregate_receipt_items
     return _aggregate_receipt_items(items)
 
 def get_default_receipt_parsing_settings():
+    from services.receipt_parser import get_default_parsing_settings as _get_default_receipt_parsing_settings
     return _get_default_receipt_parsing_settings()
 
 def find_receipt_merge_candidates(
@@ -320,6 +356,7 @@ def find_receipt_merge_candidates(
     print("DEBUG: find_receipt_merge_candidates called with", len(items) if isinstance(items, list) else items, "items")
     if items is None or not isinstance(items, list):
         raise ValueError(_ITEMS_MUST_BE_LIST_MSG)
+    from services.receipt_parser import find_fuzzy_merge_candidates as _find_fuzzy_merge_candidates
     return _find_fuzzy_merge_candidates(
         items,
         min_matching_digits=min_matching_digits,
@@ -331,6 +368,7 @@ def merge_receipt_items(items):
     print("DEBUG: merge_receipt_items called with", len(items) if isinstance(items, list) else items, "items")
     if items is None or not isinstance(items, list):
         raise ValueError(_ITEMS_MUST_BE_LIST_MSG)
+    from services.receipt_parser import merge_items as _merge_receipt_items
     return _merge_receipt_items(items)
 
 def suggest_receipt_ingredient_matches(items, ingredients, min_word_match_ratio=None):
@@ -339,6 +377,7 @@ def suggest_receipt_ingredient_matches(items, ingredients, min_word_match_ratio=
         raise ValueError(_ITEMS_MUST_BE_LIST_MSG)
     if ingredients is None or not isinstance(ingredients, list):
         raise ValueError("Invalid input: ingredients must be a list")
+    from services.receipt_parser import suggest_ingredient_matches as _suggest_ingredient_matches
     return _suggest_ingredient_matches(
         items, ingredients, min_word_match_ratio=min_word_match_ratio
     )
@@ -385,14 +424,12 @@ def get_stock_history(ingredient_id: int):
     
     return _filter_visible_records([sh.to_dict(include_ingredient=True) for sh in stock_history])
 
-def get_all_stock_history():
-    print("DEBUG: get_all_stock_history called")
-    stock_history = database.get_all_stock_history()
-    if not stock_history:
-        print("DEBUG: No stock history found")
-        return []
-    
-    return _filter_visible_records([sh.to_dict(include_ingredient=True) for sh in stock_history])
+@perf_tracing.query_budget(2)
+def get_all_stock_history(cursor=None, limit=None):
+    """All stock changes; pass limit (and the returned next_cursor) to page through them newest first"""
+    limit = _optional_int(limit)
+    stock_history = database.get_all_stock_history(before_id=_optional_int(cursor), limit=limit)
+    return _history_page(stock_history, [sh.to_dict(include_ingredient=True) for sh in stock_history], 'history_id', limit)
 
 def restock_ingredients(_list: List[Dict[int, int]], salesman_id):
     if not _list or not isinstance(_list, list) or salesman_id is None:
@@ -462,12 +499,45 @@ def adjust_bank_field(field, new_value, comment, salesman_id):
     return database.adjust_bank_field(field=field, new_value=float(new_value), comment=comment or "", salesman_id=salesman_id)
 
 # Data fetchers
+# query_budget: SQL statements one call may run, independent of the number of
+# rows (one per list query, plus one if the role cache has to be rebuilt).
+# Enforced by test_query_budgets.py; see utils.perf_tracing.
+@perf_tracing.query_budget(2)
 def get_all_users():
-    return _filter_visible_records([user.to_dict(True) for user in database.get_all_users()])
+    """Active users with aggregated sales stats; per-user sales come from get_user_sales()"""
+    return _filter_visible_records(database.get_user_summaries())
+
+@perf_tracing.query_budget(3)
+def get_user_sales(user_id, page=1, page_size=50, cursor=None):
+    """One page of the sales a user consumed or paid for (same shape as get_sales_paginated)"""
+    page, page_size = int(page), int(page_size)
+    sales, total_count = database.get_user_sales(
+        user_id=int(user_id), page=page, page_size=page_size,
+        before_id=_optional_int(cursor), hidden_user_ids=_hidden_user_ids(),
+    )
+    return _sales_page(sales, total_count, page, page_size)
 
+@perf_tracing.query_budget(2)
 def get_all_products():
-    return _filter_visible_records([product.to_dict(True, True, True, True) for product in database.get_all_products()])
+    """Active products for the purchase screen, see get_product_catalog()"""
+    return get_product_catalog()
+
+@perf_tracing.query_budget(2)
+def get_product_catalog(category=None):
+    """Active products with pfand and sales aggregates; per-product sales come from get_product_sales()"""
+    return _filter_visible_records(database.get_product_catalog(category=category))
+
+@perf_tracing.query_budget(3)
+def get_product_sales(product_id, page=1, page_size=50, cursor=None):
+    """One page of a product's sales (same shape as get_sales_paginated)"""
+    page, page_size = int(page), int(page_size)
+    sales, total_count = database.get_product_sales(
+        product_id=int(product_id), page=page, page_size=page_size,
+        before_id=_optional_int(cursor), hidden_user_ids=_hidden_user_ids(),
+    )
+    return _sales_page(sales, total_count, page, page_size)
 
+@perf_tracing.query_budget(2)
 def get_all_ingredients():
     result = _filter_visible_records([ingredient.to_dict(True) for ingredient in database.get_all_ingredients(eager_load=True)])
     # print("DEBUG get_all_ingredients result:", result)
@@ -477,51 +547,89 @@ def get_all_ingredients():
         return None
     return result
 
+@perf_tracing.query_budget(2)
 def get_all_sales():
     return _filter_visible_records([sale.to_dict(True, True, True) for sale in database.get_all_sales()])
 
-def get_sales_paginated(page=1, page_size=100):
-    """Get paginated sales data.
+@perf_tracing.query_budget(3)
+def get_sales_paginated(page=1, page_size=100, cursor=None):
+    """Get paginated sales data, most recent first.
     
     Args:
-        page: Page number (1-based, default: 1)
+        page: Page number (1-based, default: 1), only used without cursor
         page_size: Number of records per page (default: 100)
+        cursor: next_cursor of the previous page; every page then costs the same
         
     Returns:
-        dict: Contains 'sales', 'total_count', 'page', 'page_size', 'total_pages'
+        dict: Contains 'sales', 'total_count', 'page', 'page_size', 'total_pages', 'next_cursor'
     """
-    sales, total_count = database.get_sales_paginated(page=page, page_size=page_size)
-    filtered_sales = _filter_visible_records([sale.to_dict(True, True, True) for sale in sales])
-    filtered_total_count = len(filtered_sales)
-    total_pages = (filtered_total_count + page_size - 1) // page_size if filtered_total_count else 0
-    
+    page, page_size = int(page), int(page_size)
+    sales, total_count = database.get_sales_paginated(
+        page=page, page_size=page_size,
+        before_id=_optional_int(cursor), hidden_user_ids=_hidden_user_ids(),
+    )
+    return _sales_page(sales, total_count, page, page_size)
+
+def _sales_page(sales, total_count, page, page_size):
+    """Response of the paginated sales endpoints; hidden sales are already excluded in SQL."""
     return {
-        'sales': filtered_sales,
-        'total_count': filtered_total_count,
+        'sales': [sale.to_dict(True, True, True) for sale in sales],
+        'total_count': total_count,
         'page': page,
         'page_size': page_size,
-        'total_pages': total_pages
+        'total_pages': (total_count + page_size - 1) // page_size if total_count else 0,
+        'next_cursor': _next_cursor(sales, 'sale_id', page_size),
     }
 
+@perf_tracing.query_budget(2)
 def get_all_toast_products():
     return [tp.to_dict(True, True, True, True) for tp in database.get_all_toast_products()]
 
-def get_all_toast_rounds():
-    return _filter_visible_records([tr.to_dict(True, True) for tr in database.get_all_toast_rounds()])
+@perf_tracing.query_budget(2)
+def get_all_toast_rounds(cursor=None, limit=None):
+    """All toast rounds; pass limit (and the returned next_cursor) to page through them newest first"""
+    limit = _optional_int(limit)
+    toast_rounds = database.get_all_toast_rounds(before_id=_optional_int(cursor), limit=limit, hidden_user_ids=_hidden_user_ids())
+    return _history_page(toast_rounds, [tr.to_dict(True, True) for tr in toast_rounds], 'toast_round_id', limit)
 
+@perf_tracing.query_budget(2)
 def get_all_raw_products():
     """Get all products without eager loading ingredients or sales"""
     return _filter_visible_records([product.to_dict(True, False, False, True) for product in database.get_all_products_by_category('raw')])
 
-def get_filtered_transaction(user_id="all", tx_type="all"):
-    return _filter_visible_records([tx.to_dict() for tx in database.get_filtered_transaction(user_id=user_id, tx_type=tx_type)])
+@perf_tracing.query_budget(2)
+def get_filtered_transaction(user_id="all", tx_type="all", cursor=None, limit=None):
+    """User transactions; pass limit (and the returned next_cursor) to page through them newest first"""
+    limit = _optional_int(limit)
+    transactions = database.get_filtered_transaction(
+        user_id=user_id, tx_type=tx_type,
+        before_id=_optional_int(cursor), limit=limit, hidden_user_ids=_hidden_user_ids(),
+    )
+    return _history_page(transactions, [tx.to_dict() for tx in transactions], 'transaction_id', limit)
 
+@perf_tracing.query_budget(2)
 def get_bank():
     bank = database.get_bank()
     return _filter_visible_record(bank.to_dict()) if bank else None
 
-def get_bank_transaction():
-    return _filter_visible_records([bt.to_dict() for bt in database.get_bank_transaction()])
+@perf_tracing.query_budget(2)
+def get_bank_transaction(cursor=None, limit=None):
+    """Bank transactions, most recent first; pass limit (and the returned next_cursor) to page through them"""
+    limit = _optional_int(limit)
+    transactions = database.get_bank_transaction(before_id=_optional_int(cursor), limit=limit, hidden_user_ids=_hidden_user_ids())
+    return _history_page(transactions, [bt.to_dict() for bt in transactions], 'transaction_id', limit)
+
+@perf_tracing.query_budget(1)
+def get_bank_history(field, limit=100):
+    """Value of one source-of-truth bank field after each change, most recent first."""
+    return database.get_bank_history(field=field, limit=int(limit))
+
+def compact_bank_ledger():
+    return database.compact_bank_ledger()
+
+def reconcile_ledgers(tolerance=0.005):
+    """Per-user and per-bank-field drift between stored values and the history tables."""
+    return database.reconcile_ledgers(tolerance=float(tolerance))
 
 
 def get_storage_diagnostics():
@@ -531,12 +639,47 @@ def get_storage_diagnostics():
         print(f"get_storage_diagnostics error: {e}")
         raise RuntimeError(f"Failed to load storage diagnostics: {e}") from e
 
-def get_pfand_history():
-    pfand_history = database.get_all_pfand_history()
-    if not pfand_history:
-        return []
-    print(pfand_history)
-    return _filter_visible_records([ph.to_dict(include_user=True, include_product=True) for ph in pfand_history])
+def get_log_levels():
+    """Minimum log level of the default and each subsystem (database, parser, backup, migrations)"""
+    from utils.firebase_logger import get_log_levels as _get_log_levels
+    return _get_log_levels()
+
+def set_log_level(level, subsystem=None):
+    """Change a subsystem's minimum log level at runtime (subsystem=None sets the default)"""
+    from utils.firebase_logger import set_log_level as _set_log_level
+    _set_log_level(level, subsystem or None)
+    return get_log_levels()
+
+def get_perf_stats():
+    """Per-operation and per-call-path span statistics (enable with CHAME_TRACE=1 or enable_perf_tracing())"""
+    return perf_tracing.get_perf_stats()
+
+def reset_perf_stats():
+    perf_tracing.reset_perf_stats()
+
+def enable_perf_tracing(enabled=True):
+    perf_tracing.enable_tracing(bool(enabled))
+    return perf_tracing.is_tracing_enabled()
+
+def get_startup_profile():
+    """Per-phase timings of this launch (imports, database setup, bootstrap, stock recompute)"""
+    return startup_profiler.get_startup_profile()
+
+def get_product_stock_snapshot():
+    """Available quantity of every active product, computed in one SQL aggregate"""
+    snapshot = database.get_product_stock_snapshot(active_only=True)
+    return [{"product_id": product_id, "stock_quantity": stock} for product_id, stock in snapshot.items()]
+
+def get_product_stock_mismatches():
+    """Products whose stored stock differs from get_product_stock_snapshot()"""
+    return database.get_product_stock_mismatches()
+
+@perf_tracing.query_budget(2)
+def get_pfand_history(cursor=None, limit=None):
+    """All pfand counters; pass limit (and the returned next_cursor) to page through them newest first"""
+    limit = _optional_int(limit)
+    pfand_history = database.get_all_pfand_history(before_id=_optional_int(cursor), limit=limit, hidden_user_ids=_hidden_user_ids())
+    return _history_page(pfand_history, [ph.to_dict(include_user=True, include_product=True) for ph in pfand_history], 'id', limit)
 
 # ========== BACKUP FUNCTIONS ==========
 
@@ -1281,4 +1424,26 @@ def list_server_backups(server_config):
             
     except Exception as e:
         print(f"list_server_backups error: {e}")
-        raise RuntimeError(f"Failed to list server backups: {e}") from e
\ No newline at end of file
+        raise RuntimeError(f"Failed to list server backups: {e}") from e
+
+
+def _request_scoped(func):
+    """Run an admin_api call in its own session (nested calls share it)."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with request_session_scope():
+            return func(*args, **kwargs)
+    return wrapper
+
+
+# The tracing controls themselves stay out of the statistics
+_UNTRACED = {"get_perf_stats", "reset_perf_stats", "enable_perf_tracing"}
+
+# Every public function is a request boundary for the Flutter bridge: give
+# each call its own session so calls from several threads don't share one.
+for _name, _value in list(globals().items()):
+    if not _name.startswith("_") and inspect.isfunction(_value) and _value.__module__ == __name__:
+        if _name not in _UNTRACED:
+            _value = perf_tracing.traced(f"admin_api.{_name}")(_value)
+        globals()[_name] = _request_scoped(_value)
+del _name, _value
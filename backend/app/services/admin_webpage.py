@@ -3,6 +3,7 @@ from models.user_table import User
 from models.product_table import Product
 from models.sales_table import Sale
 from chame_app.database_instance import database
+from chame_app.database import remove_scoped_session
 import os
 import logging
 import sys
@@ -18,6 +19,13 @@ logging.basicConfig(
 
 app = Flask(__name__)
 
+
+@app.teardown_appcontext
+def remove_request_session(_exception=None):
+    """Each HTTP request gets its own scoped session; drop it when the request ends."""
+    remove_scoped_session()
+
+
 def escapejs_filter(value):
     """Escape string for safe use in JavaScript in Jinja2 templates."""
     if value is None:
@@ -13,7 +13,7 @@ from pathlib import Path
 from typing import Dict, List, Optional, Any
 from dataclasses import dataclass, asdict
 import logging
-from chame_app.database import resolve_database_path
+from chame_app.database import reset_database, resolve_database_path
 
 logger = logging.getLogger(__name__)
 
@@ -141,6 +141,13 @@ class DatabaseBackupManager:
                 backup_subdir = self.backup_dir / "manual"
             
             backup_path = backup_subdir / backup_filename
+            # Two backups in the same second (e.g. the automatic one taken
+            # before a restore) must not overwrite each other
+            suffix = 1
+            while backup_path.exists():
+                backup_filename = f"chame_backup_{backup_type}_{timestamp}_{suffix}.db"
+                backup_path = backup_subdir / backup_filename
+                suffix += 1
             
             # Create backup using SQLite backup API for consistency
             self._create_sqlite_backup(db_path, backup_path)
@@ -198,6 +205,17 @@ class DatabaseBackupManager:
             source_conn.close()
             backup_conn.close()
     
+    def _restore_sqlite_backup(self, backup_path: Path, db_path: Path):
+        """Replace the contents of db_path with backup_path using the SQLite backup API"""
+        source_conn = sqlite3.connect(str(backup_path))
+        target_conn = sqlite3.connect(str(db_path))
+        
+        try:
+            source_conn.backup(target_conn)
+        finally:
+            source_conn.close()
+            target_conn.close()
+    
     def restore_backup(self, backup_path: str, confirm: bool = False) -> Dict[str, Any]:
         """
         Restore database from backup
@@ -232,8 +250,12 @@ class DatabaseBackupManager:
                 )
                 logger.info(f"Created pre-restore backup: {pre_restore_backup.get('backup_path')}")
             
-            # Perform restore
-            shutil.copy2(backup_file, db_path)
+            # Perform restore. Drop the engines first so no pooled connection
+            # keeps the old file open, then write the backup through SQLite
+            # itself: copying over the file (or deleting its -wal/-shm) under
+            # a connection that is still open corrupts the live database.
+            reset_database()
+            self._restore_sqlite_backup(backup_file, db_path)
             
             # Verify restored database
             if not self._verify_database_integrity(db_path):
@@ -810,9 +832,27 @@ class DatabaseBackupManager:
         row_data = self._get_bank_row_data(cursor, bank_columns)
         if not row_data:
             return {}
+        if "bank_ledger" in tables and "bank_snapshots" in tables:
+            row_data = self._apply_pending_bank_ledger(cursor, row_data)
 
         return self._build_bank_summary_from_row(row_data, bank_columns)
 
+    def _apply_pending_bank_ledger(self, cursor: sqlite3.Cursor, row_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Add the bank ledger entries not yet rolled up into the bank row."""
+        fields = ['total_balance', 'customer_funds', 'revenue_total', 'costs_total', 'product_value', 'ingredient_value']
+        row = cursor.execute(
+            f"SELECT {', '.join(f'COALESCE(SUM({field}), 0.0) AS {field}' for field in fields)} "
+            "FROM bank_ledger WHERE entry_id > "
+            "(SELECT COALESCE(MAX(last_entry_id), 0) FROM bank_snapshots)"
+        ).fetchone()
+        updated = dict(row_data)
+        for field in fields:
+            if field in updated:
+                updated[field] = float(updated[field] or 0) + float(row[field] or 0)
+        # profit_total is stored as of the last roll-up; derive it from the totals
+        updated['profit_total'] = None
+        return updated
+
     def _get_bank_row_data(self, cursor: sqlite3.Cursor, bank_columns: set[str]) -> Dict[str, Any]:
         """Fetch only the bank columns that exist in the current schema."""
         selected_columns = [
@@ -40,6 +40,15 @@ import re
 from difflib import SequenceMatcher
 from typing import Any, Dict, List, Optional
 
+from utils.firebase_logger import is_log_enabled
+
+
+def _debug(message) -> None:
+    """Print a trace line, built only if the "parser" log level is DEBUG."""
+    if is_log_enabled("DEBUG", "parser"):
+        print(message())
+
+
 # Defaults used when the caller doesn't provide customized rules.
 DEFAULT_VALID_LETTERS: List[str] = ["A", "B", "C", "D", "E"]
 DEFAULT_LETTER_CORRECTIONS: Dict[str, str] = {"8": "B"}
@@ -184,7 +193,7 @@ class ReceiptParsingRules:
              "reason": "..."}
         """
         stripped = text.strip()
-        print(f"DEBUG: match_item_line trying line={stripped!r}")
+        _debug(lambda: f"DEBUG: match_item_line trying line={stripped!r}")
 
         # Step 1: VAT letter.
         letter_match = re.search(rf"[{self._letter_char_class()}]\s*$", stripped)
@@ -194,11 +203,11 @@ class ReceiptParsingRules:
                 f"known misread {list(self.letter_corrections.keys())}) found "
                 "at the end of the line"
             )
-            print(f"DEBUG: match_item_line step=letter FAILED: {reason}")
+            _debug(lambda: f"DEBUG: match_item_line step=letter FAILED: {reason}")
             return {"success": False, "step": "letter", "reason": reason}
         letter_raw = stripped[letter_match.start():letter_match.end()].strip()
         remainder = stripped[:letter_match.start()].rstrip()
-        print(f"DEBUG: match_item_line step=letter OK: letter_raw={letter_raw!r} remainder={remainder!r}")
+        _debug(lambda: f"DEBUG: match_item_line step=letter OK: letter_raw={letter_raw!r} remainder={remainder!r}")
 
         # Step 2: price, immediately before the letter.
         price_match = re.search(rf"{self._price_pattern}\s*$", remainder)
@@ -207,29 +216,29 @@ class ReceiptParsingRules:
                 f"No price found immediately before the letter {letter_raw!r} "
                 f"(expected digits separated by one of {self.decimal_separator_chars!r})"
             )
-            print(f"DEBUG: match_item_line step=price FAILED: {reason}")
+            _debug(lambda: f"DEBUG: match_item_line step=price FAILED: {reason}")
             return {"success": False, "step": "price", "reason": reason}
         price_raw = remainder[price_match.start():price_match.end()].strip()
         remainder = remainder[:price_match.start()].rstrip()
-        print(f"DEBUG: match_item_line step=price OK: price_raw={price_raw!r} remainder={remainder!r}")
+        _debug(lambda: f"DEBUG: match_item_line step=price OK: price_raw={price_raw!r} remainder={remainder!r}")
 
         # Step 3: product number at the very start.
         product_number_match = re.match(r"^(\d+)\s+", remainder)
         if not product_number_match:
             reason = "No product number found at the start of the line"
-            print(f"DEBUG: match_item_line step=product_number FAILED: {reason}")
+            _debug(lambda: f"DEBUG: match_item_line step=product_number FAILED: {reason}")
             return {"success": False, "step": "product_number", "reason": reason}
         product_number = product_number_match.group(1)
         description = remainder[product_number_match.end():].strip()
-        print(
+        _debug(lambda: (
             f"DEBUG: match_item_line step=product_number OK: product_number={product_number!r} "
             f"description={description!r}"
-        )
+        ))
 
         # Step 4: description -- whatever's left must be non-empty.
         if not description:
             reason = "No description text left between the product number and price"
-            print(f"DEBUG: match_item_line step=description FAILED: {reason}")
+            _debug(lambda: f"DEBUG: match_item_line step=description FAILED: {reason}")
             return {"success": False, "step": "description", "reason": reason}
 
         result = {
@@ -239,7 +248,7 @@ class ReceiptParsingRules:
             "price": self.parse_price(price_raw),
             "letter": self.normalize_letter(letter_raw),
         }
-        print(f"DEBUG: match_item_line SUCCESS: {result}")
+        _debug(lambda: f"DEBUG: match_item_line SUCCESS: {result}")
         return result
 
     def match_pfand_line(self, text: str) -> Optional[Dict[str, Any]]:
@@ -324,10 +333,10 @@ def _try_match_multiplier_group(
 
     item_match = rules.match_item_line((lines[i + 1] or "").strip())
     if not item_match["success"]:
-        print(
+        _debug(lambda: (
             f"DEBUG: _try_match_multiplier_group: line[{i}] looked like a multiplier "
             f"header but line[{i + 1}] failed at step={item_match['step']}: {item_match['reason']}"
-        )
+        ))
         return None
 
     count = int(multiplier_match.group("count"))
@@ -656,10 +665,10 @@ def _best_description_match_ratio(description: str, ingredient_name: str) -> flo
     for description_word in description_words:
         for ingredient_word in ingredient_words:
             ratio = _word_match_ratio(description_word, ingredient_word)
-            print(
+            _debug(lambda: (
                 f"DEBUG: _best_description_match_ratio called with description='{description_word}', "
                 f"ingredient_word='{ingredient_word}', ratio={ratio}"
-            )
+            ))
             if ratio > best:
                 best = ratio
     return best
@@ -736,21 +745,21 @@ def suggest_ingredient_matches(
         if min_word_match_ratio is not None
         else DEFAULT_MIN_WORD_MATCH_RATIO
     )
-    print(
+    _debug(lambda: (
         f"DEBUG: suggest_ingredient_matches called with {len(items)} item(s), "
         f"{len(ingredients)} ingredient(s), threshold={threshold}"
-    )
+    ))
 
     suggestions: Dict[str, Optional[int]] = {}
     for index, item in enumerate(items):
         description = item.get("description") or ""
         match = _find_best_ingredient_match(description, ingredients, threshold)
         suggestions[str(index)] = match["ingredient_id"]
-        print(
+        _debug(lambda: (
             f"DEBUG: suggest_ingredient_matches item[{index}] description={description!r} "
             f"-> best_ratio={match['best_ratio']:.2f} candidates={match['tie_candidates']!r} "
             f"chosen={match['ingredient_name']!r} (ingredient_id={match['ingredient_id']})"
-        )
+        ))
 
     return {"suggestions": suggestions}
 
@@ -845,10 +854,10 @@ def parse_receipt_lines(
             i = group["line_numbers"][-1] + 1
             continue
 
-        print(
+        _debug(lambda: (
             f"DEBUG: parse_receipt_lines: line[{i}]={text!r} unmatched at "
             f"step={item_match['step']}: {item_match['reason']}"
-        )
+        ))
         unmatched.append({
             "line_numbers": [i],
             "text": lines[i],
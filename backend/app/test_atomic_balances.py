@@ -0,0 +1,134 @@
+import threading
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+
+def test_concurrent_deposits_do_not_lose_updates(db):
+    db.add_user(username="alice", password="", salesman_id=1, role="user", balance=0.0)
+    user_id = db.get_user_by_username("alice").user_id
+    funds_before = db.get_bank().customer_funds
+    errors = []
+
+    def terminal():
+        try:
+            for _ in range(10):
+                db.deposit_cash(user_id, 1.0, salesman_id=1)
+        except Exception as e:  # pragma: no cover - reported below
+            errors.append(e)
+
+    threads = [threading.Thread(target=terminal) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert db.get_user_balance(user_id) == pytest.approx(40.0)
+    bank = db.get_bank()
+    assert bank.customer_funds == pytest.approx(funds_before + 40.0)
+    assert bank.revenue_funds == pytest.approx(bank.total_balance - bank.customer_funds)
+
+
+def test_debit_checks_the_stored_balance_not_a_stale_copy(db):
+    db.add_user(username="alice", password="", salesman_id=1, role="user", balance=10.0)
+    user_id = db.get_user_by_username("alice").user_id
+
+    session = db.get_session()
+    try:
+        assert db.get_user_by_id(user_id, session).balance == 10.0
+        # Another terminal spends most of the money meanwhile
+        db.withdraw_cash(user_id, 8.0, salesman_id=1)
+        with pytest.raises(RuntimeError, match="Insufficient balance"):
+            db.withdraw_cash(user_id, 5.0, salesman_id=1, session=session)
+    finally:
+        session.close()
+
+    assert db.get_user_balance(user_id) == pytest.approx(2.0)
+
+
+def test_purchase_updates_balances_and_bank_with_relative_writes(db):
+    db.add_ingredient(name="Bread", price_per_package=1.0, stock_quantity=10, number_ingredients=10, pfand=0.0)
+    bread = db.get_all_ingredients()[0]
+    db.add_product(name="Toast", ingredients=[(bread, 1)], price_per_unit=2.5, category="toast", toaster_space=1)
+    db.add_user(username="buyer", password="", salesman_id=1, role="user", balance=5.0)
+    buyer = db.get_user_by_username("buyer")
+    toast = db.get_all_products()[0]
+    bank_before = db.get_bank()
+
+    db.make_purchase(buyer.user_id, toast.product_id, 2, salesman_id=1)
+    with pytest.raises(RuntimeError, match="Insufficient balance"):
+        db.make_purchase(buyer.user_id, toast.product_id, 1, salesman_id=1)
+
+    bank = db.get_bank()
+    assert db.get_user_balance(buyer.user_id) == pytest.approx(0.0)
+    assert bank.customer_funds == pytest.approx(bank_before.customer_funds - 5.0)
+    assert bank.revenue_total == pytest.approx(bank_before.revenue_total + 5.0)
+    assert bank.ingredient_value == pytest.approx(bank_before.ingredient_value - 0.2)
+    assert bank.profit_total == pytest.approx(bank.revenue_total - bank.costs_total)
+    assert bank.revenue_funds == pytest.approx(bank.total_balance - bank.customer_funds)
+
+
+def test_concurrent_checkouts_keep_stock_and_pfand_counters(db):
+    db.add_ingredient(name="Bottle", price_per_package=10.0, stock_quantity=100, number_ingredients=10, pfand=0.25)
+    bottle = db.get_all_ingredients()[0]
+    db.add_product(name="Mate", ingredients=[(bottle, 1)], price_per_unit=1.0, category="raw")
+    db.add_user(username="alice", password="", salesman_id=1, role="user", balance=400.0)
+    user_id = db.get_user_by_username("alice").user_id
+    mate = db.get_all_products()[0]
+    bank_before = db.get_bank()
+    errors = []
+
+    def terminal():
+        try:
+            for _ in range(20):
+                db.make_purchase(user_id, mate.product_id, 1, salesman_id=1)
+        except Exception as e:  # pragma: no cover - reported below
+            errors.append(e)
+
+    threads = [threading.Thread(target=terminal) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert db.get_ingredient_by_id(bottle.ingredient_id).stock_quantity == 920
+    assert db.get_all_products()[0].stock_quantity == 920
+    assert db.get_pfand_history(user_id, mate.product_id).counter == 80
+    assert db.get_user_balance(user_id) == pytest.approx(400.0 - 80 * 1.25)
+    bank = db.get_bank()
+    assert bank.ingredient_value == pytest.approx(bank_before.ingredient_value - 80 * 1.0)
+    assert db.reconcile_ledgers()["ok"]
+
+
+def test_session_owning_writers_retry_a_locked_database(db):
+    db.add_ingredient(name="Bread", price_per_package=1.0, stock_quantity=1, number_ingredients=10, pfand=0.0)
+    bread = db.get_all_ingredients()[0]
+    commits = []
+
+    def locked_once(session):
+        commits.append(session)
+        if len(commits) == 1:
+            raise OperationalError("COMMIT", {}, Exception("database is locked"))
+
+    event.listen(Session, "before_commit", locked_once)
+    try:
+        for write in (
+            lambda: db.add_user(username="alice", password="", salesman_id=1, role="user", balance=5.0),
+            lambda: db.stock_ingredient(bread.ingredient_id, 1),
+            lambda: db.update_stock(bread.ingredient_id, 15, comment="count"),
+            lambda: db.adjust_bank_field("costs_total", 7.0, "count", salesman_id=1),
+        ):
+            commits.clear()
+            write()
+            # the first commit hit the lock, the retry went through
+            assert len(commits) >= 2
+    finally:
+        event.remove(Session, "before_commit", locked_once)
+
+    assert db.get_user_by_username("alice").balance == pytest.approx(5.0)
+    assert db.get_ingredient_by_id(bread.ingredient_id).stock_quantity == 15
+    assert db.get_bank().costs_total == pytest.approx(7.0)
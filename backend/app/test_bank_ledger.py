@@ -0,0 +1,64 @@
+import os
+import sys
+
+import pytest
+from sqlalchemy import text
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import chame_app.database_instance as database_instance
+
+
+def _bank_row(db):
+    session = db.get_session()
+    try:
+        return dict(session.execute(text("SELECT total_balance, customer_funds FROM bank WHERE account_id = 1")).mappings().first())
+    finally:
+        session.close()
+
+
+def test_money_operations_append_to_the_ledger_instead_of_rewriting_the_bank_row(db):
+    row_before = _bank_row(db)
+    funds_before = db.get_bank().customer_funds
+
+    db.add_user(username="alice", password="", salesman_id=1, role="user", balance=10.0)
+    alice = db.get_user_by_username("alice")
+    db.deposit_cash(alice.user_id, 5.0, salesman_id=1)
+    db.withdraw_cash(alice.user_id, 3.0, salesman_id=1)
+
+    assert _bank_row(db) == row_before
+    bank = db.get_bank()
+    assert bank.customer_funds == pytest.approx(funds_before + 12.0)
+    assert bank.revenue_funds == pytest.approx(bank.total_balance - bank.customer_funds)
+
+    history = db.get_bank_history("customer_funds")
+    assert [entry["operation"] for entry in history] == ["withdraw_cash", "deposit_cash", "add_user"]
+    assert [entry["delta"] for entry in history] == [-3.0, 5.0, 10.0]
+    assert history[0]["value"] == pytest.approx(bank.customer_funds)
+
+
+def test_ledger_is_rolled_up_into_snapshots(db, monkeypatch):
+    monkeypatch.setattr(database_instance, "BANK_SNAPSHOT_INTERVAL", 3)
+    db.add_user(username="alice", password="", salesman_id=1, role="user", balance=0.0)
+    user_id = db.get_user_by_username("alice").user_id
+    for _ in range(4):
+        db.deposit_cash(user_id, 2.5, salesman_id=1)
+    db.adjust_bank_field("costs_total", 7.0, "count", salesman_id=1)
+
+    bank = db.get_bank()
+    assert bank.customer_funds == pytest.approx(10.0)
+    assert bank.costs_total == pytest.approx(7.0)
+
+    session = db.get_session()
+    try:
+        snapshots = session.execute(text("SELECT last_entry_id FROM bank_snapshots ORDER BY snapshot_id")).scalars().all()
+    finally:
+        session.close()
+    # baseline of the pre-ledger bank row, then one roll-up at entry 3
+    assert snapshots == [0, 3]
+
+    assert db.compact_bank_ledger() == 5
+    assert db.compact_bank_ledger() is None
+    assert _bank_row(db)["customer_funds"] == pytest.approx(10.0)
+    assert db.get_bank().to_dict() == bank.to_dict()
+    assert db.get_bank_history("customer_funds", limit=1)[0]["value"] == pytest.approx(10.0)
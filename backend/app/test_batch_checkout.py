@@ -0,0 +1,53 @@
+import math
+
+import pytest
+
+
+@pytest.fixture
+def db(db):
+    # 1 package x 10 units
+    db.add_ingredient(name="Bottle", price_per_package=5.0, stock_quantity=1, number_ingredients=10, pfand=0.25)
+    bottle = db.get_all_ingredients()[0]
+    db.add_product(name="Cola", ingredients=[(bottle, 1)], price_per_unit=1.0, category="raw")
+    db.add_user(username="alice", password="", salesman_id=1, role="user", balance=10.0)
+    db.add_user(username="bob", password="", salesman_id=1, role="user", balance=10.0)
+    return db
+
+
+def test_batch_checkout_applies_cart_in_one_transaction(db):
+    alice = db.get_user_by_username("alice")
+    bob = db.get_user_by_username("bob")
+    cola = db.get_all_products()[0]
+    bank_before = db.get_bank().customer_funds
+
+    sales = db.make_multiple_purchases([
+        {"consumer_id": alice.user_id, "product_id": cola.product_id, "quantity": 2},
+        {"consumer_id": bob.user_id, "product_id": cola.product_id, "quantity": 1},
+        {"consumer_id": alice.user_id, "product_id": cola.product_id, "quantity": 1, "donator_id": bob.user_id},
+    ], salesman_id=1)
+
+    assert len(sales) == 3
+    assert math.isclose(db.get_user_by_id(alice.user_id).balance, 10.0 - 2 * 1.25)
+    assert math.isclose(db.get_user_by_id(bob.user_id).balance, 10.0 - 2 * 1.25)
+    assert db.get_all_ingredients()[0].stock_quantity == 6
+    assert db.get_all_products()[0].stock_quantity == 6
+    assert math.isclose(db.get_bank().customer_funds, bank_before - 4 * 1.25)
+    assert db.get_pfand_history(alice.user_id, cola.product_id).counter == 3
+    assert db.get_pfand_history(bob.user_id, cola.product_id).counter == 1
+
+
+def test_batch_checkout_validates_aggregate_ingredient_demand(db):
+    alice = db.get_user_by_username("alice")
+    bob = db.get_user_by_username("bob")
+    cola = db.get_all_products()[0]
+
+    # Each line fits the stock on its own, together they need 12 of 10 bottles.
+    with pytest.raises(RuntimeError, match="Insufficient stock"):
+        db.make_multiple_purchases([
+            {"consumer_id": alice.user_id, "product_id": cola.product_id, "quantity": 6},
+            {"consumer_id": bob.user_id, "product_id": cola.product_id, "quantity": 6},
+        ], salesman_id=1)
+
+    assert db.get_all_ingredients()[0].stock_quantity == 10
+    assert math.isclose(db.get_user_by_id(alice.user_id).balance, 10.0)
+    assert db.get_all_sales() == []
@@ -0,0 +1,50 @@
+import os
+import sys
+
+from sqlalchemy import event
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import chame_app.database as database_module
+from chame_app.database import reset_database
+from chame_app.database_instance import Database
+import services.admin_api as api
+
+
+def _purchase_statement_count(tmp_path, monkeypatch, sharing_products):
+    monkeypatch.setenv("PRIVATE_STORAGE", str(tmp_path))
+    monkeypatch.delenv("HOME", raising=False)
+    reset_database()
+    api._database = None
+
+    db = Database(apply_migrations=False)
+    db.add_ingredient(name="Bread", price_per_package=1.0, stock_quantity=100, number_ingredients=10, pfand=0.25)
+    bread = db.get_all_ingredients()[0]
+    for index in range(sharing_products):
+        db.add_product(name=f"Toast {index}", ingredients=[(bread, 1)], price_per_unit=1.0, category="raw")
+    db.add_user(username="buyer", password="", salesman_id=1, role="user", balance=100.0)
+    buyer = db.get_user_by_username("buyer")
+    product = next(product for product in db.get_all_products() if product.name == "Toast 0")
+
+    statements = []
+
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append(statement)
+
+    event.listen(database_module._engine, "before_cursor_execute", _count)
+    try:
+        db.make_purchase(buyer.user_id, product.product_id, 1, salesman_id=1)
+    finally:
+        event.remove(database_module._engine, "before_cursor_execute", _count)
+
+    refreshed = {product.name: product.stock_quantity for product in db.get_all_products()}
+    # 100 packages x 10 units, one unit used; every sharing product is updated
+    assert set(refreshed.values()) == {999}
+    return len(statements)
+
+
+def test_checkout_query_count_does_not_grow_with_shared_products(tmp_path, monkeypatch):
+    few = _purchase_statement_count(tmp_path / "few", monkeypatch, 1)
+    many = _purchase_statement_count(tmp_path / "many", monkeypatch, 12)
+    assert few == many
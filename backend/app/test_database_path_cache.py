@@ -0,0 +1,122 @@
+import os
+import sqlite3
+import sys
+from pathlib import Path
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import chame_app.database as database_module
+from chame_app.database import RESOLUTION_CACHE_FILENAME, resolve_database_path
+
+
+def _create_sqlite_db(path: Path, statements: list[str]):
+    with sqlite3.connect(path) as conn:
+        for statement in statements:
+            conn.execute(statement)
+
+
+def _setup_legacy_layout(tmp_path, monkeypatch):
+    app_root = tmp_path / "app_root"
+    files_dir = app_root / "files"
+    legacy_dir = app_root / "legacy"
+    files_dir.mkdir(parents=True)
+    legacy_dir.mkdir(parents=True)
+
+    legacy_db = legacy_dir / "kassensystem.db"
+    _create_sqlite_db(legacy_db, ["CREATE TABLE example (id INTEGER PRIMARY KEY)"])
+
+    monkeypatch.setenv("PRIVATE_STORAGE", str(files_dir))
+    monkeypatch.setenv("HOME", str(files_dir))
+    monkeypatch.setenv("APP_PRIVATE_ROOT", str(app_root))
+    monkeypatch.delenv("CHAME_DB_FORCE_RESCAN", raising=False)
+    return files_dir, legacy_db
+
+
+def _fail_on_scan(*args, **kwargs):
+    raise AssertionError("database candidates were rescanned")
+
+
+def test_resolution_is_persisted_and_reused_without_rescanning(tmp_path, monkeypatch):
+    files_dir, legacy_db = _setup_legacy_layout(tmp_path, monkeypatch)
+
+    assert resolve_database_path() == legacy_db
+    assert (files_dir / RESOLUTION_CACHE_FILENAME).exists()
+
+    monkeypatch.setattr(database_module, "_collect_database_candidates", _fail_on_scan)
+    monkeypatch.setattr(database_module, "_score_database_candidate", _fail_on_scan)
+
+    # Writes to the chosen database itself must not invalidate the record.
+    _create_sqlite_db(legacy_db, ["CREATE TABLE more_data (id INTEGER PRIMARY KEY)"])
+
+    assert resolve_database_path() == legacy_db
+
+
+def test_changed_candidate_triggers_full_rescan(tmp_path, monkeypatch):
+    files_dir, legacy_db = _setup_legacy_layout(tmp_path, monkeypatch)
+    assert resolve_database_path() == legacy_db
+
+    preferred_db = files_dir / "kassensystem.db"
+    _create_sqlite_db(
+        preferred_db,
+        [
+            "CREATE TABLE users (user_id INTEGER PRIMARY KEY, name TEXT)",
+            "CREATE TABLE products (product_id INTEGER PRIMARY KEY, name TEXT)",
+            "INSERT INTO users (user_id, name) VALUES (1, 'admin')",
+            "INSERT INTO users (user_id, name) VALUES (2, 'alice')",
+            "INSERT INTO products (product_id, name) VALUES (1, 'toast')",
+        ],
+    )
+
+    assert resolve_database_path() == preferred_db
+
+
+def test_new_candidate_triggers_full_rescan(tmp_path, monkeypatch):
+    files_dir, legacy_db = _setup_legacy_layout(tmp_path, monkeypatch)
+    assert resolve_database_path() == legacy_db
+
+    # Sidecar files next to the live database move the directory mtime but
+    # add no candidate, so the record still holds.
+    (files_dir / "kassensystem.db-wal").write_bytes(b"")
+    score = database_module._score_database_candidate
+    monkeypatch.setattr(database_module, "_score_database_candidate", _fail_on_scan)
+    assert resolve_database_path() == legacy_db
+    monkeypatch.setattr(database_module, "_score_database_candidate", score)
+
+    # A copy restored into a new directory below a search root must be found.
+    restored_dir = tmp_path / "app_root" / "restored"
+    restored_dir.mkdir()
+    restored_db = restored_dir / "kassensystem.db"
+    _create_sqlite_db(
+        restored_db,
+        [
+            "CREATE TABLE users (user_id INTEGER PRIMARY KEY, name TEXT)",
+            "INSERT INTO users (user_id, name) VALUES (1, 'admin')",
+        ],
+    )
+
+    assert resolve_database_path() == restored_db
+
+
+def test_force_rescan_ignores_persisted_resolution(tmp_path, monkeypatch):
+    _files_dir, legacy_db = _setup_legacy_layout(tmp_path, monkeypatch)
+    assert resolve_database_path() == legacy_db
+
+    scanned_roots = []
+    original_collect = database_module._collect_database_candidates
+
+    def _recording_collect(root, preferred_path, max_depth=3, directories=None):
+        scanned_roots.append(root)
+        return original_collect(root, preferred_path, max_depth, directories)
+
+    monkeypatch.setattr(database_module, "_collect_database_candidates", _recording_collect)
+
+    assert resolve_database_path() == legacy_db
+    assert scanned_roots == []
+
+    assert resolve_database_path(force_rescan=True) == legacy_db
+    assert scanned_roots
+
+    scanned_roots.clear()
+    monkeypatch.setenv("CHAME_DB_FORCE_RESCAN", "1")
+    assert resolve_database_path() == legacy_db
+    assert scanned_roots
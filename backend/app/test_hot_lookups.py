@@ -0,0 +1,28 @@
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+
+
+def test_cached_lookups_bind_new_ids_and_skip_inactive_rows(db):
+    db.add_user(username="first", password="", salesman_id=1, role="user", balance=1.0)
+    db.add_user(username="second", password="", salesman_id=1, role="user", balance=2.0)
+    first = db.get_user_by_username("first")
+    second = db.get_user_by_username("second")
+
+    # The same cached statement must return different rows for different ids.
+    assert db.get_user_by_id(first.user_id).name == "first"
+    assert db.get_user_by_id(second.user_id).name == "second"
+
+    session = db.get_session()
+    user = session.merge(second)
+    user.is_deleted = True
+    session.commit()
+    session.close()
+
+    with pytest.raises(RuntimeError, match="User not found"):
+        db.get_user_by_id(second.user_id)
+    assert db.get_bank().account_id == 1
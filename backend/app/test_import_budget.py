@@ -0,0 +1,60 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Wall-clock budget for `import services.admin_api` in a fresh interpreter.
+# Timing depends on the machine, so it is only checked when
+# CHAME_IMPORT_BUDGET_MS is set (e.g. on a known device or a quiet runner).
+IMPORT_BUDGET_MS = os.environ.get("CHAME_IMPORT_BUDGET_MS")
+
+# Subsystems that must only be loaded on first use.
+LAZY_MODULES = [
+    "services.receipt_parser",
+    "services.database_backup",
+    "services.flexible_deletion_service",
+    "services.enhanced_deletion_service",
+    "chame_app.simple_migrations",
+    "passlib",
+]
+
+_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import services.admin_api
+elapsed_ms = (time.perf_counter() - started) * 1000
+print(json.dumps({"elapsed_ms": elapsed_ms, "modules": sorted(sys.modules)}))
+"""
+
+
+def _import_admin_api():
+    result = subprocess.run(
+        [sys.executable, "-c", _PROBE],
+        cwd=APP_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_admin_api_import_defers_heavy_subsystems():
+    probe = _import_admin_api()
+    loaded = [name for name in LAZY_MODULES if name in probe["modules"]]
+    assert loaded == []
+
+
+@pytest.mark.skipif(not IMPORT_BUDGET_MS, reason="set CHAME_IMPORT_BUDGET_MS to check the import time")
+def test_admin_api_import_stays_within_budget():
+    budget_ms = float(IMPORT_BUDGET_MS)
+    probe = _import_admin_api()
+    assert probe["elapsed_ms"] <= budget_ms, (
+        f"import services.admin_api took {probe['elapsed_ms']:.0f} ms "
+        f"(budget {budget_ms:.0f} ms)"
+    )
@@ -0,0 +1,102 @@
+import os
+import sys
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import services.admin_api as api
+
+
+def _seed(db, statement, rows):
+    session = db.get_session()
+    try:
+        session.execute(text(statement), rows)
+        session.commit()
+    finally:
+        session.close()
+
+
+def _walk(fetch, items_key, next_key):
+    """Follow next_cursor until it runs out; returns every page."""
+    pages, cursor = [], None
+    while True:
+        page = fetch(cursor)
+        pages.append(page[items_key])
+        cursor = page[next_key]
+        if cursor is None:
+            return pages
+
+
+def test_history_pages_are_full_and_filtered_in_sql(db):
+    db.add_user(username="alice", password="", salesman_id=1, role="user", balance=0.0)
+    alice = db.get_user_by_username("alice").user_id
+    god = next(iter(api._get_god_user_ids()))
+    # every third row was rung up by the god account and must stay invisible
+    salesmen = [god if index % 3 == 0 else alice for index in range(30)]
+    _seed(db, "INSERT INTO sales (consumer_id, product_id, quantity, total_price, timestamp, salesman_id) "
+              "VALUES (:user_id, 1, 1, 1.0, '2026-01-01 12:00:00', :salesman_id)",
+          [{"user_id": alice, "salesman_id": salesman} for salesman in salesmen])
+    _seed(db, "INSERT INTO transactions (user_id, amount, type, timestamp, salesman_id) "
+              "VALUES (:user_id, 1.0, :type, '2026-01-01 12:00:00', :salesman_id)",
+          [{"user_id": alice, "type": "deposit" if index % 2 else "withdraw", "salesman_id": salesman}
+           for index, salesman in enumerate(salesmen)])
+
+    first = api.get_sales_paginated(1, 7)
+    assert first["total_count"] == 20
+    assert first["total_pages"] == 3
+    pages = _walk(lambda cursor: api.get_sales_paginated(1, 7, cursor), "sales", "next_cursor")
+    assert [len(page) for page in pages] == [7, 7, 6]
+    sale_ids = [sale["sale_id"] for page in pages for sale in page]
+    assert sale_ids == sorted(sale_ids, reverse=True) and len(set(sale_ids)) == 20
+    assert all(sale["salesman_id"] != god for page in pages for sale in page)
+    assert api.get_sales_paginated(2, 7)["sales"] == pages[1]
+
+    deposits = _walk(lambda cursor: api.get_filtered_transaction("all", "deposit", cursor, 4), "items", "next_cursor")
+    visible = [tx for page in deposits for tx in page]
+    assert len(visible) == 10
+    assert all(tx["type"] == "deposit" and tx["salesman_id"] != god for tx in visible)
+    assert [len(page) for page in deposits][:-1] == [4, 4]
+    # without a limit the full list keeps its insertion order
+    full = [tx["transaction_id"] for tx in api.get_filtered_transaction()]
+    assert len(full) == 20 and full == sorted(full)
+
+    api._set_current_viewer(db.get_user_by_id(god))
+    try:
+        assert api.get_sales_paginated(1, 7)["total_count"] == 30
+    finally:
+        api._clear_current_viewer()
+
+
+def test_deep_pages_run_the_same_queries_as_the_first(db):
+    db.add_user(username="alice", password="", salesman_id=1, role="user", balance=0.0)
+    alice = db.get_user_by_username("alice").user_id
+    _seed(db, "INSERT INTO bank_transactions (amount, type, timestamp, description, salesman_id) "
+              "VALUES (1.0, 'withdraw', '2026-01-01 12:00:00', NULL, :salesman_id)",
+          [{"salesman_id": alice}] * 500)
+    api._get_god_user_ids()  # warm the role cache
+
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(Engine, "before_cursor_execute", record)
+    try:
+        first = api.get_bank_transaction(None, 25)
+        first_statements = list(statements)
+        statements.clear()
+        deep = api.get_bank_transaction(first["items"][-1]["transaction_id"] - 400, 25)
+    finally:
+        event.remove(Engine, "before_cursor_execute", record)
+
+    assert len(first["items"]) == len(deep["items"]) == 25
+    # bank transactions were already listed newest first
+    full = [bt["transaction_id"] for bt in api.get_bank_transaction()]
+    assert full[:25] == [bt["transaction_id"] for bt in first["items"]] and full == sorted(full, reverse=True)
+    assert len(statements) == len(first_statements) == 1
+    # SQLite always renders LIMIT ? OFFSET ?; the offset must stay 0
+    statement, parameters = statements[0]
+    assert "transaction_id < ?" in statement and parameters[-1] == 0
+    assert deep["items"][0]["transaction_id"] == first["items"][-1]["transaction_id"] - 401
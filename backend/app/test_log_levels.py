@@ -0,0 +1,60 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import utils.firebase_logger as firebase_logging
+from utils.firebase_logger import firebase_logger, get_logger, log_debug, log_info, set_log_level
+
+
+def _capture(monkeypatch, bridge_available=True):
+    records = []
+    monkeypatch.setattr(firebase_logging, "_default_log_level", firebase_logging.LOG_LEVELS["INFO"])
+    monkeypatch.setattr(firebase_logging, "_subsystem_log_levels", {})
+    monkeypatch.setattr(firebase_logger, "_bridge_available", bridge_available)
+    monkeypatch.setattr(firebase_logger, "_log_to_bridge", lambda level, message, metadata=None: records.append((level, message, metadata)))
+    return records
+
+
+def _must_not_run():
+    raise AssertionError("disabled record was formatted")
+
+
+def test_disabled_records_are_dropped_before_formatting(monkeypatch):
+    records = _capture(monkeypatch)
+
+    log_debug(_must_not_run, _must_not_run, subsystem="database")
+    get_logger("parser").debug(_must_not_run)
+    assert records == []
+
+    set_log_level("DEBUG", "database")
+    log_debug(lambda: "stock updated", lambda: {"product": "Toast"}, subsystem="database")
+    get_logger("parser").debug(_must_not_run)
+    assert records == [("DEBUG", "stock updated", {"product": "Toast", "subsystem": "database"})]
+
+    set_log_level("ERROR")
+    log_info(_must_not_run)
+    get_logger("database").debug(lambda: "still enabled")
+    assert records[-1][1] == "still enabled"
+
+
+def test_nothing_is_formatted_without_a_consumer(monkeypatch):
+    records = _capture(monkeypatch, bridge_available=False)
+    set_log_level("DEBUG")
+    log_info(_must_not_run, _must_not_run)
+    assert records == []
+
+
+def test_log_levels_from_environment(monkeypatch):
+    _capture(monkeypatch)
+    monkeypatch.setenv("CHAME_LOG_LEVEL", "warn")
+    monkeypatch.setenv("CHAME_LOG_LEVELS", "parser=DEBUG, backup=OFF")
+    firebase_logging._configure_log_levels_from_env()
+    levels = firebase_logging.get_log_levels()
+    assert levels["default"] == "WARN"
+    assert levels["parser"] == "DEBUG"
+    assert levels["backup"] == "OFF"
+    assert levels["database"] == "WARN"
+
+    firebase_logging._subsystem_log_levels.clear()
+    set_log_level("INFO")
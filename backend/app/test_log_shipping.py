@@ -0,0 +1,86 @@
+import os
+import sys
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utils.firebase_logger import FirebaseLogger, LogShipper
+
+
+def test_records_are_shipped_in_batches_off_the_caller_thread():
+    batches = []
+    shipping_threads = set()
+
+    def sink(batch):
+        shipping_threads.add(threading.current_thread().name)
+        batches.append(batch)
+
+    shipper = LogShipper(sink, max_queue=100, batch_size=10, flush_interval=5.0)
+    for index in range(25):
+        shipper.enqueue(("INFO", f"message {index}", {"index": index}))
+    assert shipper.flush(timeout=5.0)
+
+    assert [record[1] for batch in batches for record in batch] == [f"message {index}" for index in range(25)]
+    assert all(len(batch) <= 10 for batch in batches)
+    assert len(batches) < 25
+    assert shipping_threads == {"firebase-log-shipper"}
+    assert shipper.get_stats()["shipped"] == 25
+
+
+def _blocked_shipper(overflow):
+    release = threading.Event()
+    shipped = []
+
+    def sink(batch):
+        release.wait(5.0)
+        shipped.extend(record[1] for record in batch)
+
+    shipper = LogShipper(sink, max_queue=3, batch_size=1, flush_interval=0.0, overflow=overflow)
+    shipper.enqueue(("INFO", "in flight", None))
+    # Wait until the worker holds the first record, so the queue itself is empty
+    while shipper.get_stats()["queued"]:
+        time.sleep(0.001)
+    return shipper, release, shipped
+
+
+def test_drop_oldest_keeps_the_newest_records():
+    shipper, release, shipped = _blocked_shipper("drop_oldest")
+    for index in range(5):
+        assert shipper.enqueue(("INFO", f"message {index}", None))
+    release.set()
+    assert shipper.flush(timeout=5.0)
+    assert shipped == ["in flight", "message 2", "message 3", "message 4"]
+    assert shipper.get_stats()["dropped"] == 2
+
+
+def test_drop_newest_rejects_records_when_full():
+    shipper, release, shipped = _blocked_shipper("drop_newest")
+    results = [shipper.enqueue(("INFO", f"message {index}", None)) for index in range(5)]
+    release.set()
+    assert shipper.flush(timeout=5.0)
+    assert results == [True, True, True, False, False]
+    assert shipped == ["in flight", "message 0", "message 1", "message 2"]
+
+
+def test_failing_sink_does_not_reach_the_caller():
+    def sink(batch):
+        raise RuntimeError("bridge gone")
+
+    shipper = LogShipper(sink, batch_size=5, flush_interval=0.0)
+    shipper.enqueue(("ERROR", "boom", None))
+    assert shipper.flush(timeout=5.0)
+    assert shipper.get_stats()["failed_batches"] == 1
+    assert shipper.get_stats()["failed"] == 1
+
+
+def test_batches_without_an_activity_are_counted_as_failed(monkeypatch):
+    logger = FirebaseLogger()
+    monkeypatch.setattr(logger, "_resolve_activity", lambda: False)
+    for index in range(3):
+        logger._shipper.enqueue(("INFO", f"message {index}", None))
+    assert logger._shipper.flush(timeout=5.0)
+
+    stats = logger._shipper.get_stats()
+    assert stats["shipped"] == 0
+    assert stats["failed"] == 3
@@ -0,0 +1,36 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utils import perf_tracing
+import services.admin_api as api
+
+
+def test_spans_record_nesting_statements_and_rows(db, monkeypatch):
+    db.add_ingredient(name="Bread", price_per_package=1.0, stock_quantity=10, number_ingredients=10, pfand=0.0)
+    db.add_product(name="Toast", ingredients=[(db.get_all_ingredients()[0], 1)], price_per_unit=1.0, category="toast", toaster_space=1)
+    db.add_user(username="alice", password="", salesman_id=1, role="user", balance=10.0)
+    alice = db.get_user_by_username("alice")
+    toast = db.get_all_products()[0]
+
+    api.reset_perf_stats()
+    db.get_bank()
+    assert api.get_perf_stats()["operations"] == {}
+
+    monkeypatch.setattr(perf_tracing, "_enabled", True)
+    api.get_all_users()
+    api.make_multiple_purchases([{"consumer_id": alice.user_id, "product_id": toast.product_id, "quantity": 2}], salesman_id=1)
+    stats = api.get_perf_stats()
+
+    assert stats["enabled"]
+    users = stats["paths"]["admin_api.get_all_users > Database.get_user_summaries"]
+    assert users["calls"] == 1 and users["statements"] == 1
+    outer = stats["operations"]["admin_api.make_multiple_purchases"]
+    inner = stats["paths"]["admin_api.make_multiple_purchases > Database.make_multiple_purchases"]
+    assert outer["statements"] >= inner["statements"] > 0
+    assert inner["rows"] >= 2
+    assert outer["total_ms"] >= inner["total_ms"]
+
+    api.reset_perf_stats()
+    assert api.get_perf_stats()["paths"] == {}
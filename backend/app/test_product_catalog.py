@@ -0,0 +1,83 @@
+import json
+import os
+import sys
+
+import pytest
+from sqlalchemy import text
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import services.admin_api as api
+
+
+def test_catalog_carries_aggregates_instead_of_sales_history(db):
+    db.add_ingredient(name="Bottle", price_per_package=1.0, stock_quantity=20, number_ingredients=20, pfand=0.25)
+    db.add_ingredient(name="Bread", price_per_package=1.0, stock_quantity=20, number_ingredients=20, pfand=0.0)
+    bottle, bread = sorted(db.get_all_ingredients(), key=lambda ingredient: ingredient.name)
+    db.add_product(name="Mate", ingredients=[(bottle, 1)], price_per_unit=2.0, category="raw")
+    db.add_product(name="Toast", ingredients=[(bread, 2)], price_per_unit=1.555, category="toast", toaster_space=1)
+    db.add_user(username="alice", password="", salesman_id=1, role="user", balance=50.0)
+    alice = db.get_user_by_username("alice")
+    mate, toast = sorted(db.get_all_products(), key=lambda product: product.name)
+
+    db.make_purchase(alice.user_id, mate.product_id, 2, salesman_id=1)
+    payload_size = len(json.dumps(api.get_all_products()))
+    for _ in range(5):
+        db.make_purchase(alice.user_id, mate.product_id, 1, salesman_id=1)
+
+    catalog = {product["name"]: product for product in api.get_all_products()}
+    # only the aggregate digits change, not the number of serialized sales
+    assert len(json.dumps(list(catalog.values()))) - payload_size < 10
+    assert "sales" not in catalog["Mate"]
+    assert catalog["Mate"]["sale_count"] == 6
+    assert catalog["Mate"]["units_sold"] == 7
+    assert catalog["Mate"]["revenue"] == pytest.approx(50.0 - db.get_user_by_username("alice").balance)
+    assert catalog["Mate"]["last_sold"] is not None
+    assert catalog["Toast"]["sale_count"] == 0 and catalog["Toast"]["last_sold"] is None
+
+    # the projection matches the ORM serialization field for field
+    for product in db.get_all_products():
+        expected = product.to_dict()
+        assert {key: catalog[product.name][key] for key in expected} == expected
+
+    # pfand of deleted or disabled ingredients still counts, as in Product._compute_pfand
+    db.add_ingredient(name="Crate", price_per_package=1.0, stock_quantity=20, number_ingredients=20, pfand=1.5)
+    db.add_ingredient(name="Cap", price_per_package=1.0, stock_quantity=20, number_ingredients=20, pfand=0.1)
+    crate = next(i for i in db.get_all_ingredients() if i.name == "Crate")
+    cap = next(i for i in db.get_all_ingredients() if i.name == "Cap")
+    db.add_product(name="Club", ingredients=[(bottle, 1), (crate, 1), (cap, 2)], price_per_unit=3.0, category="toast", toaster_space=1)
+    session = db.get_session()
+    try:
+        session.execute(text("UPDATE ingredients SET is_deleted = 1, deleted_at = '2026-01-01 12:00:00' "
+                             "WHERE ingredient_id = :id"), {"id": crate.ingredient_id})
+        session.execute(text("UPDATE ingredients SET is_disabled = 1, disabled_reason = 'recall' "
+                             "WHERE ingredient_id = :id"), {"id": cap.ingredient_id})
+        session.commit()
+    finally:
+        session.close()
+    catalog = {product["name"]: product for product in api.get_product_catalog()}
+    club = next(product for product in db.get_all_products() if product.name == "Club")
+    expected = club.to_dict()
+    assert expected["pfand"] == pytest.approx(1.95)
+    assert {key: catalog["Club"][key] for key in expected} == expected
+    assert catalog["Club"]["is_available"] is True
+
+    assert [product["name"] for product in api.get_product_catalog(category="toast")] == ["Toast", "Club"]
+
+    page = api.get_product_sales(mate.product_id, page=2, page_size=4)
+    assert page["total_count"] == 6
+    assert page["total_pages"] == 2
+    assert len(page["sales"]) == 2
+
+
+def test_get_all_products_returns_sales_usable_after_the_session_closes(db):
+    db.add_ingredient(name="Bottle", price_per_package=1.0, stock_quantity=10, number_ingredients=10, pfand=0.25)
+    bottle = db.get_all_ingredients()[0]
+    db.add_product(name="Mate", ingredients=[(bottle, 1)], price_per_unit=2.0, category="raw")
+    db.add_user(username="alice", password="", salesman_id=1, role="user", balance=50.0)
+    alice = db.get_user_by_username("alice")
+    db.make_purchase(alice.user_id, db.get_all_products()[0].product_id, 2, salesman_id=1)
+
+    mate = db.get_all_products()[0]
+    assert len(mate.sales) == 1
+    assert len(mate.to_dict(include_sales=True)["sales"]) == 1
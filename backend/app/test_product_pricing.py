@@ -0,0 +1,74 @@
+import math
+import os
+import sys
+from decimal import Decimal
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from chame_app.database import get_session
+from chame_app.product_pricing import pricing_table
+from models.ingredient import Ingredient
+from models.product_table import Product
+
+
+def test_prices_are_cached_and_follow_price_and_pfand_changes(db, monkeypatch):
+    db.add_ingredient(name="Club Mate", price_per_package=20.0, stock_quantity=1, number_ingredients=20, pfand=0.15)
+    mate = db.get_all_ingredients()[0]
+    db.add_product(name="Mate", ingredients=[(mate, 1)], price_per_unit=1.5, category="raw")
+    db.add_user(username="alice", password="", salesman_id=1, role="user", balance=10.0)
+    alice = db.get_user_by_username("alice")
+
+    computed = []
+    original_pricing_for = Product.pricing_for
+    monkeypatch.setattr(Product, "pricing_for", classmethod(
+        lambda cls, price_per_unit, pfand: computed.append(price_per_unit) or original_pricing_for(price_per_unit, pfand)
+    ))
+
+    for _ in range(3):
+        product = db.get_all_products()[0]
+        product.to_dict(True, True, True, True)
+        assert math.isclose(product.get_checkout_total_price(2), 3.3)
+    assert computed == [1.5]
+
+    sale = db.make_purchase(alice.user_id, product.product_id, 2, salesman_id=1)
+    assert math.isclose(sale.total_price, 3.3)
+    assert computed == [1.5]
+
+    session = get_session()
+    session.get(Product, product.product_id).price_per_unit = 2.0
+    session.commit()
+    assert math.isclose(db.get_all_products()[0].get_base_total_price(1), 2.15)
+
+    session.get(Ingredient, mate.ingredient_id).pfand = 0.25
+    session.rollback()
+    assert math.isclose(db.get_all_products()[0].get_pfand(), 0.15)
+
+    session.get(Ingredient, mate.ingredient_id).pfand = 0.25
+    session.commit()
+    session.close()
+    assert math.isclose(db.get_all_products()[0].get_base_total_price(2), 4.5)
+    assert len(pricing_table) == 1
+
+
+def test_a_session_with_an_older_price_does_not_poison_the_table(db):
+    db.add_ingredient(name="Bread", price_per_package=1.0, stock_quantity=10, number_ingredients=10, pfand=0.0)
+    db.add_product(name="Toast", ingredients=[(db.get_all_ingredients()[0], 1)], price_per_unit=1.0, category="toast", toaster_space=1)
+    product_id = db.get_all_products()[0].product_id
+
+    writer, stale, fresh = get_session(), get_session(), get_session()
+    try:
+        stale_product = stale.get(Product, product_id)
+        assert stale_product.price_per_unit == 1.0
+        writer.get(Product, product_id).price_per_unit = 5.0
+        writer.commit()
+
+        # the stale session keeps its own view of the price ...
+        assert pricing_table.get(stale_product).checkout_price == Decimal("1.00")
+        # ... but a session that reads the committed price is not served it
+        fresh_product = fresh.get(Product, product_id)
+        assert fresh_product.price_per_unit == 5.0
+        assert fresh_product.get_checkout_price_per_unit() == 5.0
+        assert pricing_table.get(fresh_product).checkout_price == Decimal("5.00")
+    finally:
+        for session in (writer, stale, fresh):
+            session.close()
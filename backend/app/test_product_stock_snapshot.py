@@ -0,0 +1,68 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from chame_app.database import get_session
+from chame_app.database_instance import Database
+from models.ingredient import Ingredient
+from models.product_ingredient_table import ProductIngredient
+from models.product_table import Product
+import services.admin_api as api
+
+
+def _seed(db):
+    db.add_ingredient(name="Bread", price_per_package=2.0, stock_quantity=1, number_ingredients=7, pfand=0.0)
+    db.add_ingredient(name="Cheese", price_per_package=4.0, stock_quantity=1, number_ingredients=10, pfand=0.0)
+    db.add_ingredient(name="Ham", price_per_package=4.0, stock_quantity=1, number_ingredients=10, pfand=0.0)
+    ingredients = {ingredient.name: ingredient for ingredient in db.get_all_ingredients()}
+    db.add_product(name="Cheese Toast", ingredients=[(ingredients["Bread"], 2), (ingredients["Cheese"], 1)], price_per_unit=1.5, category="toast", toaster_space=1)
+    db.add_product(name="Half Bread", ingredients=[(ingredients["Bread"], 0.3)], price_per_unit=0.5, category="raw")
+    db.add_product(name="Ham Toast", ingredients=[(ingredients["Bread"], 2), (ingredients["Ham"], 1)], price_per_unit=2.0, category="toast", toaster_space=1)
+    return ingredients
+
+
+def test_snapshot_matches_python_recompute(db, monkeypatch):
+    ingredients = _seed(db)
+
+    session = get_session()
+    session.get(Ingredient, ingredients["Ham"].ingredient_id).is_disabled = True
+    session.add(Product(name="Empty", category="raw"))
+    session.commit()
+
+    expected = {}
+    for product in session.query(Product).all():
+        product.update_stock()
+        expected[product.product_id] = product.stock_quantity
+    session.rollback()
+    session.close()
+
+    snapshot = db.get_product_stock_snapshot()
+    assert snapshot == expected
+    names = {product.product_id: product.name for product in db.get_all_products()}
+    assert {names[product_id]: stock for product_id, stock in snapshot.items() if product_id in names} == {
+        "Cheese Toast": 3, "Half Bread": 23, "Ham Toast": 0, "Empty": 0,
+    }
+
+    monkeypatch.setattr(api, "database", db)
+    assert {row["product_id"] for row in api.get_product_stock_snapshot()} == set(names)
+
+
+def test_mismatches_are_found_and_fixed_on_startup(db):
+    _seed(db)
+    assert db.get_product_stock_mismatches() == []
+
+    session = get_session()
+    product = session.query(Product).filter_by(name="Cheese Toast").one()
+    product.stock_quantity = 99
+    session.commit()
+    product_id = product.product_id
+    session.close()
+
+    assert db.get_product_stock_mismatches() == [
+        {"product_id": product_id, "stock_quantity": 99, "expected_stock_quantity": 3}
+    ]
+
+    Database(apply_migrations=False, warm_start=False)
+    assert db.get_product_stock_mismatches() == []
+    assert db.get_product_by_id(product_id).stock_quantity == 3
@@ -0,0 +1,81 @@
+import os
+import shutil
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from chame_app.database import reset_database
+from models.sales_table import Sale
+from utils import perf_tracing
+import services.admin_api as api
+
+TEST_DATABASES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "testing", "test_databases")
+
+BUDGETED_ENDPOINTS = [
+    ("get_all_users", ()),
+    ("get_all_products", ()),
+    ("get_all_ingredients", ()),
+    ("get_all_sales", ()),
+    ("get_sales_paginated", (1, 20)),
+    ("get_all_toast_products", ()),
+    ("get_all_toast_rounds", ()),
+    ("get_all_raw_products", ()),
+    ("get_filtered_transaction", ()),
+    ("get_bank", ()),
+    ("get_bank_transaction", ()),
+    ("get_pfand_history", ()),
+    ("get_all_stock_history", ()),
+]
+
+
+def _open_copy(tmp_path, monkeypatch, name):
+    shutil.copy(os.path.join(TEST_DATABASES, name), tmp_path / "kassensystem.db")
+    monkeypatch.setenv("PRIVATE_STORAGE", str(tmp_path))
+    monkeypatch.delenv("HOME", raising=False)
+    reset_database()
+    monkeypatch.setattr(api, "_database", None)
+    monkeypatch.setattr(api, "database", api._DatabaseProxy())
+    api.create_database()
+    monkeypatch.setattr(perf_tracing, "_enabled", True)
+    monkeypatch.setattr(perf_tracing, "_enforce_budgets", True)
+    perf_tracing.reset_perf_stats()
+
+
+@pytest.mark.parametrize("database_file", ["v1.3/comprehensive_test.db", "v1.2/performance_test.db"])
+def test_list_endpoints_stay_within_query_budget(tmp_path, monkeypatch, database_file):
+    _open_copy(tmp_path, monkeypatch, database_file)
+
+    # Add rows with every relationship the endpoints serialize
+    toast = next((product for product in api.get_all_products() if product["category"] == "toast" and product["stock_quantity"] >= 2), None)
+    consumers = [user for user in api.get_all_users() if user["role"] == "user"][:2]
+    if toast and len(consumers) == 2:
+        api.add_toast_round(
+            [toast["product_id"]] * 2,
+            [user["user_id"] for user in consumers],
+            [consumers[1]["user_id"], None],
+            salesman_id=consumers[0]["user_id"],
+        )
+
+    for name, args in BUDGETED_ENDPOINTS:
+        getattr(api, name)(*args)  # raises QueryBudgetExceeded when over budget
+
+    stats = api.get_perf_stats()["operations"]
+    for name, _args in BUDGETED_ENDPOINTS:
+        assert stats[f"admin_api.{name}"]["over_budget"] == 0
+
+
+def test_lazy_loads_per_row_exceed_the_budget(tmp_path, monkeypatch):
+    _open_copy(tmp_path, monkeypatch, "v1.3/comprehensive_test.db")
+
+    @perf_tracing.traced("test.sales_with_lazy_consumers")
+    @perf_tracing.query_budget(2)
+    def sales_with_lazy_consumers():
+        session = api.database.get_session()
+        return [sale.consumer.name if sale.consumer else None for sale in session.query(Sale).all()]
+
+    with pytest.raises(perf_tracing.QueryBudgetExceeded) as excinfo:
+        sales_with_lazy_consumers()
+    assert excinfo.value.repeated[0][1] > 1
+    assert "FROM users" in excinfo.value.repeated[0][0]
@@ -0,0 +1,46 @@
+import os
+import sys
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from chame_app.database import get_read_session
+
+
+@pytest.fixture
+def db(db):
+    db.add_ingredient(name="Bread", price_per_package=1.0, stock_quantity=10, number_ingredients=10, pfand=0.0)
+    db.add_product(name="Toast", ingredients=[(db.get_all_ingredients()[0], 1)], price_per_unit=1.0, category="raw")
+    db.add_user(username="buyer", password="", salesman_id=1, role="user", balance=10.0)
+    return db
+
+
+def test_read_sessions_cannot_write(db):
+    session = get_read_session()
+    try:
+        with pytest.raises(OperationalError):
+            session.execute(text("UPDATE users SET balance = 0"))
+    finally:
+        session.close()
+
+
+def test_open_read_snapshot_does_not_block_checkout(db):
+    buyer = db.get_user_by_username("buyer")
+    product = db.get_all_products()[0]
+
+    # Hold a read transaction open across the purchase, like a slow list refresh.
+    reader = get_read_session()
+    raw = reader.connection().connection
+    raw.execute("BEGIN")
+    sales_before = raw.execute("SELECT COUNT(*) FROM sales").fetchone()[0]
+
+    db.make_purchase(buyer.user_id, product.product_id, 1, salesman_id=1)
+
+    # The reader keeps its snapshot; a fresh read sees the sale.
+    assert raw.execute("SELECT COUNT(*) FROM sales").fetchone()[0] == sales_before
+    raw.execute("COMMIT")
+    reader.close()
+    assert len(db.get_all_sales()) == sales_before + 1
@@ -0,0 +1,87 @@
+import os
+import sys
+
+import pytest
+from sqlalchemy import text
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import services.admin_api as api
+
+
+def _execute(db, statement, params=None):
+    session = db.get_session()
+    try:
+        session.execute(text(statement), params or {})
+        session.commit()
+    finally:
+        session.close()
+
+
+def test_reconcile_reports_per_user_and_bank_drift(db, monkeypatch):
+    db.add_ingredient(name="Bread", price_per_package=1.0, stock_quantity=10, number_ingredients=10, pfand=0.0)
+    bread = db.get_all_ingredients()[0]
+    db.add_product(name="Toast", ingredients=[(bread, 1)], price_per_unit=2.5, category="toast", toaster_space=1)
+    db.add_user(username="alice", password="", salesman_id=1, role="user", balance=10.0)
+    db.add_user(username="bob", password="", salesman_id=1, role="user", balance=0.0)
+    alice = db.get_user_by_username("alice")
+    bob = db.get_user_by_username("bob")
+    toast = db.get_all_products()[0]
+    db.deposit_cash(bob.user_id, 4.0, salesman_id=1)
+    db.make_purchase(bob.user_id, toast.product_id, 1, salesman_id=1, donator_id=alice.user_id)
+    db.withdraw_cash(bob.user_id, 1.0, salesman_id=1)
+
+    report = db.reconcile_ledgers()
+    assert report["ok"], report
+    assert report["bank"]["revenue_total"]["expected"] == pytest.approx(2.5)
+
+    _execute(db, "UPDATE users SET balance = balance + 1.5 WHERE user_id = :user_id", {"user_id": bob.user_id})
+    monkeypatch.setattr(api, "database", db)
+    report = api.reconcile_ledgers()
+    assert not report["ok"]
+    assert report["user_drift"] == [{"user_id": bob.user_id, "name": "bob", "balance": 4.5, "expected_balance": 3.0, "drift": 1.5}]
+    assert report["bank"]["customer_funds"]["drift"] == pytest.approx(-1.5)
+    assert report["bank"]["revenue_total"]["ok"]
+    assert report["bank"]["ingredient_value"]["ok"]
+
+
+def test_reconcile_scales_with_event_history(db):
+    db.add_user(username="alice", password="", salesman_id=1, role="user", balance=0.0)
+    alice = db.get_user_by_username("alice")
+    events = 50_000
+    session = db.get_session()
+    try:
+        session.execute(
+            text("INSERT INTO transactions (user_id, amount, type, timestamp, salesman_id) VALUES (:user_id, 1.0, 'deposit', '2026-01-01 12:00:00', 1)"),
+            [{"user_id": alice.user_id}] * events,
+        )
+        session.execute(
+            text("INSERT INTO sales (consumer_id, product_id, quantity, total_price, timestamp, salesman_id) VALUES (:user_id, 1, 1, 1.0, '2026-01-01 12:00:00', 1)"),
+            [{"user_id": alice.user_id}] * events,
+        )
+        session.commit()
+    finally:
+        session.close()
+
+    report = db.reconcile_ledgers()
+    assert report["users_checked"] >= 3
+    assert [entry["user_id"] for entry in report["user_drift"]] == []
+    assert report["bank"]["revenue_total"]["drift"] == pytest.approx(-events)
+    assert report["duration_ms"] < 5000
+
+
+def test_reconcile_follows_the_pfand_booking_of_ingredient_value(db):
+    db.add_ingredient(name="Bottle", price_per_package=12.0, stock_quantity=2, number_ingredients=10, pfand=0.08)
+    bottle = db.get_all_ingredients()[0]
+    db.add_product(name="Mate", ingredients=[(bottle, 1)], price_per_unit=2.0, category="raw")
+    db.add_user(username="alice", password="", salesman_id=1, role="user", balance=20.0)
+    alice = db.get_user_by_username("alice")
+    mate = db.get_all_products()[0]
+    db.stock_ingredient(bottle.ingredient_id, 1)
+    db.make_purchase(alice.user_id, mate.product_id, 3, salesman_id=1)
+    db.update_stock(bottle.ingredient_id, 20, comment="count")
+
+    report = db.reconcile_ledgers()
+    assert report["ok"], report
+    # 30 units stocked at 1.20 + 0.08, 3 sold and 7 written off at 1.20
+    assert report["bank"]["ingredient_value"]["expected"] == pytest.approx(30 * 1.28 - 10 * 1.2)
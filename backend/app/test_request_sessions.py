@@ -0,0 +1,57 @@
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from chame_app.database import get_scoped_session, request_session_scope
+import services.admin_api as api
+
+
+@pytest.fixture(autouse=True)
+def proxied_database(private_storage, monkeypatch):
+    """Serve admin_api through its lazy proxy, as the app does."""
+    monkeypatch.setattr(api, "database", api._DatabaseProxy())
+    return api.create_database(apply_migration=False)
+
+
+def test_each_thread_gets_its_own_session():
+    barrier = threading.Barrier(2)
+    sessions = []
+
+    def _worker():
+        with request_session_scope():
+            session = get_scoped_session()
+            barrier.wait()
+            sessions.append(session)
+            barrier.wait()
+
+    threads = [threading.Thread(target=_worker) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(sessions) == 2
+    assert sessions[0] is not sessions[1]
+
+
+def test_nested_scopes_share_the_session_until_the_outer_scope_ends():
+    with request_session_scope():
+        outer = get_scoped_session()
+        with request_session_scope():
+            assert get_scoped_session() is outer
+        assert get_scoped_session() is outer
+    assert get_scoped_session() is not outer
+
+
+def test_concurrent_admin_api_calls():
+    api.add_user("alice", 5.0, "user", salesman_id=1)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda _: api.get_all_users(), range(32)))
+
+    assert all(any(user["name"] == "alice" for user in users) for users in results)
@@ -0,0 +1,83 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from chame_app.database import get_read_session, get_session, reset_database
+from chame_app.database_instance import Database
+from chame_app.role_cache import role_cache
+import services.admin_api as api
+
+
+def test_role_cache_is_invalidated_only_by_role_changes(db):
+    session = get_session()
+    god_ids = api._get_god_user_ids()
+    assert len(god_ids) == 1
+
+    db.add_user(username="alice", password="", salesman_id=1, role="user", balance=10.0)
+    alice = db.get_user_by_username("alice")
+    assert alice.user_id in role_cache.user_ids(session, "user", active_only=True)
+
+    # Hot paths read from the cache; balance changes do not invalidate it
+    builds = role_cache.builds
+    db.add_ingredient(name="Bread", price_per_package=1.0, stock_quantity=1, number_ingredients=10, pfand=0.0)
+    db.add_product(name="Toast", ingredients=[(db.get_all_ingredients()[0], 1)], price_per_unit=1.0, category="raw")
+    db.make_purchase(alice.user_id, db.get_all_products()[0].product_id, 1, salesman_id=1)
+    assert api._get_god_user_ids() == god_ids
+    assert role_cache.builds == builds
+
+    db.change_user_role(alice.user_id, "admin")
+    assert alice.user_id in role_cache.user_ids(session, "admin", active_only=True)
+    assert alice.user_id not in role_cache.user_ids(session, "user")
+
+    db.soft_delete_user(alice.user_id, deleted_by="test")
+    assert alice.user_id not in role_cache.user_ids(session, "admin", active_only=True)
+    assert alice.user_id in role_cache.user_ids(session, "admin")
+
+    db.restore_user(alice.user_id)
+    assert alice.user_id in role_cache.user_ids(session, "admin", active_only=True)
+    session.close()
+
+
+def test_role_cache_is_shared_across_pools_and_dropped_on_database_swap(tmp_path, monkeypatch):
+    monkeypatch.setenv("PRIVATE_STORAGE", str(tmp_path / "first"))
+    monkeypatch.delenv("HOME", raising=False)
+    reset_database()
+    api._database = None
+    db = Database(apply_migrations=False)
+    db.add_user(username="alice", password="", salesman_id=1, role="admin", balance=0.0)
+    alice_id = db.get_user_by_username("alice").user_id
+
+    assert alice_id in role_cache.user_ids(db.get_session(), "admin")
+    builds = role_cache.builds
+    # the read-only pool is the same database: no rebuild
+    assert alice_id in role_cache.user_ids(db.get_read_session(), "admin")
+    assert role_cache.builds == builds
+
+    monkeypatch.setenv("PRIVATE_STORAGE", str(tmp_path / "second"))
+    reset_database()
+    db = Database(apply_migrations=False)
+    assert alice_id not in role_cache.user_ids(db.get_session(), "admin")
+
+
+def test_role_cache_is_not_refilled_from_a_snapshot_older_than_the_commit(db):
+    db.add_user(username="alice", password="", salesman_id=1, role="user", balance=0.0)
+    alice_id = db.get_user_by_username("alice").user_id
+    assert alice_id not in role_cache.user_ids(get_session(), "admin")
+
+    # A slow list refresh holds a read snapshot across the role change
+    reader = get_read_session()
+    raw = reader.connection().connection
+    raw.execute("BEGIN")
+    raw.execute("SELECT COUNT(*) FROM users").fetchone()
+    db.change_user_role(alice_id, "admin")
+    try:
+        assert alice_id in role_cache.user_ids(reader, "admin")
+    finally:
+        raw.execute("COMMIT")
+        reader.close()
+    session = get_session()
+    try:
+        assert alice_id in role_cache.user_ids(session, "admin")
+    finally:
+        session.close()
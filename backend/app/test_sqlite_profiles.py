@@ -0,0 +1,65 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import chame_app.database as database_module
+from chame_app.database import get_session, reset_database
+from sqlalchemy import text
+
+
+def _pragmas(tmp_path, monkeypatch, profile):
+    monkeypatch.setenv("PRIVATE_STORAGE", str(tmp_path))
+    monkeypatch.delenv("HOME", raising=False)
+    if profile is None:
+        monkeypatch.delenv("CHAME_SQLITE_PROFILE", raising=False)
+    else:
+        monkeypatch.setenv("CHAME_SQLITE_PROFILE", profile)
+    reset_database()
+    session = get_session(apply_migrations=False)
+    try:
+        return {
+            name: session.execute(text(f"PRAGMA {name}")).scalar()
+            for name in ("journal_mode", "synchronous", "cache_size", "temp_store", "busy_timeout")
+        }
+    finally:
+        session.close()
+        database_module._engine.dispose()
+        reset_database()
+
+
+def test_default_profile_enables_wal(tmp_path, monkeypatch):
+    pragmas = _pragmas(tmp_path, monkeypatch, None)
+    assert pragmas["journal_mode"] == "wal"
+    assert pragmas["synchronous"] == 1  # NORMAL
+    assert pragmas["cache_size"] == database_module.SQLITE_PROFILES["mobile"]["cache_size"]
+    assert pragmas["temp_store"] == 2  # MEMORY
+    assert pragmas["busy_timeout"] == 5000
+
+
+def test_profile_selected_by_environment(tmp_path, monkeypatch):
+    pragmas = _pragmas(tmp_path, monkeypatch, "server")
+    assert pragmas["cache_size"] == database_module.SQLITE_PROFILES["server"]["cache_size"]
+    assert pragmas["busy_timeout"] == 15000
+
+
+def test_legacy_profile_keeps_sqlite_defaults(tmp_path, monkeypatch):
+    pragmas = _pragmas(tmp_path, monkeypatch, "legacy")
+    assert pragmas["journal_mode"] == "delete"
+    assert pragmas["synchronous"] == 2  # FULL
+
+
+def test_restore_under_wal_replaces_the_live_database(db):
+    db.add_ingredient(name="Bread", price_per_package=1.0, stock_quantity=1, number_ingredients=10, pfand=0.0)
+    backup = db.create_backup(description="before butter")
+    assert backup["success"]
+    db.add_ingredient(name="Butter", price_per_package=1.0, stock_quantity=1, number_ingredients=10, pfand=0.0)
+    assert db.get_read_session().execute(text("PRAGMA journal_mode")).scalar() == "wal"
+
+    result = db.restore_backup(backup["backup_path"], confirm=True)
+
+    assert result["success"], result
+    assert [ingredient.name for ingredient in db.get_all_ingredients()] == ["Bread"]
+    # the file itself holds the restored rows, not just the reopened pool
+    reset_database()
+    assert [ingredient.name for ingredient in db.get_all_ingredients()] == ["Bread"]
@@ -0,0 +1,34 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from chame_app.database import reset_database
+from utils import startup_profiler
+import services.admin_api as api
+
+
+def test_startup_profile_covers_database_phases(tmp_path, monkeypatch):
+    monkeypatch.setenv("PRIVATE_STORAGE", str(tmp_path))
+    monkeypatch.delenv("HOME", raising=False)
+    reset_database()
+    startup_profiler.reset_startup_profile()
+    api._database = None
+
+    logged = []
+    monkeypatch.setattr("utils.firebase_logger.log_info", lambda message, metadata=None: logged.append(metadata))
+    monkeypatch.setenv("CHAME_LOG_STARTUP_PROFILE", "1")
+
+    api.create_database()
+    profile = api.get_startup_profile()
+
+    names = [phase["name"] for phase in profile["phases"]]
+    for expected in ("resolve_database_path", "create_engine", "create_all", "bootstrap", "product_stock", "database_init"):
+        assert expected in names
+    assert profile["totals_ms"]["database_init"] >= profile["totals_ms"]["product_stock"]
+    assert len(logged) == 1
+
+    # Only logged once per launch
+    api._database = None
+    api.create_database()
+    assert len(logged) == 1
@@ -0,0 +1,106 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from chame_app.database import reset_database
+from chame_app.database_instance import Database
+from chame_app.stock_graph import stock_graph
+from models.product_table import Product
+import services.admin_api as api
+
+
+def test_shared_products_are_recomputed_once_per_flush(db, monkeypatch):
+    db.add_ingredient(name="Bread", price_per_package=2.0, stock_quantity=2, number_ingredients=20, pfand=0.0)
+    db.add_ingredient(name="Cheese", price_per_package=4.0, stock_quantity=1, number_ingredients=10, pfand=0.0)
+    bread, cheese = sorted(db.get_all_ingredients(), key=lambda ingredient: ingredient.name)
+    db.add_product(name="Cheese Toast", ingredients=[(bread, 2), (cheese, 1)], price_per_unit=1.5, category="toast", toaster_space=1)
+    db.add_product(name="Plain Toast", ingredients=[(bread, 2)], price_per_unit=1.0, category="toast", toaster_space=1)
+    db.add_user(username="alice", password="", salesman_id=1, role="user", balance=20.0)
+    alice = db.get_user_by_username("alice")
+    products = {product.name: product for product in db.get_all_products()}
+    db.stock_ingredient(cheese.ingredient_id, 1)  # builds the graph for this database
+
+    builds_before = stock_graph.builds
+    recomputed = []
+    original_update_stock = Product.update_stock
+
+    def counting_update_stock(product):
+        recomputed.append(product.name)
+        return original_update_stock(product)
+
+    monkeypatch.setattr(Product, "update_stock", counting_update_stock)
+
+    # Both ingredients are touched; Cheese Toast depends on both but is recomputed once
+    db.make_purchase(alice.user_id, products["Cheese Toast"].product_id, 2, salesman_id=1)
+    assert sorted(recomputed) == ["Cheese Toast", "Plain Toast"]
+    assert stock_graph.builds == builds_before
+
+    recomputed.clear()
+    db.stock_ingredient(cheese.ingredient_id, 1)
+    assert recomputed == ["Cheese Toast"]
+    assert stock_graph.builds == builds_before
+
+    stock = {product.name: product.stock_quantity for product in db.get_all_products()}
+    assert stock == {"Cheese Toast": 18, "Plain Toast": 18}
+
+
+def test_graph_is_rebuilt_after_recipe_changes(db):
+    db.add_ingredient(name="Bread", price_per_package=2.0, stock_quantity=1, number_ingredients=20, pfand=0.0)
+    bread = db.get_all_ingredients()[0]
+    db.stock_ingredient(bread.ingredient_id, 1)
+    builds_before = stock_graph.builds
+
+    db.add_product(name="Plain Toast", ingredients=[(bread, 2)], price_per_unit=1.0, category="toast", toaster_space=1)
+    db.stock_ingredient(bread.ingredient_id, 1)
+    assert stock_graph.builds == builds_before + 1
+    assert db.get_all_products()[0].stock_quantity == 30
+
+    db.stock_ingredient(bread.ingredient_id, 1)
+    assert stock_graph.builds == builds_before + 1
+    assert db.get_all_products()[0].stock_quantity == 40
+
+
+def test_graph_follows_database_swaps_and_concurrent_link_commits(tmp_path, monkeypatch):
+    monkeypatch.setenv("PRIVATE_STORAGE", str(tmp_path / "first"))
+    monkeypatch.delenv("HOME", raising=False)
+    reset_database()
+    api._database = None
+    db = Database(apply_migrations=False)
+    db.add_ingredient(name="Bread", price_per_package=2.0, stock_quantity=1, number_ingredients=20, pfand=0.0)
+    bread = db.get_all_ingredients()[0]
+    db.add_product(name="Plain Toast", ingredients=[(bread, 2)], price_per_unit=1.0, category="toast", toaster_space=1)
+    db.stock_ingredient(bread.ingredient_id, 1)
+    builds_before = stock_graph.builds
+
+    # Another file with the same ids but no products: the cached graph must not be reused
+    monkeypatch.setenv("PRIVATE_STORAGE", str(tmp_path / "second"))
+    reset_database()
+    db = Database(apply_migrations=False)
+    db.add_ingredient(name="Bread", price_per_package=2.0, stock_quantity=1, number_ingredients=20, pfand=0.0)
+    session = db.get_session()
+    try:
+        assert stock_graph.products_for(session, [bread.ingredient_id]) == set()
+    finally:
+        session.close()
+    assert stock_graph.builds == builds_before + 1
+
+    # A link flushed but not yet committed; another session rebuilds meanwhile
+    writer = db.get_session()
+    try:
+        db.add_product(name="Plain Toast", ingredients=[(db.get_ingredient_by_id(bread.ingredient_id, writer), 2)],
+                       price_per_unit=1.0, category="toast", toaster_space=1, session=writer)
+        writer.flush()
+        reader = db.get_read_session()
+        try:
+            assert stock_graph.products_for(reader, [bread.ingredient_id]) == set()
+        finally:
+            reader.close()
+        writer.commit()
+    finally:
+        writer.close()
+    session = db.get_read_session()
+    try:
+        assert len(stock_graph.products_for(session, [bread.ingredient_id])) == 1
+    finally:
+        session.close()
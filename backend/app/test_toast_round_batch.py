@@ -0,0 +1,42 @@
+import math
+import os
+import sys
+
+from sqlalchemy import event
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import chame_app.database as database_module
+
+
+def test_toast_round_is_written_as_one_batch(db):
+    db.add_ingredient(name="Bread", price_per_package=2.0, stock_quantity=2, number_ingredients=20, pfand=0.0)
+    db.add_ingredient(name="Cheese", price_per_package=4.0, stock_quantity=1, number_ingredients=10, pfand=0.0)
+    bread, cheese = sorted(db.get_all_ingredients(), key=lambda ingredient: ingredient.name)
+    db.add_product(name="Cheese Toast", ingredients=[(bread, 2), (cheese, 1)], price_per_unit=1.5, category="toast", toaster_space=1)
+    db.add_product(name="Plain Toast", ingredients=[(bread, 2)], price_per_unit=1.0, category="toast", toaster_space=1)
+    db.add_user(username="alice", password="", salesman_id=1, role="user", balance=20.0)
+    db.add_user(username="bob", password="", salesman_id=1, role="user", balance=20.0)
+    alice = db.get_user_by_username("alice")
+    bob = db.get_user_by_username("bob")
+    products = {product.name: product for product in db.get_all_products()}
+
+    slots = [(products["Cheese Toast"].product_id, alice.user_id, None)] * 4
+    slots += [(products["Plain Toast"].product_id, bob.user_id, alice.user_id)] * 4
+
+    updates = []
+    event.listen(database_module._engine, "before_cursor_execute",
+                 lambda conn, cursor, statement, *args: updates.append(statement) if statement.startswith("UPDATE ingredients") else None)
+    db.add_toast_round(slots, salesman_id=1)
+
+    # At most one stock write per ingredient for the whole round
+    assert 1 <= len(updates) <= 2
+    stock = {ingredient.name: ingredient.stock_quantity for ingredient in db.get_all_ingredients()}
+    assert stock == {"Bread": 40 - 16, "Cheese": 10 - 4}
+    assert math.isclose(db.get_user_by_id(alice.user_id).balance, 20.0 - 4 * 1.5 - 4 * 1.0)
+    assert math.isclose(db.get_user_by_id(bob.user_id).balance, 20.0)
+
+    rounds = db.get_all_toast_rounds()
+    assert len(rounds) == 1
+    assert len(rounds[0].sales) == 8
+    assert {product.name: product.stock_quantity for product in db.get_all_products()} == {"Cheese Toast": 6, "Plain Toast": 12}
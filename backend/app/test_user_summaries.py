@@ -0,0 +1,57 @@
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import services.admin_api as api
+
+
+def test_user_list_carries_aggregates_instead_of_sales_history(db):
+    db.add_ingredient(name="Bottle", price_per_package=1.0, stock_quantity=10, number_ingredients=10, pfand=0.25)
+    bottle = db.get_all_ingredients()[0]
+    db.add_product(name="Mate", ingredients=[(bottle, 1)], price_per_unit=2.0, category="raw")
+    db.add_user(username="alice", password="", salesman_id=1, role="user", balance=50.0)
+    db.add_user(username="bob", password="", salesman_id=1, role="user", balance=0.0)
+    alice = db.get_user_by_username("alice")
+    bob = db.get_user_by_username("bob")
+    mate = db.get_all_products()[0]
+
+    db.make_purchase(alice.user_id, mate.product_id, 2, salesman_id=1)
+    db.make_purchase(bob.user_id, mate.product_id, 1, salesman_id=1, donator_id=alice.user_id)
+    payload_size = len(json.dumps(api.get_all_users()))
+    for _ in range(5):
+        db.make_purchase(alice.user_id, mate.product_id, 1, salesman_id=1)
+
+    users = {user["name"]: user for user in api.get_all_users()}
+    assert "sales" not in users["alice"]
+    assert users["alice"]["sale_count"] == 6
+    # eight units paid, one of them for bob
+    assert users["alice"]["total_spent"] == pytest.approx(50.0 - users["alice"]["balance"])
+    assert users["alice"]["total_spent"] == pytest.approx(8 * mate.get_checkout_total_price(1))
+    assert users["alice"]["pfand_items"] == 7
+    assert users["alice"]["pfand_outstanding"] == pytest.approx(7 * 0.25)
+    assert users["bob"]["sale_count"] == 1 and users["bob"]["total_spent"] == 0.0
+    assert users["alice"]["last_purchase"] is not None
+    assert len(json.dumps(list(users.values()))) == payload_size
+
+    page = api.get_user_sales(alice.user_id, page=1, page_size=4)
+    assert page["total_count"] == 7  # six consumed, one paid for bob
+    assert page["total_pages"] == 2
+    assert len(page["sales"]) == 4
+    assert len(api.get_user_sales(alice.user_id, page=2, page_size=4)["sales"]) == 3
+
+
+def test_get_all_users_returns_sales_usable_after_the_session_closes(db):
+    db.add_ingredient(name="Bottle", price_per_package=1.0, stock_quantity=10, number_ingredients=10, pfand=0.25)
+    bottle = db.get_all_ingredients()[0]
+    db.add_product(name="Mate", ingredients=[(bottle, 1)], price_per_unit=2.0, category="raw")
+    db.add_user(username="alice", password="", salesman_id=1, role="user", balance=50.0)
+    alice = db.get_user_by_username("alice")
+    db.make_purchase(alice.user_id, db.get_all_products()[0].product_id, 2, salesman_id=1)
+
+    alice = next(user for user in db.get_all_users() if user.name == "alice")
+    assert len(alice.sales) == 1
+    assert len(alice.to_dict(include_sales=True)["sales"]) == 1
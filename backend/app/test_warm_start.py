@@ -0,0 +1,78 @@
+import os
+import sqlite3
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import chame_app.database as database_module
+from chame_app.database import reset_database
+from chame_app.database_instance import Database
+from models.product_table import Product
+import services.admin_api as api
+
+
+def _start(monkeypatch, recomputed):
+    reset_database()
+    api._database = None
+    original_rows = Database._product_stock_rows
+
+    def _recording_rows(self, session, product_ids=None, active_only=False):
+        rows = original_rows(self, session, product_ids, active_only)
+        names = dict(session.query(Product.product_id, Product.name).all())
+        recomputed.extend(names[row[0]] for row in rows)
+        return rows
+
+    monkeypatch.setattr(Database, "_product_stock_rows", _recording_rows)
+    db = Database(apply_migrations=True)
+    monkeypatch.setattr(Database, "_product_stock_rows", original_rows)
+    return db
+
+
+def _seed(db):
+    db.add_ingredient(name="Bread", price_per_package=1.0, stock_quantity=10, number_ingredients=10, pfand=0.0)
+    db.add_ingredient(name="Cheese", price_per_package=1.0, stock_quantity=10, number_ingredients=10, pfand=0.0)
+    bread, cheese = sorted(db.get_all_ingredients(), key=lambda ingredient: ingredient.name)
+    db.add_product(name="Plain Toast", ingredients=[(bread, 2)], price_per_unit=1.0, category="toast", toaster_space=1)
+    db.add_product(name="Cheese Slice", ingredients=[(cheese, 1)], price_per_unit=1.0, category="raw")
+
+
+def test_warm_start_skips_schema_work_and_unchanged_products(tmp_path, monkeypatch):
+    monkeypatch.setenv("PRIVATE_STORAGE", str(tmp_path))
+    monkeypatch.delenv("HOME", raising=False)
+    monkeypatch.delenv("CHAME_COLD_START", raising=False)
+
+    recomputed = []
+    _seed(_start(monkeypatch, recomputed))
+
+    def _fail_create_all(*args, **kwargs):
+        raise AssertionError("create_all ran on a warm start")
+
+    monkeypatch.setattr(database_module.Base.metadata, "create_all", _fail_create_all)
+
+    # First restart records the seeded products, the second one has nothing to do.
+    _start(monkeypatch, recomputed)
+    recomputed.clear()
+    _start(monkeypatch, recomputed)
+    assert recomputed == []
+
+    with sqlite3.connect(tmp_path / "kassensystem.db") as conn:
+        conn.execute("UPDATE ingredients SET stock_quantity = 3 WHERE name = 'Bread'")
+
+    db = _start(monkeypatch, recomputed)
+    assert recomputed == ["Plain Toast"]
+    toast = next(product for product in db.get_all_products() if product.name == "Plain Toast")
+    assert toast.stock_quantity == 1
+
+
+def test_cold_start_env_recomputes_everything(tmp_path, monkeypatch):
+    monkeypatch.setenv("PRIVATE_STORAGE", str(tmp_path))
+    monkeypatch.delenv("HOME", raising=False)
+
+    recomputed = []
+    _seed(_start(monkeypatch, recomputed))
+    _start(monkeypatch, recomputed)
+
+    recomputed.clear()
+    monkeypatch.setenv("CHAME_COLD_START", "1")
+    _start(monkeypatch, recomputed)
+    assert sorted(recomputed) == ["Cheese Slice", "Plain Toast"]
@@ -2,9 +2,13 @@
 Firebase logging utility for Python backend
 Safely logs to Firebase through Flutter bridge when available
 """
+import atexit
+import collections
+import logging
+import threading
 import traceback
 import os
-from typing import Dict, Any, Optional
+from typing import Callable, Dict, Any, List, Optional, Tuple, Union
 
 # Debug flag - set to False to reduce log noise once bridge is confirmed working
 FIREBASE_LOGGER_DEBUG = False  # Bridge is working, reduce noise
@@ -13,6 +17,195 @@ DEBUG = False  # Set to True to enable local debug prints
 # Release mode logging - keep console logging for important messages
 FIREBASE_LOGGER_CONSOLE_LOGGING = False
 
+# Records are shipped to the bridge from a background thread in batches.
+# CHAME_LOG_OVERFLOW decides what happens when the queue is full:
+#   drop_oldest (default) - discard the oldest queued record
+#   drop_newest           - discard the record being logged
+#   block                 - wait for the shipping thread (adds caller latency)
+LOG_QUEUE_SIZE = int(os.environ.get("CHAME_LOG_QUEUE_SIZE", "1000"))
+LOG_BATCH_SIZE = int(os.environ.get("CHAME_LOG_BATCH_SIZE", "50"))
+LOG_FLUSH_INTERVAL_S = int(os.environ.get("CHAME_LOG_FLUSH_INTERVAL_MS", "500")) / 1000
+LOG_OVERFLOW_POLICY = os.environ.get("CHAME_LOG_OVERFLOW", "drop_oldest").strip().lower()
+LOG_OVERFLOW_POLICIES = ("drop_oldest", "drop_newest", "block")
+if LOG_OVERFLOW_POLICY not in LOG_OVERFLOW_POLICIES:
+    LOG_OVERFLOW_POLICY = "drop_oldest"
+
+LogRecord = Tuple[str, str, Optional[Dict[str, Any]]]
+
+# Messages and metadata may be passed as zero-argument callables; they are only
+# called if the record passes the level check, e.g.
+#   log_debug(lambda: f"Stock updated for {product.name}", subsystem="database")
+LazyMessage = Union[str, Callable[[], str]]
+LazyMetadata = Union[Dict[str, Any], Callable[[], Optional[Dict[str, Any]]], None]
+
+# Minimum level per subsystem. CHAME_LOG_LEVEL sets the default for everything,
+# CHAME_LOG_LEVELS overrides single subsystems ("database=DEBUG,backup=WARN");
+# set_log_level() changes either at runtime. Level values match the logging module.
+LOG_LEVELS = {"DEBUG": logging.DEBUG, "INFO": logging.INFO, "WARN": logging.WARNING, "ERROR": logging.ERROR, "OFF": logging.CRITICAL + 1}
+LOG_SUBSYSTEMS = ("database", "parser", "backup", "migrations")
+# Standard library loggers that follow a subsystem's level
+_SUBSYSTEM_STDLIB_LOGGERS = {
+    "backup": "services.database_backup",
+    "migrations": "chame_app.simple_migrations",
+}
+
+
+def _normalize_level(level: str) -> str:
+    level = str(level).strip().upper()
+    if level == "WARNING":
+        level = "WARN"
+    if level not in LOG_LEVELS:
+        raise ValueError(f"Unknown log level: {level}")
+    return level
+
+
+_default_log_level = LOG_LEVELS["INFO"]
+_subsystem_log_levels: Dict[str, int] = {}
+
+
+def set_log_level(level: str, subsystem: Optional[str] = None) -> None:
+    """Set the minimum level for one subsystem, or the default when subsystem is None"""
+    global _default_log_level
+    value = LOG_LEVELS[_normalize_level(level)]
+    if subsystem is None:
+        _default_log_level = value
+    else:
+        _subsystem_log_levels[subsystem] = value
+    for name, logger_name in _SUBSYSTEM_STDLIB_LOGGERS.items():
+        if subsystem in (None, name):
+            logging.getLogger(logger_name).setLevel(_subsystem_log_levels.get(name, _default_log_level))
+
+
+def get_log_levels() -> Dict[str, str]:
+    """Effective minimum level of the default and every known subsystem"""
+    names = {value: name for name, value in LOG_LEVELS.items()}
+    levels = {"default": names[_default_log_level]}
+    for subsystem in sorted(set(LOG_SUBSYSTEMS) | set(_subsystem_log_levels)):
+        levels[subsystem] = names[_subsystem_log_levels.get(subsystem, _default_log_level)]
+    return levels
+
+
+def is_log_enabled(level: str, subsystem: Optional[str] = None) -> bool:
+    """Level check only - use it to guard expensive console output"""
+    threshold = _subsystem_log_levels.get(subsystem, _default_log_level) if subsystem else _default_log_level
+    return LOG_LEVELS.get(level, LOG_LEVELS["INFO"]) >= threshold
+
+
+def _configure_log_levels_from_env() -> None:
+    try:
+        set_log_level(os.environ.get("CHAME_LOG_LEVEL", "INFO"))
+        for item in os.environ.get("CHAME_LOG_LEVELS", "").split(","):
+            if "=" in item:
+                subsystem, level = item.split("=", 1)
+                set_log_level(level, subsystem.strip().lower())
+    except ValueError as e:
+        print(f"⚠️ Ignoring invalid log level configuration: {e}")
+
+
+_configure_log_levels_from_env()
+
+
+class LogShipper:
+    """
+    Bounded queue drained by a daemon thread that hands records to `sink`
+    in batches of up to `batch_size`. The thread is started on first use.
+    """
+
+    def __init__(self, sink: Callable[[List[LogRecord]], None], max_queue: int = LOG_QUEUE_SIZE,
+                 batch_size: int = LOG_BATCH_SIZE, flush_interval: float = LOG_FLUSH_INTERVAL_S,
+                 overflow: str = LOG_OVERFLOW_POLICY):
+        if overflow not in LOG_OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown log overflow policy: {overflow}")
+        self._sink = sink
+        self.max_queue = max(1, max_queue)
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.overflow = overflow
+        self._queue = collections.deque()
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._in_flight = 0
+        self._flush_waiters = 0
+        self.dropped = 0
+        self.shipped = 0
+        self.failed = 0
+        self.batches = 0
+        self.failed_batches = 0
+
+    def enqueue(self, record: LogRecord) -> bool:
+        """Queue a record; returns False if it was dropped"""
+        with self._cond:
+            if len(self._queue) >= self.max_queue:
+                if self.overflow == "drop_newest":
+                    self.dropped += 1
+                    return False
+                if self.overflow == "drop_oldest":
+                    self._queue.popleft()
+                    self.dropped += 1
+                elif threading.current_thread() is not self._thread:
+                    self._cond.wait_for(lambda: len(self._queue) < self.max_queue)
+            self._queue.append(record)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="firebase-log-shipper", daemon=True)
+                self._thread.start()
+            if len(self._queue) >= self.batch_size:
+                self._cond.notify_all()
+        return True
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Ship everything queued so far; returns True if the queue drained in time"""
+        with self._cond:
+            if self._thread is None:
+                return not self._queue
+            self._flush_waiters += 1
+            self._cond.notify_all()
+            try:
+                return self._cond.wait_for(lambda: not self._queue and not self._in_flight, timeout)
+            finally:
+                self._flush_waiters -= 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "queued": len(self._queue),
+                "shipped": self.shipped,
+                "batches": self.batches,
+                "failed_batches": self.failed_batches,
+                "failed": self.failed,
+                "dropped": self.dropped,
+                "overflow": self.overflow,
+            }
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._queue)
+                # Give callers a moment to fill the batch unless someone is flushing
+                self._cond.wait_for(
+                    lambda: len(self._queue) >= self.batch_size or self._flush_waiters,
+                    self.flush_interval,
+                )
+                batch = [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+                self._in_flight = len(batch)
+                self._cond.notify_all()
+            failed = False
+            try:
+                self._sink(batch)
+            except Exception as e:
+                failed = True
+                if FIREBASE_LOGGER_DEBUG or FIREBASE_LOGGER_CONSOLE_LOGGING:
+                    print(f"❌ [FIREBASE-BRIDGE] Failed to ship {len(batch)} log record(s): {e}")
+            with self._cond:
+                self._in_flight = 0
+                self.batches += 1
+                if failed:
+                    self.failed_batches += 1
+                    self.failed += len(batch)
+                else:
+                    self.shipped += len(batch)
+                self._cond.notify_all()
+
+
 class FirebaseLogger:
     """
     Logger that sends logs to Firebase through Flutter bridge
@@ -22,6 +215,7 @@ class FirebaseLogger:
     def __init__(self):
         self._bridge_available = self._check_bridge_availability()
         self._activity = None
+        self._shipper = LogShipper(self._ship_batch)
         
         if FIREBASE_LOGGER_DEBUG:
             print(f"[FIREBASE_LOGGER] Bridge available: {self._bridge_available}")
@@ -118,7 +312,7 @@ class FirebaseLogger:
         return is_available
     
     def _log_to_bridge(self, level: str, message: str, metadata: Optional[Dict[str, Any]] = None):
-        """Internal method to send log to Flutter through bridge"""
+        """Internal method to queue a log for the Flutter bridge (shipped in the background)"""
         # Always log to console for debugging
         if DEBUG:
             console_msg = f"🔥 [FIREBASE-{level}] {message}"
@@ -127,7 +321,7 @@ class FirebaseLogger:
             print(console_msg)
         
         if FIREBASE_LOGGER_DEBUG:
-            print(f"🚀 [FIREBASE-BRIDGE] Attempting to send {level} log to Firebase...")
+            print(f"🚀 [FIREBASE-BRIDGE] Queueing {level} log for Firebase...")
             print(f"🚀 [FIREBASE-BRIDGE] Message: {message}")
             if metadata:
                 print(f"🚀 [FIREBASE-BRIDGE] Metadata: {metadata}")
@@ -138,67 +332,80 @@ class FirebaseLogger:
                 print(f"   Bridge available: {self._bridge_available}")
                 print(f"   Activity: {self._activity}")
             return
-            
-        # Try to get activity if we don't have one yet
-        if not self._activity:
-            if FIREBASE_LOGGER_DEBUG:
-                print("🔧 [FIREBASE-BRIDGE] No activity cached, trying to get it now...")
+        
+        # Copy metadata so later changes by the caller don't leak into the shipped record
+        self._shipper.enqueue((level, message, dict(metadata) if metadata else None))
+
+    def _resolve_activity(self) -> bool:
+        """Make sure self._activity is set, looking it up in __main__ if needed"""
+        if self._activity:
+            return True
+        if FIREBASE_LOGGER_DEBUG:
+            print("🔧 [FIREBASE-BRIDGE] No activity cached, trying to get it now...")
+        try:
+            from com.chaquo.python import Python
+            python = Python.getInstance()
+            main_module = python.getModule("__main__")
+            if hasattr(main_module, 'activity'):
+                self._activity = main_module.activity
+                if FIREBASE_LOGGER_DEBUG:
+                    print(f"🔧 [FIREBASE-BRIDGE] Found activity: {self._activity}")
+                return True
+            if FIREBASE_LOGGER_DEBUG or FIREBASE_LOGGER_CONSOLE_LOGGING:
+                print("❌ [FIREBASE-BRIDGE] Still no activity found in __main__")
+            # Try alternative method - check if activity was set via environment
             try:
-                from com.chaquo.python import Python
-                python = Python.getInstance()
-                main_module = python.getModule("__main__")
-                if hasattr(main_module, 'activity'):
-                    self._activity = main_module.activity
+                # Sometimes the activity is available through different means
+                if hasattr(main_module, '__dict__') and 'activity' in main_module.__dict__:
+                    self._activity = main_module.__dict__['activity']
                     if FIREBASE_LOGGER_DEBUG:
-                        print(f"🔧 [FIREBASE-BRIDGE] Found activity: {self._activity}")
-                else:
-                    if FIREBASE_LOGGER_DEBUG or FIREBASE_LOGGER_CONSOLE_LOGGING:
-                        print("❌ [FIREBASE-BRIDGE] Still no activity found in __main__")
-                    # Try alternative method - check if activity was set via environment
-                    try:
-                        # Sometimes the activity is available through different means
-                        if hasattr(main_module, '__dict__') and 'activity' in main_module.__dict__:
-                            self._activity = main_module.__dict__['activity']
-                            if FIREBASE_LOGGER_DEBUG:
-                                print(f"🔧 [FIREBASE-BRIDGE] Found activity via __dict__: {self._activity}")
-                        else:
-                            if FIREBASE_LOGGER_CONSOLE_LOGGING:
-                                print("⚠️ [FIREBASE-BRIDGE] No activity found - Firebase logging will not work")
-                            return
-                    except Exception as alt_e:
-                        if FIREBASE_LOGGER_CONSOLE_LOGGING:
-                            print(f"⚠️ [FIREBASE-BRIDGE] Alternative activity lookup failed: {alt_e}")
-                        return
-            except Exception as e:
-                if FIREBASE_LOGGER_DEBUG or FIREBASE_LOGGER_CONSOLE_LOGGING:
-                    print(f"❌ [FIREBASE-BRIDGE] Failed to get activity: {e}")
-                return
-            
+                        print(f"🔧 [FIREBASE-BRIDGE] Found activity via __dict__: {self._activity}")
+                    return True
+                if FIREBASE_LOGGER_CONSOLE_LOGGING:
+                    print("⚠️ [FIREBASE-BRIDGE] No activity found - Firebase logging will not work")
+                return False
+            except Exception as alt_e:
+                if FIREBASE_LOGGER_CONSOLE_LOGGING:
+                    print(f"⚠️ [FIREBASE-BRIDGE] Alternative activity lookup failed: {alt_e}")
+                return False
+        except Exception as e:
+            if FIREBASE_LOGGER_DEBUG or FIREBASE_LOGGER_CONSOLE_LOGGING:
+                print(f"❌ [FIREBASE-BRIDGE] Failed to get activity: {e}")
+            return False
+
+    def _ship_batch(self, records: List[LogRecord]):
+        """Send queued records through the bridge (runs on the shipping thread)"""
+        if not self._resolve_activity():
+            # Raise so the shipper counts the batch as failed instead of shipped
+            raise RuntimeError(f"No Flutter activity to ship {len(records)} log record(s) to")
         try:
             if FIREBASE_LOGGER_DEBUG:
-                print("🔥 [FIREBASE-BRIDGE] Bridge is available - converting metadata for Java...")
-            # Convert metadata to Java-compatible format
-            if metadata:
-                # Create a proper Java HashMap
-                from java.util import HashMap
-                java_metadata = HashMap()
-                for key, value in metadata.items():
-                    # Convert all values to strings for Java compatibility
-                    java_metadata.put(str(key), str(value))
-                if FIREBASE_LOGGER_DEBUG:
-                    print(f"🔥 [FIREBASE-BRIDGE] Converted {len(metadata)} metadata items to Java HashMap")
+                print(f"🔥 [FIREBASE-BRIDGE] Converting {len(records)} record(s) for Java...")
+            from java.util import ArrayList, HashMap
+
+            def java_map(values):
+                # Convert all values to strings for Java compatibility
+                result = HashMap()
+                for key, value in (values or {}).items():
+                    result.put(str(key), str(value))
+                return result
+
+            if hasattr(self._activity, 'logBatchToFirebase'):
+                # One bridge crossing for the whole batch
+                java_records = ArrayList()
+                for level, message, metadata in records:
+                    java_record = HashMap()
+                    java_record.put("level", level)
+                    java_record.put("message", message)
+                    java_record.put("metadata", java_map(metadata))
+                    java_records.add(java_record)
+                self._activity.logBatchToFirebase(java_records)
             else:
-                from java.util import HashMap
-                java_metadata = HashMap()
-                if FIREBASE_LOGGER_DEBUG:
-                    print("🔥 [FIREBASE-BRIDGE] Created empty Java HashMap for metadata")
-            
-            if FIREBASE_LOGGER_DEBUG:
-                print(f"🔥 [FIREBASE-BRIDGE] Calling activity.logToFirebase({level}, {message}, HashMap with {java_metadata.size()} items)")
-            # Call the logToFirebase method on the activity
-            self._activity.logToFirebase(level, message, java_metadata)
+                # Older app builds only know the single-record method
+                for level, message, metadata in records:
+                    self._activity.logToFirebase(level, message, java_map(metadata))
             if FIREBASE_LOGGER_DEBUG or FIREBASE_LOGGER_CONSOLE_LOGGING:
-                print("✅ [FIREBASE-BRIDGE] Successfully sent log to Firebase through bridge!")
+                print(f"✅ [FIREBASE-BRIDGE] Successfully sent {len(records)} log(s) to Firebase through bridge!")
             
         except Exception as e:
             # Print debug info to help diagnose the issue
@@ -211,60 +418,65 @@ class FirebaseLogger:
                     print(f"[BRIDGE_ERROR] Activity methods: {dir(self._activity)}")
                 except:
                     print("[BRIDGE_ERROR] Could not list activity methods")
-            # Silent fail - don't let logging errors crash the app
-    
-    def info(self, message: str, metadata: Optional[Dict[str, Any]] = None):
-        """Log info message"""
-        if DEBUG:
-            print(f"[INFO] {message}")
-        if FIREBASE_LOGGER_DEBUG:
-            print(f"📝 [FIREBASE-LOGGER] Preparing to send INFO log to bridge...")
-        self._log_to_bridge("INFO", message, metadata)
-        if FIREBASE_LOGGER_DEBUG:
-            print(f"📝 [FIREBASE-LOGGER] INFO log processing complete")
-    
-    def warn(self, message: str, metadata: Optional[Dict[str, Any]] = None):
-        """Log warning message"""
-        if DEBUG:
-            print(f"[WARN] {message}")
-        if FIREBASE_LOGGER_DEBUG:
-            print(f"⚠️ [FIREBASE-LOGGER] Preparing to send WARN log to bridge...")
-        self._log_to_bridge("WARN", message, metadata)
-        if FIREBASE_LOGGER_DEBUG:
-            print(f"⚠️ [FIREBASE-LOGGER] WARN log processing complete")
+            raise
+
+    def flush(self, timeout: Optional[float] = 2.0) -> bool:
+        """Ship all queued logs now, e.g. before the app shuts down"""
+        return self._shipper.flush(timeout)
     
-    def error(self, message: str, metadata: Optional[Dict[str, Any]] = None, exception: Optional[Exception] = None):
-        """Log error message"""
+    def accepts_records(self) -> bool:
+        """True if a record would go anywhere (bridge or local debug console)"""
+        return self._bridge_available or DEBUG
+
+    def is_enabled(self, level: str, subsystem: Optional[str] = None) -> bool:
+        return is_log_enabled(level, subsystem) and self.accepts_records()
+
+    def _log(self, level: str, message: LazyMessage, metadata: LazyMetadata = None,
+             subsystem: Optional[str] = None, exception: Optional[Exception] = None):
+        # Dropped records must not pay for formatting their message or metadata
+        if not self.is_enabled(level, subsystem):
+            return
+        if callable(message):
+            message = message()
+        if callable(metadata):
+            metadata = metadata()
         if DEBUG:
-            print(f"[ERROR] {message}")
+            print(f"[{level}] {message}")
         if FIREBASE_LOGGER_DEBUG:
-            print(f"❌ [FIREBASE-LOGGER] Preparing to send ERROR log to bridge...")
+            print(f"📝 [FIREBASE-LOGGER] Preparing to send {level} log to bridge...")
         
         # Add exception details to metadata if provided
-        if exception and metadata is None:
-            metadata = {}
-        
         if exception:
-            metadata = metadata or {}
+            metadata = dict(metadata or {})
             metadata.update({
                 "exception_type": type(exception).__name__,
                 "exception_message": str(exception),
                 "stack_trace": traceback.format_exc()
             })
+        if subsystem:
+            metadata = dict(metadata or {})
+            metadata.setdefault("subsystem", subsystem)
         
-        self._log_to_bridge("ERROR", message, metadata)
+        self._log_to_bridge(level, message, metadata)
         if FIREBASE_LOGGER_DEBUG:
-            print(f"❌ [FIREBASE-LOGGER] ERROR log processing complete")
+            print(f"📝 [FIREBASE-LOGGER] {level} log processing complete")
+
+    def info(self, message: LazyMessage, metadata: LazyMetadata = None, subsystem: Optional[str] = None):
+        """Log info message"""
+        self._log("INFO", message, metadata, subsystem)
     
-    def debug(self, message: str, metadata: Optional[Dict[str, Any]] = None):
+    def warn(self, message: LazyMessage, metadata: LazyMetadata = None, subsystem: Optional[str] = None):
+        """Log warning message"""
+        self._log("WARN", message, metadata, subsystem)
+    
+    def error(self, message: LazyMessage, metadata: LazyMetadata = None, exception: Optional[Exception] = None,
+              subsystem: Optional[str] = None):
+        """Log error message"""
+        self._log("ERROR", message, metadata, subsystem, exception)
+    
+    def debug(self, message: LazyMessage, metadata: LazyMetadata = None, subsystem: Optional[str] = None):
         """Log debug message"""
-        if DEBUG:
-            print(f"[DEBUG] {message}")
-        if FIREBASE_LOGGER_DEBUG:
-            print(f"🐛 [FIREBASE-LOGGER] Preparing to send DEBUG log to bridge...")
-        self._log_to_bridge("DEBUG", message, metadata)
-        if FIREBASE_LOGGER_DEBUG:
-            print(f"🐛 [FIREBASE-LOGGER] DEBUG log processing complete")
+        self._log("DEBUG", message, metadata, subsystem)
     
     def set_activity(self, activity):
         """Manually set the activity object for Firebase logging"""
@@ -281,7 +493,8 @@ class FirebaseLogger:
         return {
             "bridge_available": self._bridge_available,
             "activity": self._activity,
-            "has_activity": self._activity is not None
+            "has_activity": self._activity is not None,
+            "shipping": self._shipper.get_stats(),
         }
     
     def force_bridge_availability(self, force_available: bool = True):
@@ -298,19 +511,55 @@ class FirebaseLogger:
 
 # Global logger instance
 firebase_logger = FirebaseLogger()
+# Don't lose queued logs when the interpreter exits
+atexit.register(firebase_logger.flush)
 
 # Convenience functions
-def log_info(message: str, metadata: Optional[Dict[str, Any]] = None):
-    firebase_logger.info(message, metadata)
+def log_info(message: LazyMessage, metadata: LazyMetadata = None, subsystem: Optional[str] = None):
+    firebase_logger.info(message, metadata, subsystem)
+
+def log_warn(message: LazyMessage, metadata: LazyMetadata = None, subsystem: Optional[str] = None):
+    firebase_logger.warn(message, metadata, subsystem)
+
+def log_error(message: LazyMessage, metadata: LazyMetadata = None, exception: Optional[Exception] = None, subsystem: Optional[str] = None):
+    firebase_logger.error(message, metadata, exception, subsystem)
+
+def log_debug(message: LazyMessage, metadata: LazyMetadata = None, subsystem: Optional[str] = None):
+    firebase_logger.debug(message, metadata, subsystem)
+
+def log_to_firebase(level: str, message: LazyMessage, subsystem: Optional[str] = None, **metadata):
+    """Log with keyword metadata, e.g. log_to_firebase("INFO", "Done", subsystem="migrations", count=3)"""
+    firebase_logger._log(_normalize_level(level), message, metadata or None, subsystem)
+
+
+class SubsystemLogger:
+    """log_* functions bound to one subsystem, see get_logger()"""
+
+    def __init__(self, subsystem: str):
+        self.subsystem = subsystem
+
+    def is_enabled(self, level: str) -> bool:
+        return firebase_logger.is_enabled(level, self.subsystem)
+
+    def info(self, message: LazyMessage, metadata: LazyMetadata = None):
+        firebase_logger.info(message, metadata, self.subsystem)
+
+    def warn(self, message: LazyMessage, metadata: LazyMetadata = None):
+        firebase_logger.warn(message, metadata, self.subsystem)
+
+    def error(self, message: LazyMessage, metadata: LazyMetadata = None, exception: Optional[Exception] = None):
+        firebase_logger.error(message, metadata, exception, self.subsystem)
+
+    def debug(self, message: LazyMessage, metadata: LazyMetadata = None):
+        firebase_logger.debug(message, metadata, self.subsystem)
 
-def log_warn(message: str, metadata: Optional[Dict[str, Any]] = None):
-    firebase_logger.warn(message, metadata)
 
-def log_error(message: str, metadata: Optional[Dict[str, Any]] = None, exception: Optional[Exception] = None):
-    firebase_logger.error(message, metadata, exception)
+def get_logger(subsystem: str) -> SubsystemLogger:
+    return SubsystemLogger(subsystem)
 
-def log_debug(message: str, metadata: Optional[Dict[str, Any]] = None):
-    firebase_logger.debug(message, metadata)
+def flush_firebase_logs(timeout: Optional[float] = 2.0) -> bool:
+    """Ship all queued logs now; call on shutdown"""
+    return firebase_logger.flush(timeout)
 
 def force_firebase_bridge(force_available: bool = True):
     """Force Firebase bridge availability for testing"""
@@ -0,0 +1,212 @@
+"""
+Opt-in operation tracing
+Wraps Database methods and admin_api entry points in spans that record wall
+time, SQL statements and rows, aggregated per operation and per call path
+(e.g. "admin_api.add_toast_round > Database.add_toast_round > Database.get_bank").
+
+Enable with CHAME_TRACE=1 or enable_tracing(); when disabled a traced call
+costs one flag check.
+
+Functions can declare a statement budget with @query_budget(n). Calls over
+budget are counted in the statistics; with CHAME_ENFORCE_QUERY_BUDGETS=1 or
+enforce_query_budgets() (test mode) they raise QueryBudgetExceeded, naming the
+most repeated statements - usually lazy loads from an N+1 pattern.
+"""
+import functools
+import inspect
+import os
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Mapper
+
+TRACE_ENV = "CHAME_TRACE"
+ENFORCE_QUERY_BUDGETS_ENV = "CHAME_ENFORCE_QUERY_BUDGETS"
+
+_enforce_budgets = os.environ.get(ENFORCE_QUERY_BUDGETS_ENV, "").strip().lower() in ("1", "true", "yes")
+_enabled = _enforce_budgets or os.environ.get(TRACE_ENV, "").strip().lower() in ("1", "true", "yes")
+_local = threading.local()
+_stats_lock = threading.Lock()
+_operations: Dict[str, Dict[str, Any]] = {}
+_paths: Dict[str, Dict[str, Any]] = {}
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised in enforcing mode when a traced call runs more statements than its budget."""
+
+    def __init__(self, name: str, statements: int, budget: int, repeated):
+        self.name = name
+        self.statements = statements
+        self.budget = budget
+        self.repeated = repeated
+        details = "; ".join(f"{count}x {statement[:120]}" for statement, count in repeated)
+        super().__init__(f"{name} ran {statements} SQL statements (budget {budget}). Most repeated: {details}")
+
+
+class _Span:
+    __slots__ = ("name", "path", "started_at", "statements", "rows", "sql")
+
+    def __init__(self, name: str, parent: Optional["_Span"]):
+        self.name = name
+        self.path = f"{parent.path} > {name}" if parent else name
+        self.started_at = time.perf_counter()
+        self.statements = 0
+        self.rows = 0
+        self.sql = Counter() if _enforce_budgets else None
+
+
+def enable_tracing(enabled: bool = True) -> None:
+    global _enabled
+    _enabled = enabled
+
+
+def is_tracing_enabled() -> bool:
+    return _enabled
+
+
+def enforce_query_budgets(enabled: bool = True) -> None:
+    """Test mode: raise QueryBudgetExceeded for calls over their budget (implies tracing)"""
+    global _enforce_budgets, _enabled
+    _enforce_budgets = enabled
+    if enabled:
+        _enabled = True
+
+
+def query_budget(max_statements: int):
+    """Declare how many SQL statements one call of the decorated function may run."""
+    def decorator(func):
+        func.__query_budget__ = max_statements
+        return func
+    return decorator
+
+
+def _stack():
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+def _current_span() -> Optional[_Span]:
+    stack = getattr(_local, "stack", None)
+    return stack[-1] if stack else None
+
+
+def _add(bucket: Dict[str, Dict[str, Any]], key: str, duration_ms: float, span: _Span, budget: Optional[int]) -> None:
+    stats = bucket.get(key)
+    if stats is None:
+        stats = bucket[key] = {"calls": 0, "total_ms": 0.0, "max_ms": 0.0, "statements": 0, "rows": 0, "max_statements": 0}
+        if budget is not None:
+            stats["budget"] = budget
+            stats["over_budget"] = 0
+    stats["calls"] += 1
+    stats["total_ms"] += duration_ms
+    stats["max_ms"] = max(stats["max_ms"], duration_ms)
+    stats["statements"] += span.statements
+    stats["rows"] += span.rows
+    stats["max_statements"] = max(stats["max_statements"], span.statements)
+    if budget is not None and span.statements > budget:
+        stats["over_budget"] += 1
+
+
+def _finish(span: _Span, budget: Optional[int]) -> None:
+    stack = _stack()
+    stack.pop()
+    duration_ms = (time.perf_counter() - span.started_at) * 1000
+    if stack:
+        # Parent spans report inclusive counts
+        parent = stack[-1]
+        parent.statements += span.statements
+        parent.rows += span.rows
+        if parent.sql is not None and span.sql is not None:
+            parent.sql.update(span.sql)
+    with _stats_lock:
+        _add(_operations, span.name, duration_ms, span, budget)
+        _add(_paths, span.path, duration_ms, span, budget)
+
+
+def traced(name: str):
+    """Decorator recording each call of the function as a span called `name`."""
+    def decorator(func):
+        budget = getattr(func, "__query_budget__", None)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            stack = _stack()
+            span = _Span(name, stack[-1] if stack else None)
+            stack.append(span)
+            try:
+                result = func(*args, **kwargs)
+            finally:
+                _finish(span, budget)
+            if _enforce_budgets and budget is not None and span.statements > budget:
+                raise QueryBudgetExceeded(name, span.statements, budget, span.sql.most_common(3) if span.sql else [])
+            return result
+        wrapper.__traced__ = True
+        return wrapper
+    return decorator
+
+
+def trace_public_methods(cls, prefix: Optional[str] = None):
+    """Wrap every public method defined on `cls` in a span named "<prefix>.<method>"."""
+    prefix = prefix or cls.__name__
+    for name, value in list(vars(cls).items()):
+        if name.startswith("_") or not inspect.isfunction(value) or getattr(value, "__traced__", False):
+            continue
+        setattr(cls, name, traced(f"{prefix}.{name}")(value))
+    return cls
+
+
+def get_perf_stats() -> Dict[str, Any]:
+    """Aggregated span statistics per operation name and per call path"""
+    def finish(bucket):
+        return {
+            key: {
+                **stats,
+                "total_ms": round(stats["total_ms"], 3),
+                "max_ms": round(stats["max_ms"], 3),
+                "avg_ms": round(stats["total_ms"] / stats["calls"], 3),
+            }
+            for key, stats in sorted(bucket.items(), key=lambda item: -item[1]["total_ms"])
+        }
+
+    with _stats_lock:
+        return {
+            "enabled": _enabled,
+            "enforce_query_budgets": _enforce_budgets,
+            "operations": finish(_operations),
+            "paths": finish(_paths),
+        }
+
+
+def reset_perf_stats() -> None:
+    with _stats_lock:
+        _operations.clear()
+        _paths.clear()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _count_statement(_conn, cursor, statement, _parameters, _context, _executemany):
+    span = _current_span() if _enabled else None
+    if span is None:
+        return
+    span.statements += 1
+    if span.sql is not None:
+        span.sql[statement] += 1
+    # rowcount covers rows written by INSERT/UPDATE/DELETE; SELECT rows are
+    # counted as the ORM loads them (sqlite reports -1 for SELECTs)
+    if cursor.rowcount and cursor.rowcount > 0:
+        span.rows += cursor.rowcount
+
+
+@event.listens_for(Mapper, "load")
+def _count_loaded_row(_target, _context):
+    span = _current_span() if _enabled else None
+    if span is not None:
+        span.rows += 1
@@ -0,0 +1,76 @@
+"""
+Startup phase profiler
+Records how long each phase of an app launch takes (imports, database path
+resolution, engine creation, schema work, bootstrap, stock recompute).
+"""
+import os
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+# Set CHAME_LOG_STARTUP_PROFILE=1 to send the profile to the logger once per launch
+LOG_STARTUP_PROFILE_ENV = "CHAME_LOG_STARTUP_PROFILE"
+
+# Taken when this module is first imported - import it early to cover imports
+PROCESS_STARTED_AT = time.perf_counter()
+
+_phases: List[Dict[str, Any]] = []
+_logged = False
+
+
+def record_phase(name: str, started_at: float, ended_at: Optional[float] = None) -> None:
+    """Record a phase from perf_counter() timestamps"""
+    if ended_at is None:
+        ended_at = time.perf_counter()
+    _phases.append({
+        "name": name,
+        "start_ms": round((started_at - PROCESS_STARTED_AT) * 1000, 3),
+        "duration_ms": round((ended_at - started_at) * 1000, 3),
+    })
+
+
+@contextmanager
+def startup_phase(name: str):
+    """Time the enclosed block as a startup phase (also recorded on errors)"""
+    started_at = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_phase(name, started_at)
+
+
+def get_startup_profile() -> Dict[str, Any]:
+    """Return the recorded phases in start order, plus per-name totals"""
+    phases = sorted(_phases, key=lambda phase: phase["start_ms"])
+    totals: Dict[str, float] = {}
+    for phase in phases:
+        totals[phase["name"]] = round(totals.get(phase["name"], 0.0) + phase["duration_ms"], 3)
+    return {
+        "phases": phases,
+        "totals_ms": totals,
+        "elapsed_ms": round((time.perf_counter() - PROCESS_STARTED_AT) * 1000, 3),
+    }
+
+
+def log_startup_profile_once(force: bool = False) -> bool:
+    """Log the profile the first time this is called, if enabled; returns True if logged"""
+    global _logged
+    if _logged:
+        return False
+    if not force and os.environ.get(LOG_STARTUP_PROFILE_ENV, "").strip().lower() not in ("1", "true", "yes"):
+        return False
+    _logged = True
+    try:
+        from utils.firebase_logger import log_info
+        profile = get_startup_profile()
+        log_info(f"Startup profile: {profile['elapsed_ms']:.0f} ms", {"totals_ms": profile["totals_ms"]})
+    except Exception as e:
+        print(f"⚠️ Could not log startup profile: {e}")
+    return True
+
+
+def reset_startup_profile() -> None:
+    """Forget recorded phases (e.g. between tests or after reset_database())"""
+    global _logged
+    _phases.clear()
+    _logged = False
@@ -1851,6 +1851,22 @@ class MainActivity : FlutterActivity() {
         }
     }
     
+    /**
+     * Batched variant of logToFirebase used by the Python log shipping thread.
+     * Each record is a map with "level", "message" and "metadata" keys.
+     */
+    fun logBatchToFirebase(records: List<Map<String, Any>>) {
+        runOnUiThread {
+            for (record in records) {
+                try {
+                    flutterMethodChannel?.invokeMethod("log_to_firebase", record)
+                } catch (e: Exception) {
+                    println("Failed to call Flutter logToFirebase: ${e.message}")
+                }
+            }
+        }
+    }
+    
     /**
      * Generic method to call any Flutter method from Python
      */